@@ -0,0 +1,203 @@
+"""
+    Scaling benchmark of the phases of a game: population creation, triplet creation, stepping, converting
+    non-roots to roots and the convergence checks, for increasing population sizes and both scenarios.
+    The map grows with the population so that the density of entities stays the same as in config/params.yaml.
+
+    Every (scenario, N) case runs in a fresh process so that its peak memory can be measured on its own.
+    Results are saved as JSON; passing an earlier result file as --baseline fails the run (exit code 1)
+    if any phase became slower than the baseline by more than --tolerance.
+
+    Run from the root of the repository, e.g.:
+        python -m benchmarks.phases --sizes 100 1000 10000 100000 --output benchmarks/results.json
+        python -m benchmarks.phases --baseline benchmarks/results.json --tolerance 0.25
+"""
+
+from resources.game import Game
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import argparse
+import json
+import numpy as np
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import yaml
+
+PHASES = ["create_population", "create_triplets", "step", "convert_non_roots_to_roots", "convergence_checks"]
+MIN_REGRESSION_TIME = 1e-2    # [seconds] phases faster than this are too noisy to be checked for regressions
+
+class _TimedGame(Game):
+    """
+        Game that times the phases run during initialization.
+    """
+    def __init__(self, params: dict):
+        self.phase_times = {}
+        super().__init__(params=params)
+
+    def _create_population(self):
+        start = time.perf_counter()
+        population = super()._create_population()
+        self.phase_times["create_population"] = time.perf_counter() - start
+        return population
+
+    def _create_triplets(self):
+        start = time.perf_counter()
+        triplets = super()._create_triplets()
+        self.phase_times["create_triplets"] = time.perf_counter() - start
+        return triplets
+
+def benchmark_case(params: dict, num_steps: int) -> dict:
+    """
+        Creates a game and runs num_steps timesteps of it, timing every phase separately.
+        Times of the per-timestep phases are medians over the timesteps, which are less sensitive to outliers than means.
+    """
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        game = _TimedGame(params)
+        phase_times = dict(game.phase_times)
+        per_step = {"step": [], "convert_non_roots_to_roots": [], "convergence_checks": []}
+        for _ in range(num_steps):
+            start = time.perf_counter()
+            game._step()
+            after_step = time.perf_counter()
+            game._convert_non_roots_to_roots()
+            after_convert = time.perf_counter()
+            game._get_num_converged_entities()
+            game._get_ids_non_converged_entities()
+            after_checks = time.perf_counter()
+
+            per_step["step"].append(after_step - start)
+            per_step["convert_non_roots_to_roots"].append(after_convert - after_step)
+            per_step["convergence_checks"].append(after_checks - after_convert)
+
+    for phase, times in per_step.items():
+        phase_times[phase] = float(np.median(times)) if len(times) > 0 else 0.0
+    return {
+        "num_entities": game._num_entities,
+        "phase_times": phase_times,
+        "peak_memory_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024     # ru_maxrss is in KiB on Linux
+    }
+
+def make_params(base_params: dict, scenario: str, num_entities: int, spawn_mode: str, vectorized: bool) -> dict:
+    """
+        Headless game parameters for one case, with the map scaled to keep the density of base_params.
+    """
+    density = base_params["num_entities"] / (base_params["map_size"][0] * base_params["map_size"][1])
+    scale = (num_entities / density / (base_params["map_size"][0] * base_params["map_size"][1])) ** 0.5
+    return {
+        **base_params,
+        "num_entities": num_entities,
+        "map_size": [base_params["map_size"][0] * scale, base_params["map_size"][1] * scale],
+        "positioning_scenario": scenario,
+        "spawn_mode": spawn_mode,
+        "vectorized": vectorized,
+        "save_directory": None,
+        "gui": {**base_params["gui"], "enable": False},
+        "recorder": {"enable": False},
+        "logging": {"quiet": True}
+    }
+
+def scaling_exponents(cases: list[dict]) -> dict:
+    """
+        Fits time ~ N^k per scenario and phase, k being the slope of log(time) against log(N).
+    """
+    exponents = {}
+    for scenario in sorted(set(case["scenario"] for case in cases)):
+        scenario_cases = [case for case in cases if case["scenario"] == scenario]
+        exponents[scenario] = {}
+        for phase in PHASES:
+            points = [(case["num_entities"], case["phase_times"][phase]) for case in scenario_cases if case["phase_times"][phase] > 0]
+            if len(points) < 2:
+                exponents[scenario][phase] = None
+                continue
+            n, t = np.log(np.array(points, dtype=np.float64)).T
+            exponents[scenario][phase] = float(np.polyfit(n, t, 1)[0])
+    return exponents
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+        Lists phases that are slower than in the baseline by more than tolerance (e.g. 0.25 for 25%).
+    """
+    baseline_cases = {(case["scenario"], case["num_entities"]): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        baseline_case = baseline_cases.get((case["scenario"], case["num_entities"]))
+        if baseline_case is None:
+            continue
+        for phase in PHASES:
+            now = case["phase_times"][phase]
+            before = baseline_case["phase_times"].get(phase)
+            if before is None or max(now, before) < MIN_REGRESSION_TIME:
+                continue
+            if now > before * (1 + tolerance):
+                regressions.append(f"scenario {case['scenario']}, N={case['num_entities']}, {phase}: {before:.4f}s --> {now:.4f}s (+{100 * (now / before - 1):.0f}%)")
+    return regressions
+
+def run_benchmarks(base_params: dict, sizes: list[int], scenarios: list[str], num_steps: int, spawn_mode: str, vectorized: bool) -> dict:
+    cases = []
+    for scenario in scenarios:
+        for num_entities in sizes:
+            params = make_params(base_params, scenario, num_entities, spawn_mode, vectorized)
+            # a fresh process per case, so peak memory is not carried over from earlier (larger) cases
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                case = executor.submit(benchmark_case, params, num_steps).result()
+            case["scenario"] = scenario
+            cases.append(case)
+            times = ", ".join(f"{phase} {case['phase_times'][phase]:.4f}s" for phase in PHASES)
+            print(f"\tScenario {scenario}, N={case['num_entities']}: {times}, peak memory {case['peak_memory_mb']:.0f} MB")
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "num_steps": num_steps,
+        "spawn_mode": spawn_mode,
+        "vectorized": vectorized,
+        "cases": cases,
+        "scaling_exponents": scaling_exponents(cases)
+    }
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the phases of a game for increasing population sizes")
+    parser.add_argument("--config", default="config/params.yaml", help="base parameters (density, perception radius, step size, seed)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="population sizes")
+    parser.add_argument("--scenarios", nargs="+", default=["A", "B"], choices=["A", "B"], help="positioning scenarios")
+    parser.add_argument("--steps", type=int, default=5, help="number of timesteps to time per case")
+    parser.add_argument("--spawn-mode", default="batched", choices=["sequential", "batched", "poisson_disk"], help="sequential spawning is quadratic in N")
+    parser.add_argument("--vectorized", action="store_true", help="benchmark the vectorized population")
+    parser.add_argument("--output", default="benchmark_results.json", help="where results are saved")
+    parser.add_argument("--baseline", default=None, help="results of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown relative to the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    with open(args.config) as stream:
+        base_params = yaml.safe_load(stream)
+
+    print(f"Benchmarking sizes {args.sizes} for scenarios {args.scenarios} ..")
+    results = run_benchmarks(base_params, args.sizes, args.scenarios, args.steps, args.spawn_mode, args.vectorized)
+    for scenario, exponents in results["scaling_exponents"].items():
+        print(f"Scaling exponents, scenario {scenario}: " + ", ".join(f"{phase} {k:.2f}" if k is not None else f"{phase} -" for phase, k in exponents.items()))
+
+    with open(args.output, "w") as stream:
+        json.dump(results, stream, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline) as stream:
+            baseline = json.load(stream)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if len(regressions) > 0:
+            print(f"[ERROR] {len(regressions)} phases regressed by more than {100 * args.tolerance:.0f}% against {args.baseline}:")
+            for regression in regressions:
+                print(f"\t{regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
@@ -1,8 +1,29 @@
+from resources.config import GameConfig, parse_overrides
 from resources.game import Game
 
+import argparse
+
 if __name__ == "__main__":
-    config_filepath = "config/params.yaml"
-    game = Game(
-        config_filepath = config_filepath
-    )
-    game.run()
+    parser = argparse.ArgumentParser(description="Runs the game configured in config/params.yaml")
+    parser.add_argument("--config", default="config/params.yaml", help="YAML file holding the parameters of the game")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="overrides a parameter (dotted keys address nested parameters, e.g. gui.enable=false), can be repeated")
+    parser.add_argument("--resume", default=None, help="checkpoint (.npz) to continue a game from")
+    args = parser.parse_args()
+
+    try:
+        overrides = parse_overrides(args.set)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        if args.resume is not None:
+            game = Game.resume(args.resume, overrides=overrides)
+        elif len(overrides) == 0:
+            game = Game(
+                config_filepath = args.config
+            )
+        else:
+            game = Game(params=GameConfig.from_yaml(args.config, overrides))
+    except ValueError as exc:
+        parser.error(str(exc))
+    with game:
+        game.run()
@@ -0,0 +1,84 @@
+"""
+    Renders frames (and optionally a video) from a trajectory file recorded by a game, using a pool of processes.
+    Run from the root of the repository, e.g.: python render_trajectory.py renders/trajectory.bin --every 10 --workers 8
+"""
+
+from resources.recorder import Trajectory
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import shutil
+import subprocess
+
+# per-process state, set up once by _init_worker()
+_trajectory = None
+_figure = None
+
+def _init_worker(trajectory_filepath: str, annotate_ids: bool) -> None:
+    from resources.visualization import TripletFigure
+
+    global _trajectory, _figure
+    _trajectory = Trajectory(trajectory_filepath)
+    _figure = TripletFigure(_trajectory.map_size, _trajectory.ids.tolist(), annotate_ids)
+
+def _render_frames(timesteps: list[int], output_directory: str) -> int:
+    for t in timesteps:
+        _figure.draw(_trajectory.positions[t], _trajectory.is_root[t], title=f"Timestep_{_trajectory.metadata.get('first_timestep', 0) + t}", save_filepath=os.path.join(output_directory, f"frame_{t:06d}.png"))
+    return len(timesteps)
+
+def render_trajectory(trajectory_filepath: str, output_directory: str, start: int = 0, stop: int = None, every: int = 1, workers: int = None, annotate_ids: bool = True) -> list[int]:
+    """
+        Renders timesteps [start, stop) of a trajectory, every 'every' timesteps, as PNG frames in output_directory.
+        Returns the rendered timesteps.
+    """
+    trajectory = Trajectory(trajectory_filepath)
+    timesteps = list(range(trajectory.num_timesteps))[start:stop:every]
+    os.makedirs(output_directory, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, -(-len(timesteps) // (4 * workers)))    # a few chunks per worker to balance the load
+    chunks = [timesteps[i:i + chunk_size] for i in range(0, len(timesteps), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(trajectory_filepath, annotate_ids)) as executor:
+        num_rendered = sum(executor.map(_render_frames, chunks, [output_directory] * len(chunks)))
+
+    print(f"Rendered {num_rendered} frames of {trajectory_filepath} to {output_directory}")
+    return timesteps
+
+def encode_video(output_directory: str, timesteps: list[int], video_filepath: str, fps: int) -> bool:
+    """
+        Encodes rendered frames into a video with ffmpeg. Returns True/False for success/failure.
+    """
+    if shutil.which("ffmpeg") is None:
+        print(f"[ERROR] ffmpeg not found, cannot encode {video_filepath}")
+        return False
+
+    list_filepath = os.path.join(output_directory, "frames.txt")
+    with open(list_filepath, "w") as stream:
+        for t in timesteps:
+            stream.write(f"file 'frame_{t:06d}.png'\nduration {1.0 / fps}\n")
+    result = subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_filepath, "-pix_fmt", "yuv420p", video_filepath])
+    if result.returncode != 0:
+        print(f"[ERROR] ffmpeg failed to encode {video_filepath}")
+        return False
+
+    print(f"Video saved to {video_filepath}")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render frames or a video from a recorded trajectory")
+    parser.add_argument("trajectory", help="trajectory file written by the game's recorder")
+    parser.add_argument("--output-directory", default=None, help="where frames are saved (default: <trajectory>_frames)")
+    parser.add_argument("--start", type=int, default=0, help="first timestep to render")
+    parser.add_argument("--stop", type=int, default=None, help="timestep to stop rendering at (exclusive)")
+    parser.add_argument("--every", type=int, default=1, help="render every n-th timestep")
+    parser.add_argument("--workers", type=int, default=None, help="number of rendering processes (default: number of CPUs)")
+    parser.add_argument("--no-ids", action="store_true", help="do not annotate entity IDs")
+    parser.add_argument("--video", default=None, help="also encode the frames into this video file (requires ffmpeg)")
+    parser.add_argument("--fps", type=int, default=10, help="frame rate of the video")
+    args = parser.parse_args()
+
+    output_directory = args.output_directory or (os.path.splitext(args.trajectory)[0] + "_frames")
+    timesteps = render_trajectory(args.trajectory, output_directory, args.start, args.stop, args.every, args.workers, annotate_ids=not args.no_ids)
+    if args.video is not None:
+        encode_video(output_directory, timesteps, args.video, args.fps)
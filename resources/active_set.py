@@ -0,0 +1,79 @@
+import numpy as np
+
+class ActiveSet:
+    """
+        Event-driven scheduling of the roots to move in a timestep. A root only needs to be processed if itself or one
+        of its parents moved during the previous timestep: otherwise it would compute the very same target from the very
+        same positions, and not move.
+
+        Moves are propagated to the roots depending on the entities that moved through a reverse index of the triplets
+        (parent -> roots), held in CSR form:
+            - dependents: IDs of roots, grouped by parent
+            - offsets: (N+1,) dependents of parent p are dependents[offsets[p]:offsets[p+1]]
+
+        With epsilon > 0, movements of at most epsilon are not propagated, trading exactness for fewer entities to process
+        (entities drifting by tiny amounts are left alone). With epsilon = 0, the game plays exactly as without scheduling.
+
+        Entities are addressed by slot (index into the population list), like in TripletGraph.
+    """
+    def __init__(self, num_entities: int, epsilon: float = 0.0):
+        self.epsilon = epsilon
+        self._num_entities = num_entities
+        self._dependents = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(num_entities + 1, dtype=np.int64)
+        self.dirty_ids = np.arange(num_entities, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.dirty_ids)
+
+    def update(self, roots: np.ndarray, parents: np.ndarray) -> None:
+        """
+            Rebuilds the reverse index given the slots of all roots (T,) and of their parents (T, 2), e.g. after
+            non-roots became roots. New roots are not marked dirty by this (see mark_dirty()).
+        """
+        edges_from = np.concatenate([parents[:, 0], parents[:, 1]]).astype(np.int64)
+        edges_to = np.concatenate([roots, roots]).astype(np.int64)
+        order = np.argsort(edges_from, kind="stable")
+        self._dependents = edges_to[order]
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(edges_from, minlength=self._num_entities))])
+
+    def mark_dirty(self, slots: np.ndarray) -> None:
+        """
+            Makes sure the given entities are processed in the next timestep, e.g. roots that were just created.
+        """
+        self.dirty_ids = np.union1d(self.dirty_ids, np.asarray(slots, dtype=np.int64))
+
+    def mark_all_dirty(self) -> None:
+        self.dirty_ids = np.arange(self._num_entities, dtype=np.int64)
+
+    def dirty_mask(self) -> np.ndarray:
+        mask = np.zeros(self._num_entities, dtype=bool)
+        mask[self.dirty_ids] = True
+        return mask
+
+    def dependents_of(self, slots) -> np.ndarray:
+        """
+            Roots having any of the given entities (or the given entity) as a parent (possibly repeated).
+        """
+        if np.isscalar(slots):
+            return self._dependents[self._offsets[slots]:self._offsets[slots + 1]]
+
+        starts = self._offsets[slots]
+        lengths = self._offsets[slots + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # index of every dependent: start of its group + position within the group
+        group_starts = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        return self._dependents[group_starts + np.arange(total)]
+
+    def end_step(self, moved: np.ndarray, distances: np.ndarray = None) -> None:
+        """
+            Schedules the next timestep given the entities that moved during this one and, with epsilon > 0,
+            the distances they moved.
+        """
+        moved = np.asarray(moved, dtype=np.int64)
+        if self.epsilon > 0 and distances is not None:
+            moved = moved[distances > self.epsilon]
+        self.dirty_ids = np.unique(np.concatenate([moved, self.dependents_of(moved)]))
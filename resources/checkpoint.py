@@ -0,0 +1,65 @@
+import numpy as np
+import json
+
+CHECKPOINT_VERSION = 1
+
+def save_checkpoint(filepath: str, state: dict) -> None:
+    """
+        Saves the state of a game as a single compressed NumPy archive (.npz). Values are arrays, except for:
+            - 'params': the game parameters, stored as JSON
+            - 'random_state': the state of Python's random module, as returned by random.getstate()
+    """
+    arrays = {key: value for key, value in state.items() if key not in ("params", "random_state")}
+    version, internal_state, gauss_next = state["random_state"]
+    np.savez_compressed(
+        filepath,
+        version = CHECKPOINT_VERSION,
+        params = json.dumps(state["params"]),
+        random_version = version,
+        random_internal_state = np.asarray(internal_state, dtype=np.uint64),
+        random_gauss_next = np.nan if gauss_next is None else gauss_next,
+        **arrays
+    )
+
+def load_checkpoint(filepath: str) -> dict:
+    """
+        Loads a checkpoint written by save_checkpoint(), in the same form as it was given to it.
+    """
+    with np.load(filepath) as archive:
+        if "version" not in archive or int(archive["version"]) != CHECKPOINT_VERSION:
+            raise ValueError(f"{filepath} is not a checkpoint of version {CHECKPOINT_VERSION}")
+        state = {key: archive[key] for key in archive.files if key not in ("version", "params", "random_version", "random_internal_state", "random_gauss_next")}
+        gauss_next = float(archive["random_gauss_next"])
+        state["params"] = json.loads(str(archive["params"]))
+        state["random_state"] = (
+            int(archive["random_version"]),
+            tuple(int(i) for i in archive["random_internal_state"]),
+            None if np.isnan(gauss_next) else gauss_next
+        )
+    return state
+
+def load_positions(filepath: str) -> np.ndarray:
+    """
+        Loads (N, 2) positions from a .npy array, a .csv file with one 'x,y' row per entity,
+        or the current positions of a checkpoint (.npz).
+    """
+    if filepath.endswith(".npz"):
+        with np.load(filepath) as archive:
+            positions = archive["positions"]
+    elif filepath.endswith(".csv"):
+        positions = np.loadtxt(filepath, delimiter=",", ndmin=2)
+    else:
+        positions = np.load(filepath)
+    return np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+
+def pack_ragged(lists: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Packs a list of lists of integers into a flat array and the (len(lists),) lengths of the lists.
+    """
+    lengths = np.array([len(l) for l in lists], dtype=np.int64)
+    values = np.array([i for l in lists for i in l], dtype=np.int64)
+    return values, lengths
+
+def unpack_ragged(values: np.ndarray, lengths: np.ndarray) -> list[list[int]]:
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    return [values[offsets[k]:offsets[k + 1]].tolist() for k in range(len(lengths))]
@@ -0,0 +1,124 @@
+from dataclasses import asdict, dataclass, field, fields
+from copy import deepcopy
+
+@dataclass
+class GameConfig:
+    """
+        Typed form of the parameters of a game (see config/params.yaml for their meaning), from which games can be
+        created without a config file: Game(params=GameConfig(num_entities=500, vectorized=True)).
+
+        Defaults are those of config/params.yaml, except that games are headless (no gui, nothing saved to disk).
+        Sections that only toggle optional features are kept as dictionaries, as in the YAML file.
+    """
+    random_seed: int = 30
+    num_entities: int = 100
+    timesteps: int = 10000
+    map_size: list[float, float] = field(default_factory=lambda: [20, 20])     # [m]
+    step_size: float = 0.3              # [m]
+    perception_radius: float = 2.5      # [m]
+    spawn_mode: str = "sequential"
+    rng_mode: str = "global"
+    vectorized: bool = False
+    positioning_scenario: str = "A"
+    positioning_scenario_B: dict = field(default_factory=lambda: {"dist_behind": 1.0})
+    save_directory: str = None
+    initial_positions: str = None
+    gui: dict = field(default_factory=lambda: {"enable": False, "frame_queue_size": 8, "drop_frames_when_behind": False})
+    recorder: dict = field(default_factory=lambda: {"enable": False})
+    parallel: dict = field(default_factory=lambda: {"workers": 0})
+    active_set: dict = field(default_factory=lambda: {"enable": False, "epsilon": 0.0})
+    fast_forward: dict = field(default_factory=lambda: {"enable": False})
+    equilibrium_solver: dict = field(default_factory=lambda: {"enable": False})
+    dependency_analysis: dict = field(default_factory=lambda: {"freeze_unresolvable": False})
+    profiling: dict = field(default_factory=dict)
+    logging: dict = field(default_factory=dict)
+    checkpoint: dict = field(default_factory=lambda: {"interval": 0})
+
+    @classmethod
+    def from_dict(cls, params: dict) -> "GameConfig":
+        """
+            Creates a config from parameters as found in config/params.yaml. Missing parameters take their default
+            value, and sections given only in part are completed with the defaults of the section.
+        """
+        unknown = set(params.keys()) - set(f.name for f in fields(cls))
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+        config = cls()
+        for key, value in params.items():
+            default = getattr(config, key)
+            setattr(config, key, {**default, **value} if isinstance(default, dict) and isinstance(value, dict) else deepcopy(value))
+        return config
+
+    @classmethod
+    def from_yaml(cls, filepath: str, overrides: dict = None) -> "GameConfig":
+        # imported here so that games created from dictionaries or configs do not load yaml
+        import yaml
+        with open(filepath) as stream:
+            params = yaml.safe_load(stream)
+        return cls.from_dict(apply_overrides(params, overrides or {}))
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def apply_overrides(params: dict, overrides: dict) -> dict:
+    """
+        Returns a copy of params with overrides applied (dotted keys address nested parameters).
+    """
+    params = deepcopy(params)
+    for key, value in overrides.items():
+        node = params
+        *parents, leaf = key.split(".")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = value
+    return params
+
+def parse_overrides(assignments: list[str]) -> dict:
+    """
+        Parses command line overrides given as 'key=value' (e.g. 'gui.enable=false', 'map_size=[40, 40]'),
+        values being read as YAML.
+    """
+    # imported here so that games created from dictionaries or configs do not load yaml
+    import yaml
+    overrides = {}
+    for assignment in assignments:
+        key, separator, value = assignment.partition("=")
+        if separator == "" or key.strip() == "":
+            raise ValueError(f"Overrides must be given as key=value, got '{assignment}'")
+        overrides[key.strip()] = yaml.safe_load(value)
+    return overrides
+
+REQUIRED_PARAMS = ["random_seed", "num_entities", "timesteps", "map_size", "step_size", "perception_radius", "positioning_scenario"]
+
+def validate_params(params: dict) -> list[str]:
+    """
+        Checks the parameters of a game, returning a description of every problem found (none if valid).
+    """
+    errors = [f"Missing parameter: {key}" for key in REQUIRED_PARAMS if key not in params]
+    if len(errors) > 0:
+        return errors
+
+    def is_number(value) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    if not isinstance(params["random_seed"], int) and params["random_seed"] is not None:
+        errors.append(f"random_seed must be an integer, got {params['random_seed']!r}")
+    if not isinstance(params["num_entities"], int) or params["num_entities"] < 1:
+        errors.append(f"num_entities must be a positive integer, got {params['num_entities']!r}")
+    if not isinstance(params["timesteps"], int) or params["timesteps"] < 0:
+        errors.append(f"timesteps must be a non-negative integer, got {params['timesteps']!r}")
+    map_size = params["map_size"]
+    if not isinstance(map_size, (list, tuple)) or len(map_size) != 2 or not all(is_number(v) and v > 0 for v in map_size):
+        errors.append(f"map_size must be a list of two positive numbers, got {map_size!r}")
+    if params["step_size"] is not None and (not is_number(params["step_size"]) or params["step_size"] <= 0):
+        errors.append(f"step_size must be a positive number (or null), got {params['step_size']!r}")
+    if not is_number(params["perception_radius"]) or params["perception_radius"] <= 0:
+        errors.append(f"perception_radius must be a positive number, got {params['perception_radius']!r}")
+    if params["positioning_scenario"] == "B" and not is_number(params.get("positioning_scenario_B", {}).get("dist_behind")):
+        errors.append(f"positioning_scenario_B.dist_behind must be a number in positioning scenario B")
+    if params.get("rng_mode", "global") not in ["global", "streams"]:
+        errors.append(f"rng_mode must be either global or streams, got {params['rng_mode']!r}")
+    for section in ["gui", "recorder", "parallel", "active_set", "fast_forward", "equilibrium_solver", "dependency_analysis", "profiling", "logging", "checkpoint", "positioning_scenario_B"]:
+        if section in params and not isinstance(params[section], dict):
+            errors.append(f"{section} must be a mapping of parameters, got {params[section]!r}")
+    return errors
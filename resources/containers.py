@@ -1,8 +1,13 @@
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
 
-@dataclass
+@dataclass(slots=True)
 class EntityPosition:
+    """
+        Positions are treated as values: they are never mutated once created, so that the same object can be shared
+        (e.g. as the current position of an entity and the latest entry of its tracking history) without copying.
+    """
     x: float
     y: float
 
@@ -16,8 +21,51 @@ class PositionScenerioBParams:
 @dataclass
 class GuiParams:
     enabled: bool
-    on_keypress: bool
-    delay: float
+    frame_queue_size: int = 8
+    drop_frames_when_behind: bool = False
+
+@dataclass
+class RecorderParams:
+    enabled: bool
+    filepath: str
+
+@dataclass
+class ProfilingParams:
+    timings_filepath: str = None    # per-timestep timings and counters are saved here as JSON, if set
+    cprofile: bool = False
+    cprofile_filepath: str = None
+
+@dataclass
+class CheckpointParams:
+    interval: int = 0       # [timesteps] a checkpoint is saved every interval timesteps, 0 to never save one
+    directory: str = None
+
+@dataclass
+class EquilibriumSolverParams:
+    enabled: bool = False
+    method: str = "cg"          # jacobi or cg (see solve_equilibrium())
+    tolerance: float = 1e-9     # [m] largest distance of a root to the midpoint of its parents
+    max_iterations: int = 10000
+    warm_start: bool = False    # if True, the game is played from the solved positions
+
+@dataclass
+class EquilibriumSolution:
+    positions: np.ndarray       # (N, 2) solved positions, row i being entity i of the population
+    num_iterations: int
+    residual: float             # [m] largest distance of a solved root to the midpoint of its parents
+    converged: bool             # whether the residual is within tolerance
+    singular_groups: list[list[int]]    # slots of roots depending on each other only, placed at their centroid
+    undetermined: np.ndarray    # (N,) mask of the roots whose solution depends on where singular groups were placed
+
+@dataclass
+class GameSummary:
+    num_timesteps: int      # timesteps that were run
+    num_entities: int
+    num_converged: int
+    num_non_roots: int
+    num_left_to_converge: int
+    all_converged: bool
+    cannot_be_resolved: bool
 
 class PositioningScenario(Enum):
     Invalid = 0
@@ -0,0 +1,152 @@
+import numpy as np
+
+class ConvergenceTracker:
+    """
+        Tracks the distances moved by every entity of a population in a shared (N, H-1) ring buffer, H being the
+        number of tracked positions (Entity._history_n). Whether an entity has converged is maintained incrementally
+        as it moves, following the same criteria as Entity.has_converged():
+            - the entity has moved at least H-1 times, and
+            - all tracked movements are under threshold_dist ("barely moving"), or
+            - tracked movements have been following a non-increasing order
+
+        For this, every entity keeps a count of tracked movements above threshold_dist and a count of increases
+        between consecutive tracked movements; both are updated in O(1) when a movement enters or leaves the window.
+    """
+    def __init__(self, num_entities: int, history_n: int = 5, threshold_dist: float = 0.05):
+        self.threshold_dist = threshold_dist
+        self._num_deltas = max(0, history_n - 1)
+
+        self._deltas = np.zeros((num_entities, max(1, self._num_deltas)), dtype=np.float64)
+        self._num_recorded = np.zeros(num_entities, dtype=np.int64)
+        self._head = np.zeros(num_entities, dtype=np.int64)     # slot of the next write (the oldest delta when full)
+        self._num_over_threshold = np.zeros(num_entities, dtype=np.int64)
+        self._num_increases = np.zeros(num_entities, dtype=np.int64)
+
+        # with no movements to track, every entity is trivially converged (as in Entity.has_converged())
+        self.converged = np.full(num_entities, self._num_deltas == 0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.converged)
+
+    def copy(self) -> "ConvergenceTracker":
+        tracker = ConvergenceTracker(len(self), history_n=self._num_deltas + 1, threshold_dist=self.threshold_dist)
+        tracker.set_state(self.get_state())
+        return tracker
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """
+            Arrays holding the complete state of the tracker, e.g. to be saved in a checkpoint.
+        """
+        return {
+            "deltas": self._deltas,
+            "num_recorded": self._num_recorded,
+            "head": self._head,
+            "num_over_threshold": self._num_over_threshold,
+            "num_increases": self._num_increases,
+            "converged": self.converged
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """
+            Restores a state obtained from get_state() (of a tracker of the same size).
+        """
+        self._deltas[:] = state["deltas"]
+        self._num_recorded[:] = state["num_recorded"]
+        self._head[:] = state["head"]
+        self._num_over_threshold[:] = state["num_over_threshold"]
+        self._num_increases[:] = state["num_increases"]
+        self.converged[:] = state["converged"]
+
+    def latest_deltas(self, slots: np.ndarray) -> np.ndarray:
+        """
+            Distance of the latest recorded movement of the given entities (0 if none was recorded).
+        """
+        if self._num_deltas == 0:
+            return np.zeros(len(slots), dtype=np.float64)
+        latest = self._deltas[slots, (self._head[slots] - 1) % self._num_deltas]
+        return np.where(self._num_recorded[slots] > 0, latest, 0.0)
+
+    def has_converged(self, slot: int) -> bool:
+        return bool(self.converged[slot])
+
+    def non_converged(self, mask: np.ndarray) -> np.ndarray:
+        """
+            Returns the slots selected by mask (e.g. root entities) that have not converged.
+        """
+        return np.flatnonzero(mask & ~self.converged)
+
+    def num_converged(self, mask: np.ndarray) -> int:
+        """
+            Returns the number of entities selected by mask (e.g. root entities) that have converged.
+        """
+        return int(np.count_nonzero(mask & self.converged))
+
+    def record_one(self, slot: int, distance: float) -> None:
+        """
+            record_many() for a single entity, with scalar reads and writes only, so that entities moving one at a
+            time do not allocate arrays for every move.
+        """
+        size = self._num_deltas
+        if size == 0:
+            return
+
+        deltas = self._deltas
+        head = int(self._head[slot])
+        num_recorded = int(self._num_recorded[slot])
+        threshold = self.threshold_dist
+        num_over_threshold = int(self._num_over_threshold[slot])
+        num_increases = int(self._num_increases[slot])
+
+        # the oldest movement leaves the window once it is full
+        if num_recorded == size:
+            oldest = deltas[slot, head]
+            if oldest > threshold:
+                num_over_threshold -= 1
+            if size > 1 and oldest < deltas[slot, (head + 1) % size]:
+                num_increases -= 1
+
+        # the new movement enters the window
+        if distance > threshold:
+            num_over_threshold += 1
+        if size > 1 and num_recorded > 0 and deltas[slot, (head - 1) % size] < distance:
+            num_increases += 1
+        deltas[slot, head] = distance
+
+        self._head[slot] = (head + 1) % size
+        num_recorded = min(num_recorded + 1, size)
+        self._num_recorded[slot] = num_recorded
+        self._num_over_threshold[slot] = num_over_threshold
+        self._num_increases[slot] = num_increases
+        self.converged[slot] = (num_recorded == size) and (num_over_threshold == 0 or num_increases == 0)
+
+    def record_many(self, slots: np.ndarray, distances: np.ndarray) -> None:
+        """
+            Records one movement for each of the given entities (slots are expected to be unique).
+        """
+        if self._num_deltas == 0 or len(slots) == 0:
+            return
+
+        size = self._num_deltas
+        head = self._head[slots]
+        num_recorded = self._num_recorded[slots]
+        threshold = self.threshold_dist
+
+        # the oldest movement leaves the window once it is full
+        full = num_recorded == size
+        oldest = self._deltas[slots, head]
+        second_oldest = self._deltas[slots, (head + 1) % size]
+        self._num_over_threshold[slots] -= (full & (oldest > threshold))
+        if size > 1:
+            self._num_increases[slots] -= (full & (oldest < second_oldest))
+
+        # the new movement enters the window
+        latest = self._deltas[slots, (head - 1) % size]
+        self._num_over_threshold[slots] += (distances > threshold)
+        if size > 1:
+            self._num_increases[slots] += ((num_recorded > 0) & (latest < distances))
+        self._deltas[slots, head] = distances
+
+        self._head[slots] = (head + 1) % size
+        num_recorded = np.minimum(num_recorded + 1, size)
+        self._num_recorded[slots] = num_recorded
+        self.converged[slots] = (num_recorded == size) & ((self._num_over_threshold[slots] == 0) | (self._num_increases[slots] == 0))
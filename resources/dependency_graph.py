@@ -0,0 +1,128 @@
+from resources.containers import PositioningScenario
+
+import numpy as np
+
+class DependencyGraph:
+    """
+        Dependency graph of the triplets: every root has an edge to each of its two parents, since where a root
+        moves depends on where its parents are. Non-roots have no edges and never move.
+
+        Strongly connected components (SCCs) of the graph are groups of entities that depend on each other. Some of
+        them can only reach a degenerate equilibrium, which is what the game considers unresolvable:
+            - Scenario A: a root moves to the midpoint of its parents. If a group of roots that depend on each other
+              has at most one parent outside of the group (e.g. A picked B and C, and B picked A and C), the only
+              equilibrium is the whole group collapsed onto a single point.
+            - Scenario B: a root moves behind its second parent as seen from its first parent. Roots that use each
+              other as shields (directly or around a cycle) can never all be behind each other, and leapfrog until
+              they get pinned against the border of the map.
+
+        Entities are addressed by slot (index into the population list), like in TripletGraph.
+    """
+    def __init__(self, num_entities: int, scenario: PositioningScenario):
+        self._num_entities = num_entities
+        self._scenario = scenario
+        self.component_of = np.arange(num_entities, dtype=np.int64)   # SCC label of every slot
+        self.num_components = num_entities
+        self.unresolvable = np.zeros(num_entities, dtype=bool)
+        self.unresolvable_groups : list[list[int]] = []
+
+    @property
+    def num_unresolvable(self) -> int:
+        return int(np.count_nonzero(self.unresolvable))
+
+    def update(self, roots: np.ndarray, parents: np.ndarray) -> None:
+        """
+            Re-analyzes the graph given the slots of all roots (T,) and of their parents (T, 2), e.g. after
+            non-roots became roots.
+        """
+        successors = np.full((self._num_entities, 2), -1, dtype=np.int64)
+        successors[roots] = parents
+        self.component_of, self.num_components = _strongly_connected_components(successors)
+
+        if self._scenario == PositioningScenario.ScenarioA:
+            groups = self._collapsing_groups(successors)
+        else:
+            # only the edges to the entity used as a shield
+            shields = np.full((self._num_entities, 2), -1, dtype=np.int64)
+            shields[:, 0] = successors[:, 1]
+            shield_component_of, num_shield_components = _strongly_connected_components(shields)
+            sizes = np.bincount(shield_component_of, minlength=num_shield_components)
+            groups = [np.flatnonzero(shield_component_of == c) for c in np.flatnonzero(sizes > 1)]
+
+        self.unresolvable_groups = [group.tolist() for group in groups]
+        self.unresolvable = np.zeros(self._num_entities, dtype=bool)
+        for group in groups:
+            self.unresolvable[group] = True
+
+    def _collapsing_groups(self, successors: np.ndarray) -> list[np.ndarray]:
+        """
+            SCCs of more than one entity with at most one distinct parent outside of the SCC.
+        """
+        sources, position = np.nonzero(successors >= 0)
+        targets = successors[sources, position]
+        external = self.component_of[sources] != self.component_of[targets]
+
+        sizes = np.bincount(self.component_of, minlength=self.num_components)
+        # distinct (component, external parent) pairs, counted per component
+        pairs = np.unique(np.stack([self.component_of[sources[external]], targets[external]], axis=1), axis=0)
+        num_external_parents = np.bincount(pairs[:, 0], minlength=self.num_components) if len(pairs) > 0 else np.zeros(self.num_components, dtype=np.int64)
+        collapsing = np.flatnonzero((sizes > 1) & (num_external_parents <= 1))
+        return [np.flatnonzero(self.component_of == c) for c in collapsing]
+
+def _strongly_connected_components(successors: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+        Tarjan's algorithm (iterative, so that deep chains do not hit the recursion limit) over a graph where every
+        node has at most two successors, -1 meaning none. Returns the component label of every node and the number
+        of components.
+    """
+    num_nodes = len(successors)
+    successors = successors.tolist()
+    index_of = [-1] * num_nodes
+    lowlink = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    component_of = [-1] * num_nodes
+    stack = []
+    next_index = 0
+    num_components = 0
+
+    for start in range(num_nodes):
+        if index_of[start] >= 0:
+            continue
+        # call stack of (node, position of the next successor to visit)
+        call_stack = [(start, 0)]
+        index_of[start] = lowlink[start] = next_index
+        next_index += 1
+        stack.append(start)
+        on_stack[start] = True
+        while call_stack:
+            node, position = call_stack[-1]
+            if position < 2:
+                call_stack[-1] = (node, position + 1)
+                successor = successors[node][position]
+                if successor < 0:
+                    continue
+                if index_of[successor] < 0:
+                    index_of[successor] = lowlink[successor] = next_index
+                    next_index += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    call_stack.append((successor, 0))
+                elif on_stack[successor]:
+                    lowlink[node] = min(lowlink[node], index_of[successor])
+                continue
+
+            # all successors visited
+            call_stack.pop()
+            if call_stack:
+                parent = call_stack[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component_of[member] = num_components
+                    if member == node:
+                        break
+                num_components += 1
+
+    return np.array(component_of, dtype=np.int64), num_components
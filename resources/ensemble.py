@@ -0,0 +1,253 @@
+from resources.config import validate_params
+from resources.containers import GameSummary, PositioningScenario
+from resources.convergence import ConvergenceTracker
+from resources.game import Game
+from resources.logger import GameLogger, LEVELS
+from resources.population import PopulationStore
+from resources.random_streams import PROMOTION
+from resources.spatial_index import UniformGrid
+from resources.step_engine import step_scenario_a, step_scenario_b
+
+from copy import deepcopy
+from dataclasses import asdict
+import numpy as np
+import random
+
+UNRESOLVED_TIMESTEPS = 10   # games whose non-converged entities have not changed for this long cannot be resolved
+
+class Ensemble:
+    """
+        K independent games of the same configuration, one per random seed, played at once. Games never share
+        entities, so they are held as a single population of K x N entities, game k being rows k*N .. (k+1)*N-1
+        (parents are offset accordingly), and all of them are moved by a single call to the batched step engine.
+        Games are retired one by one as they end: their entities are frozen and no longer cost anything but masking.
+
+        Every game plays exactly like a vectorized Game with the same seed and parameters, and ends with the same
+        summary: games are set up by Game itself, and each game keeps its own random state (or random streams, see
+        rng_mode) for the non-roots that become roots along the way (the only random draws of a vectorized game once
+        it is set up).
+
+        Games are headless: gui, recorder, checkpoints, active sets, parallel workers and fast-forwards are not used.
+    """
+    def __init__(self, params: dict, seeds: list[int]):
+        errors = validate_params(params)
+        if len(errors) > 0:
+            raise ValueError(f"Invalid parameters: {'; '.join(errors)}")
+        self._seeds = list(seeds)
+        self._timesteps = params["timesteps"]
+        self._step_size = params["step_size"]
+        self._perception_radius = params["perception_radius"]
+        self._scenario = PositioningScenario.ScenarioA if params["positioning_scenario"] == "A" else PositioningScenario.ScenarioB
+        self._dist_behind = params.get("positioning_scenario_B", {}).get("dist_behind", 1.0)
+        self._freeze_unresolvable = params.get("dependency_analysis", {}).get("freeze_unresolvable", False)
+
+        logging_params = params.get("logging", {})
+        self._log = GameLogger(
+            level = LEVELS.get(logging_params.get("level", "info"), LEVELS["info"]),
+            quiet = logging_params.get("quiet", False),
+            progress_interval = logging_params.get("progress_interval", 1.0),
+            events_filepath = logging_params.get("events_filepath")
+        )
+        if any(params.get(key, {}).get("enable", False) for key in ("active_set", "fast_forward")) or params.get("parallel", {}).get("workers", 0) != 0:
+            self._log.warn(f"Active sets, fast-forwards and parallel workers are not used by ensembles")
+
+        self._log.info(f"Setting up {len(self._seeds)} games ..")
+        stores, self._not_roots, self._dependencies, self._random_states, self._random_streams = [], [], [], [], []
+        for seed in self._seeds:
+            game = Game(params=_game_params(params, seed))
+            stores.append(game._store)
+            self._not_roots.append(list(game._not_roots))
+            self._dependencies.append(game._dependencies)
+            self._random_states.append(random.getstate())
+            self._random_streams.append(game._random_streams)
+
+        self._num_games = len(stores)
+        self._num_entities = len(stores[0])
+        if any(len(store) != self._num_entities for store in stores):
+            raise ValueError("All games of an ensemble must have the same number of entities")
+        num_entities = self._num_entities
+
+        self._store = PopulationStore(
+            np.concatenate([store.positions for store in stores]),
+            np.concatenate([store.radii for store in stores]),
+            params["map_size"],
+            stores[0].history_n
+        )
+        self._store.is_root[:] = np.concatenate([store.is_root for store in stores])
+        offsets = np.repeat(np.arange(self._num_games) * num_entities, num_entities)[:, None]
+        parents = np.concatenate([store.parents for store in stores])
+        self._store.parents[:] = np.where(parents >= 0, parents + offsets, -1)
+        self._convergence_tracker = ConvergenceTracker(len(self._store), history_n=self._store.history_n)
+        self._store.convergence_tracker = self._convergence_tracker
+
+        self._frozen = np.zeros(len(self._store), dtype=bool)
+        if self._freeze_unresolvable:
+            self._frozen[:] = np.concatenate([dependencies.unresolvable for dependencies in self._dependencies])
+        self._log.info(f"{self._num_games} games of {num_entities} entities set up")
+
+    @property
+    def num_games(self) -> int:
+        return self._num_games
+
+    def run(self) -> list[GameSummary]:
+        """
+            Plays all games until each of them ends (all entities converged, the remaining ones cannot converge, or
+            the timesteps run out). Returns the summaries of the games, in the order of their seeds.
+        """
+        num_games, num_entities = self._num_games, self._num_entities
+        running = np.ones(num_games, dtype=bool)
+        num_timesteps = np.full(num_games, self._timesteps, dtype=np.int64)
+        cannot_be_resolved = np.zeros(num_games, dtype=bool)
+        previous_non_converged = np.zeros((num_games, num_entities), dtype=bool)
+        num_unchanged = np.zeros(num_games, dtype=np.int64)   # consecutive timesteps with the same non-converged entities
+
+        self._log.info(f"Running {num_games} games for {self._timesteps} timesteps ..")
+        for iter in range(self._timesteps):
+            if self._scenario == PositioningScenario.ScenarioA:
+                step_scenario_a(self._store, self._step_size, self._frozen)
+            else:
+                step_scenario_b(self._store, self._step_size, self._dist_behind, self._frozen)
+            converting = [k for k in np.flatnonzero(running) if len(self._not_roots[k]) > 0]
+            if len(converting) > 0:
+                self._convert_non_roots_to_roots(np.array(converting, dtype=np.int64), iter)
+
+            # game convergence checks, for all games at once
+            is_root = self._store.is_root.reshape(num_games, num_entities)
+            non_converged = is_root & ~self._convergence_tracker.converged.reshape(num_games, num_entities)
+            all_converged = running & ~np.any(non_converged, axis=1)
+            ended = all_converged.copy()
+            if self._freeze_unresolvable:
+                unresolvable = self._frozen.reshape(num_games, num_entities)
+                frozen_left = running & ~all_converged & ~np.any(non_converged & ~unresolvable, axis=1)
+                ended |= frozen_left
+                cannot_be_resolved |= frozen_left
+            unchanged = running & ~ended & np.all(non_converged == previous_non_converged, axis=1)
+            num_unchanged = np.where(unchanged, num_unchanged + 1, 1)
+            previous_non_converged = non_converged
+            stuck = running & ~ended & (num_unchanged >= UNRESOLVED_TIMESTEPS)
+            ended |= stuck
+            cannot_be_resolved |= stuck
+
+            if np.any(ended):
+                num_timesteps[ended] = iter + 1
+                running &= ~ended
+                # entities of games that ended no longer move
+                self._frozen.reshape(num_games, num_entities)[ended] = True
+            self._log.progress(lambda: f"\tTimestep {iter + 1} / {self._timesteps}: {np.count_nonzero(running)} / {num_games} games running")
+            if not np.any(running):
+                break
+
+        summaries = [self._get_game_summary(k, int(num_timesteps[k]), bool(cannot_be_resolved[k])) for k in range(num_games)]
+        self._log_summaries(summaries)
+        self._log.close()
+        return summaries
+
+    def _convert_non_roots_to_roots(self, games: np.ndarray, timestep: int) -> None:
+        """
+            Game._convert_non_roots_to_roots() for the given games, each drawing from its own random state or streams.
+        """
+        num_entities = self._num_entities
+        non_roots = [np.array(self._not_roots[k], dtype=np.int64) + k * num_entities for k in games]
+        offsets, neighbors = self._visible_entities(games, np.concatenate(non_roots))
+
+        query = 0
+        for k, game_non_roots in zip(games, non_roots):
+            offset = k * num_entities
+            new_triplets = []
+            if self._random_streams[k] is not None:
+                game_offsets = offsets[query:query + len(game_non_roots) + 1]
+                pairs = self._random_streams[k].sample_pairs(PROMOTION, timestep, game_non_roots - offset, game_offsets - game_offsets[0], neighbors[game_offsets[0]:game_offsets[-1]] - offset)
+                query += len(game_non_roots)
+                has_pair = pairs[:, 0] >= 0
+                new_triplets = np.column_stack([game_non_roots[has_pair] - offset, pairs[has_pair]]).tolist()
+            else:
+                random.setstate(self._random_states[k])
+                for index in game_non_roots:
+                    visible_indices = (neighbors[offsets[query]:offsets[query+1]] - offset).tolist()
+                    query += 1
+                    if len(visible_indices) < 2:
+                        continue
+                    new_triplets.append([int(index) - offset] + random.sample(visible_indices, 2))
+                self._random_states[k] = random.getstate()
+            if len(new_triplets) == 0:
+                continue
+
+            new_triplets = np.array(new_triplets, dtype=np.int64)
+            self._store.parents[offset + new_triplets[:, 0]] = offset + new_triplets[:, 1:]
+            self._store.parents_version += 1
+            self._store.is_root[offset + new_triplets[:, 0]] = True
+            new_root_ids = set(new_triplets[:, 0].tolist())
+            self._not_roots[k] = [i for i in self._not_roots[k] if i not in new_root_ids]
+            if self._freeze_unresolvable:
+                roots = np.flatnonzero(self._store.is_root[offset:offset + num_entities])
+                self._dependencies[k].update(roots, self._store.parents[offset + roots] - offset)
+                self._frozen[offset:offset + num_entities] = self._dependencies[k].unresolvable
+
+    def _visible_entities(self, games: np.ndarray, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Entities within the perception radius of every query entity, among entities of the same game, in the
+            compressed sparse row form of UniformGrid.query_radius() (entities being rows of the store).
+
+            Games are laid out side by side (far enough apart not to see each other) in a single grid. Distances are
+            computed again from the actual positions, exactly as UniformGrid does, so that shifting positions cannot
+            change which entities are visible through rounding.
+        """
+        num_entities = self._num_entities
+        radius = self._perception_radius
+        rows = (np.asarray(games, dtype=np.int64)[:, None] * num_entities + np.arange(num_entities)).ravel()
+        local_of = np.full(len(self._store), -1, dtype=np.int64)
+        local_of[rows] = np.arange(len(rows))
+
+        stride = self._store.map_size[0] + 2 * radius + 1.0
+        shifted = self._store.positions[rows].copy()
+        shifted[:, 0] += (rows // num_entities) * stride
+        grid = UniformGrid(shifted, radius)
+        offsets, neighbors = grid.query_radius(shifted[local_of[queries]], radius * (1 + 1e-9) + 1e-9, exclude=local_of[queries])
+
+        # neighbors are sorted by row, as are the rows of every game
+        query_ids = np.repeat(np.arange(len(queries)), np.diff(offsets))
+        neighbors = rows[neighbors]
+        dx = self._store.positions[queries[query_ids], 0] - self._store.positions[neighbors, 0]
+        dy = self._store.positions[queries[query_ids], 1] - self._store.positions[neighbors, 1]
+        keep = np.sqrt(dx ** 2 + dy ** 2) <= radius
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(query_ids[keep], minlength=len(queries)))])
+        return offsets, neighbors[keep]
+
+    def _get_game_summary(self, k: int, num_timesteps: int, cannot_be_resolved: bool) -> GameSummary:
+        rows = slice(k * self._num_entities, (k + 1) * self._num_entities)
+        num_converged = int(np.count_nonzero(self._store.is_root[rows] & self._convergence_tracker.converged[rows]))
+        num_non_roots = len(self._not_roots[k])
+        num_left_to_converge = self._num_entities - num_non_roots - num_converged
+        return GameSummary(
+            num_timesteps = num_timesteps,
+            num_entities = self._num_entities,
+            num_converged = num_converged,
+            num_non_roots = num_non_roots,
+            num_left_to_converge = num_left_to_converge,
+            all_converged = (num_left_to_converge == 0),
+            cannot_be_resolved = cannot_be_resolved
+        )
+
+    def _log_summaries(self, summaries: list[GameSummary]) -> None:
+        for seed, summary in zip(self._seeds, summaries):
+            self._log.info(lambda: f"Game (seed {seed}) ended after {summary.num_timesteps} timesteps: {summary.num_converged} converged, {summary.num_non_roots} non-roots, {summary.num_left_to_converge} left to converge{' (cannot be resolved)' if summary.cannot_be_resolved else ''}")
+            self._log.event("game_end", random_seed=seed, **asdict(summary))
+        num_all_converged = sum(summary.all_converged for summary in summaries)
+        self._log.info(f"\n{num_all_converged} / {len(summaries)} games have fully converged, in {np.mean([summary.num_timesteps for summary in summaries]):.1f} timesteps on average")
+
+def _game_params(params: dict, seed: int) -> dict:
+    """
+        Parameters of the game of an ensemble with the given seed: vectorized and headless.
+    """
+    params = deepcopy(params)
+    params["random_seed"] = seed
+    params["vectorized"] = True
+    params["gui"] = {**params.get("gui", {}), "enable": False}
+    params["recorder"] = {**params.get("recorder", {}), "enable": False}
+    params["save_directory"] = None
+    params["logging"] = {**params.get("logging", {}), "quiet": True, "events_filepath": None}
+    for key in ("active_set", "fast_forward", "equilibrium_solver"):
+        params[key] = {**params.get(key, {}), "enable": False}
+    params["parallel"] = {"workers": 0}
+    params["checkpoint"] = {**params.get("checkpoint", {}), "interval": 0}
+    return params
@@ -2,10 +2,17 @@
 from resources.containers import EntityPosition
 from resources.math_utils import euclidean_distance, distance_from_point_to_line_between_two_points, point_falls_between_two_points
 
-from copy import deepcopy
+from collections import deque
+
+DEFAULT_ENTITY_RADIUS = 0.3     # [m]
 
 class Entity:
-    def __init__(self, initial_position: EntityPosition, perception_radius: float, id: int, map_size: list[float, float], radius: float = 0.3):
+    __slots__ = (
+        "id", "radius", "perception_radius", "current_position", "_map_size", "_is_root",
+        "_initial_position", "_history_n", "_last_n_positions", "_convergence_tracker", "_tracker_slot"
+    )
+
+    def __init__(self, initial_position: EntityPosition, perception_radius: float, id: int, map_size: list[float, float], radius: float = DEFAULT_ENTITY_RADIUS):
         self.id = id
         self.radius = radius
         self.perception_radius = perception_radius
@@ -21,7 +28,19 @@ class Entity:
         # maintaing history
         self._initial_position = initial_position
         self._history_n = 5 # no. of positions to track
-        self._last_n_positions : list[EntityPosition] = [initial_position] # FIFO of fixed length
+        self._last_n_positions : deque[EntityPosition] = deque([initial_position], maxlen=self._history_n) # FIFO of fixed length
+
+        # optional shared tracker maintaining convergence state incrementally (see attach_convergence_tracker())
+        self._convergence_tracker = None
+        self._tracker_slot = None
+
+    def attach_convergence_tracker(self, tracker, slot: int) -> None:
+        """
+            Lets a ConvergenceTracker follow this entity's movements in row 'slot', after which has_converged()
+            is answered by the tracker instead of recomputing movement deltas from the tracked history.
+        """
+        self._convergence_tracker = tracker
+        self._tracker_slot = slot
 
     def has_converged(self, threshold_dist : float = 0.05) -> bool:
         """
@@ -29,13 +48,13 @@ class Entity:
             or have been following a non-increasing order i.e. distances covered have either decreased or stayed the same.
         """
 
+        if (self._convergence_tracker is not None) and (threshold_dist == self._convergence_tracker.threshold_dist):
+            return self._convergence_tracker.has_converged(self._tracker_slot)
+
         if len(self._last_n_positions) < self._history_n:
             return False
 
-        # grab pairs from history: https://stackoverflow.com/a/5764948/6010333
-        delta = []
-        for previous, next in zip(self._last_n_positions, self._last_n_positions[1:]):
-            delta.append(euclidean_distance(previous, next))
+        delta = self.get_movement_deltas()
 
         barely_moving = all(i <= threshold_dist for i in delta)
 
@@ -45,13 +64,15 @@ class Entity:
         return barely_moving or not_increasing
 
     def get_movement_deltas(self):
+        # grab pairs from history: https://stackoverflow.com/a/5764948/6010333
+        history = list(self._last_n_positions)
         delta = []
-        for previous, next in zip(self._last_n_positions, self._last_n_positions[1:]):
+        for previous, next in zip(history, history[1:]):
             delta.append(euclidean_distance(previous, next))
         return delta
 
     def get_tracking_history(self) -> list[EntityPosition]:
-        return self._last_n_positions
+        return list(self._last_n_positions)
 
     def is_root(self) -> bool:
         return self._is_root
@@ -62,7 +83,7 @@ class Entity:
     def mark_as_root(self):
         self._is_root = True
 
-    def move_somewhere_on_the_line_connecting(self, position_a: EntityPosition, position_b: EntityPosition, step_size: float = None) -> None:
+    def move_somewhere_on_the_line_connecting(self, position_a: EntityPosition, position_b: EntityPosition, step_size: float = None) -> bool:
         """
             Move towards the closest point on the line connecting position_a and position_b. This closest point on the line
             becomes the target_position for which move_towards() can be called.
@@ -75,7 +96,7 @@ class Entity:
         _, closest_point_on_line = distance_from_point_to_line_between_two_points(position_a, position_b, self.current_position)
         return self.move_towards(closest_point_on_line, step_size)
 
-    def move_towards(self, target_position: EntityPosition, step_size: float = None) -> None:
+    def move_towards(self, target_position: EntityPosition, step_size: float = None) -> bool:
         """
             Move towards a target_position from current_position, if not already there.
 
@@ -84,33 +105,46 @@ class Entity:
                 - If specified:
                     - if step_size is less than distance to target_position, only move step_size distance towards target_position
                     - if step_size is equal to or greater than distance to target_position, jump to target_position (overshooting cannot happen)
+
+            Returns True if the entity moved (i.e. its tracking history was updated), like all move_*() methods.
         """
 
-        # early return if already at target_position
-        if target_position == self.current_position:
-            return
+        return self._move_towards_xy(target_position.x, target_position.y, step_size, target_position)
 
-        # if step_size not specified, then update current_position to target_position and early return
-        if step_size is None:
-            self.update_current_position(target_position)
-            return
+    def _move_towards_xy(self, target_x: float, target_y: float, step_size: float = None, target_position: EntityPosition = None) -> bool:
+        """
+            move_towards() given the coordinates of target_position, so that callers computing a target do not have to
+            create a position object for it unless the entity ends up there. target_position is used if given.
+        """
+        current = self.current_position     # read once, since it may be created on every access (see EntityView)
+
+        # early return if already at target_position
+        if target_x == current.x and target_y == current.y:
+            return False
 
-        # since step_size has been specified, we want to take a step in the direction of target_position
-        dx = target_position.x - self.current_position.x
-        dy = target_position.y - self.current_position.y
-        vector = (dx, dy)
+        dx = target_x - current.x
+        dy = target_y - current.y
         distance = (dx ** 2 + dy ** 2) ** 0.5
 
-        if step_size >= distance:
-            self.update_current_position(target_position)     # we don't want to overshoot
+        # if step_size not specified, jump to target_position, otherwise take a step in its direction
+        if step_size is None or step_size >= distance:     # we don't want to overshoot
+            if target_position is None:
+                target_position = EntityPosition(x = target_x, y = target_y)
+            self.update_current_position(target_position)
         else:
-            unit_vector = tuple(i / distance for i in vector)
-            self.current_position.x += unit_vector[0] * step_size
-            self.current_position.y += unit_vector[1] * step_size
-            self.current_position = self._clamp_position(self.current_position)
-            self._update_tracking_history(self.current_position)
+            # a new position is created rather than mutating current_position in place, since current_position
+            # is also the latest entry in the tracking history (and may be backed by an array, see PopulationStore).
+            # It is clamped before being created, so that it is the only position allocated for this move.
+            map_size = self._map_size
+            new_position = EntityPosition(
+                x = max(0.0, min(current.x + (dx / distance) * step_size, map_size[0])),
+                y = max(0.0, min(current.y + (dy / distance) * step_size, map_size[1]))
+            )
+            self.current_position = new_position
+            self._update_tracking_history(new_position)
+        return True
 
-    def move_towards_halfway_between(self, position_a: EntityPosition, position_b: EntityPosition, step_size: float = None) -> None:
+    def move_towards_halfway_between(self, position_a: EntityPosition, position_b: EntityPosition, step_size: float = None) -> bool:
         """
             Move towards the halfway mark between position_a and position_b. The halfway mark
             becomes the target_position for which move_towards() can be called.
@@ -118,60 +152,54 @@ class Entity:
         if position_a == position_b:
             return self.move_towards(position_a, step_size)
 
-        halfway_mark = EntityPosition(
-            x = (position_a.x + position_b.x) / 2.0,
-            y = (position_a.y + position_b.y) / 2.0
-        )
+        return self._move_towards_xy((position_a.x + position_b.x) / 2.0, (position_a.y + position_b.y) / 2.0, step_size)
 
-        return self.move_towards(halfway_mark, step_size)
-
-    def move_behind_entity(self, shield_from: EntityPosition, use_as_shield: EntityPosition, step_size: float = None, dist_behind: float = None) -> None:
+    def move_behind_entity(self, shield_from: EntityPosition, use_as_shield: EntityPosition, step_size: float = None, dist_behind: float = None) -> bool:
         if shield_from == use_as_shield:
-            return
+            return False
 
         if point_falls_between_two_points(endpoint_a=shield_from, endpoint_b=self.current_position, some_point=use_as_shield):
-            self.move_somewhere_on_the_line_connecting(shield_from, use_as_shield, step_size)
+            return self.move_somewhere_on_the_line_connecting(shield_from, use_as_shield, step_size)
         else:
             # create vector pointing FROM shield_from TO use_as_shield 
             dx = use_as_shield.x - shield_from.x
             dy = use_as_shield.y - shield_from.y
-            vector = (dx, dy)
             distance = (dx ** 2 + dy ** 2) ** 0.5
-            unit_vector = tuple(i / distance for i in vector)
-            # find position dist_behind relative to use_as_shield in the direction of the vector
-            target_position = EntityPosition(
-                x = use_as_shield.x + (unit_vector[0] * dist_behind),
-                y = use_as_shield.x + (unit_vector[1] * dist_behind)
+            # find position dist_behind relative to use_as_shield in the direction of the vector, and move there
+            return self._move_towards_xy(
+                use_as_shield.x + ((dx / distance) * dist_behind),
+                use_as_shield.y + ((dy / distance) * dist_behind),
+                step_size
             )
-            # move to that position
-            self.move_towards(target_position, step_size)
 
     def update_current_position(self, position: EntityPosition) -> None:
         """
-            Updates entity's current position and updates tracking history
+            Updates entity's current position and updates tracking history, both with the position clamped to the map
         """
-        self.current_position = self._clamp_position(position)
+        position = self._clamp_position(position)
+        self.current_position = position
         self._update_tracking_history(position)
 
     def _clamp_position(self, position: EntityPosition) -> EntityPosition:
         """
-            Clamps entity's position to be inside the map.
+            Clamps entity's position to be inside the map. Positions are never mutated (see EntityPosition),
+            so a position that is already inside the map is returned as is and only one outside of it is copied.
         """
-        p = deepcopy(position)
-
-        p.x = max(0.0, min(p.x, self._map_size[0]))
-        p.y = max(0.0, min(p.y, self._map_size[1]))
+        x = max(0.0, min(position.x, self._map_size[0]))
+        y = max(0.0, min(position.y, self._map_size[1]))
+        if x == position.x and y == position.y:
+            return position
 
-        return p
+        return EntityPosition(x = x, y = y)
 
     def _update_tracking_history(self, position: EntityPosition) -> None:
         """
             Stores last N positions of entity thereby tracking history
         """
-        if len(self._last_n_positions) >= self._history_n:
-            self._last_n_positions.pop(0)
+        if self._convergence_tracker is not None:
+            self._convergence_tracker.record_one(self._tracker_slot, euclidean_distance(self._last_n_positions[-1], position))
 
-        self._last_n_positions.append(position)
+        self._last_n_positions.append(position)     # deque drops the oldest position once full
 
 
     def __repr__(self) -> str:
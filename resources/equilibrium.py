@@ -0,0 +1,158 @@
+from resources.containers import EquilibriumSolution
+
+import numpy as np
+
+METHODS = ["jacobi", "cg"]
+
+def solve_equilibrium(
+    positions: np.ndarray,
+    roots: np.ndarray,
+    parents: np.ndarray,
+    component_of: np.ndarray,
+    map_size: list[float, float],
+    fixed: np.ndarray = None,
+    method: str = "cg",
+    tolerance: float = 1e-9,
+    max_iterations: int = 10000
+) -> EquilibriumSolution:
+    """
+        Scenario A: the game has settled once every root sits halfway between its parents, i.e. once the positions of
+        the roots solve the sparse linear system
+            x_r - (x_a + x_b) / 2 = 0     for every root r of parents a and b
+        non-roots (and roots in the optional fixed mask, e.g. frozen ones) keeping their current positions.
+
+        The system is solved for both coordinates at once, starting from the current positions:
+            - jacobi: every root jumps to the midpoint of its parents, all at once (the game with no step size limit)
+            - cg: conjugate gradients on the normal equations, as the system is not symmetric. Converges in far fewer
+              iterations than jacobi when roots depend on each other along long chains.
+        Positions are clamped to the map, which only matters for rounding: midpoints of positions inside the map are
+        inside the map.
+
+        Groups of roots that depend on each other without any parent outside of the group (component_of labels the
+        strongly connected components of the dependency graph, see DependencyGraph) make the system singular: any
+        common point is a solution. They are placed at the centroid of their current positions, and reported along
+        with the roots depending on them, whose solution follows from that choice.
+
+        Entities are addressed by slot (index into the population list), like in TripletGraph.
+    """
+    num_entities = len(positions)
+    x = np.array(positions, dtype=np.float64)
+    fixed = np.zeros(num_entities, dtype=bool) if fixed is None else fixed.copy()
+    unknown = np.zeros(num_entities, dtype=bool)
+    unknown[roots] = True
+    unknown &= ~fixed
+    parents_of = np.full((num_entities, 2), -1, dtype=np.int64)
+    parents_of[roots] = parents
+
+    # singular groups: components of roots with no parent outside of the component (nor fixed)
+    sources = np.flatnonzero(unknown)
+    num_components = int(component_of.max()) + 1 if num_entities > 0 else 0
+    external = np.zeros(num_components, dtype=bool)
+    for k in range(2):
+        targets = parents_of[sources, k]
+        np.logical_or.at(external, component_of[sources], (component_of[targets] != component_of[sources]) | fixed[targets])
+    has_unknowns = np.bincount(component_of[sources], minlength=num_components) > 0
+    singular_groups = [np.flatnonzero(unknown & (component_of == c)) for c in np.flatnonzero(has_unknowns & ~external)]
+    for group in singular_groups:
+        x[group] = x[group].mean(axis=0)
+        unknown[group] = False
+        fixed[group] = True
+
+    # roots whose solution depends on where singular groups were placed
+    undetermined = np.zeros(num_entities, dtype=bool)
+    for group in singular_groups:
+        undetermined[group] = True
+    while len(singular_groups) > 0:
+        spread = unknown & ~undetermined & np.any(undetermined[np.maximum(parents_of, 0)] & (parents_of >= 0), axis=1)
+        if not np.any(spread):
+            break
+        undetermined |= spread
+
+    solve = _jacobi if method == "jacobi" else _conjugate_gradients
+    ids = np.flatnonzero(unknown)
+    num_iterations = solve(x, ids, parents_of[ids], map_size, tolerance, max_iterations) if len(ids) > 0 else 0
+
+    residual = _residuals(x, ids, parents_of[ids])
+    max_residual = float(residual.max()) if len(ids) > 0 else 0.0
+    return EquilibriumSolution(
+        positions = x,
+        num_iterations = num_iterations,
+        residual = max_residual,
+        converged = max_residual <= tolerance,
+        singular_groups = [group.tolist() for group in singular_groups],
+        undetermined = undetermined
+    )
+
+def _residuals(x: np.ndarray, ids: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """
+        Distance of every root to the midpoint of its parents.
+    """
+    delta = x[ids] - (x[parents[:, 0]] + x[parents[:, 1]]) / 2.0
+    return np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+
+def _jacobi(x: np.ndarray, ids: np.ndarray, parents: np.ndarray, map_size: list[float, float], tolerance: float, max_iterations: int) -> int:
+    """
+        Solves in place, returns the number of iterations.
+    """
+    for iteration in range(max_iterations):
+        new = np.clip((x[parents[:, 0]] + x[parents[:, 1]]) / 2.0, 0.0, map_size)
+        # the distance every root jumps is its residual
+        delta = new - x[ids]
+        if np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2).max() <= tolerance:
+            return iteration
+        x[ids] = new
+    return max_iterations
+
+def _conjugate_gradients(x: np.ndarray, ids: np.ndarray, parents: np.ndarray, map_size: list[float, float], tolerance: float, max_iterations: int) -> int:
+    """
+        Solves A u = b in place for the (n, 2) positions u of the roots being solved for, with A = I - (S_a + S_b) / 2,
+        S_a (resp. S_b) selecting the first (resp. second) parent of every root when it is being solved for, and b
+        holding half the sum of the positions of the other parents. CG is run on A^T A u = A^T b (CGNR), every
+        coordinate being its own system. Returns the number of iterations.
+    """
+    n = len(ids)
+    local_of = np.full(len(x), -1, dtype=np.int64)
+    local_of[ids] = np.arange(n)
+    local = local_of[parents]           # (n, 2) index of every parent among the unknowns, -1 if known
+    is_unknown = local >= 0
+    b = np.zeros((n, 2))
+    for k in range(2):
+        b += np.where(is_unknown[:, k, None], 0.0, x[parents[:, k]]) / 2.0
+
+    def matvec(u: np.ndarray) -> np.ndarray:
+        result = u.copy()
+        for k in range(2):
+            result[is_unknown[:, k]] -= u[local[is_unknown[:, k], k]] / 2.0
+        return result
+
+    def rmatvec(w: np.ndarray) -> np.ndarray:
+        result = w.copy()
+        for k in range(2):
+            rows = is_unknown[:, k]
+            for axis in range(2):
+                result[:, axis] -= np.bincount(local[rows, k], weights=w[rows, axis], minlength=n) / 2.0
+        return result
+
+    u = x[ids].copy()
+    r = b - matvec(u)
+    z = rmatvec(r)
+    p = z.copy()
+    z_norm = np.sum(z ** 2, axis=0)
+    iteration = 0
+    while iteration < max_iterations and np.sqrt(np.sum(r ** 2, axis=1)).max() > tolerance:
+        iteration += 1
+        w = matvec(p)
+        w_norm = np.sum(w ** 2, axis=0)
+        alpha = np.divide(z_norm, w_norm, out=np.zeros(2), where=w_norm > 0)
+        u += alpha * p
+        r -= alpha * w
+        z = rmatvec(r)
+        new_z_norm = np.sum(z ** 2, axis=0)
+        beta = np.divide(new_z_norm, z_norm, out=np.zeros(2), where=z_norm > 0)
+        p = z + beta * p
+        z_norm = new_z_norm
+        if not np.any(w_norm > 0):
+            break
+
+    x[ids] = np.clip(u, 0.0, map_size)
+    return iteration
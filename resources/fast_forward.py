@@ -0,0 +1,108 @@
+from resources.population import PopulationStore
+from resources.step_engine import movable_roots
+
+import heapq
+import numpy as np
+
+def predictable_movers(store: PopulationStore, frozen: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Scenario A: if none of the roots that are about to move is a parent of a root, every parent stays where it is,
+        and every moving root travels in a straight line towards a fixed halfway mark until it gets there.
+        Returns the IDs of the moving roots and their (M, 2) targets in that case, None otherwise.
+    """
+    roots = movable_roots(store, frozen)
+    parents = store.parents[roots]
+    targets = (store.positions[parents[:, 0]] + store.positions[parents[:, 1]]) / 2.0
+    moving = np.any(targets != store.positions[roots], axis=1)
+
+    is_moving = np.zeros(len(store), dtype=bool)
+    is_moving[roots[moving]] = True
+    if np.any(is_moving[parents]):
+        return None
+    return roots[moving], targets[moving]
+
+class StraightLineMotion:
+    """
+        Closed form of entities moving from start towards a fixed target by step_size per timestep, as
+        move_towards_batch() does: after j timesteps, an entity is at start + j * step_size along the line to its
+        target, until it arrives there after num_steps = ceil(distance / step_size) timesteps and stops.
+
+        Arrivals are kept in a priority queue of (timestep, IDs arriving), timesteps being counted from the start.
+        Positions match stepping one timestep at a time up to floating point rounding.
+    """
+    def __init__(self, ids: np.ndarray, start: np.ndarray, target: np.ndarray, step_size: float = None):
+        self.ids = ids
+        self._start = start
+        self._target = target
+
+        delta = target - start
+        distance = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+        self._unit = delta / np.where(distance > 0, distance, 1.0)[:, None]
+        self._step_size = step_size
+        # without a step size, entities jump to their target
+        self.num_steps = np.ones(len(ids), dtype=np.int64) if step_size is None else np.maximum(1, np.ceil(distance / step_size)).astype(np.int64)
+
+        self._arrivals = [(int(t), ids[self.num_steps == t]) for t in np.unique(self.num_steps)]
+        heapq.heapify(self._arrivals)
+
+    def pop_arrivals(self, timestep: int) -> np.ndarray:
+        """
+            Removes and returns the IDs of entities arriving at or before the given timestep.
+        """
+        arrived = [np.zeros(0, dtype=np.int64)]
+        while self._arrivals and self._arrivals[0][0] <= timestep:
+            arrived.append(heapq.heappop(self._arrivals)[1])
+        return np.concatenate(arrived)
+
+    def distances_at(self, steps: np.ndarray) -> np.ndarray:
+        """
+            Distance covered by every entity during its given timestep (one per entity, or one for all): step_size
+            until the last one, which covers what remains (at most step_size), and 0 once arrived. Exact values are used
+            rather than differences of positions, so that convergence is assessed the same way regardless of rounding.
+        """
+        steps = np.broadcast_to(np.asarray(steps, dtype=np.int64), (len(self.ids),))
+        last = self._target - self.positions_at(self.num_steps - 1)
+        remaining = np.sqrt(last[:, 0] ** 2 + last[:, 1] ** 2)
+        if self._step_size is not None:
+            remaining = np.minimum(remaining, self._step_size)
+        distances = np.where(steps < self.num_steps, self._step_size or 0.0, remaining)
+        return np.where((steps >= 1) & (steps <= self.num_steps), distances, 0.0)
+
+    def positions_at(self, steps: np.ndarray) -> np.ndarray:
+        """
+            (M, 2) positions of the entities after the given number of timesteps (one per entity, or one for all).
+        """
+        steps = np.broadcast_to(np.asarray(steps, dtype=np.int64), (len(self.ids),))
+        if self._step_size is None:
+            travelled = np.zeros(len(self.ids))
+        else:
+            travelled = steps * self._step_size
+        positions = self._start + self._unit * travelled[:, None]
+        arrived = steps >= self.num_steps
+        positions[arrived] = self._target[arrived]
+        return positions
+
+def advance(store: PopulationStore, motion: StraightLineMotion, num_steps: int) -> None:
+    """
+        Moves the entities of a StraightLineMotion by num_steps timesteps at once. Only the last H positions reached
+        are pushed to the tracking histories, and their distances to the store's convergence tracker, which is all that
+        remains of stepping one timestep at a time: the history keeps H positions and the tracker the H-1 distances
+        between them.
+    """
+    num_moves = np.minimum(motion.num_steps, num_steps)
+    history_n = store.history_n
+    tracker = store.convergence_tracker
+    store.convergence_tracker = None    # fed with exact distances below (see StraightLineMotion.distances_at())
+    try:
+        for offset in range(history_n):
+            move = num_moves - (history_n - 1) + offset
+            valid = move >= 1
+            if not np.any(valid):
+                continue
+            ids = motion.ids[valid]
+            store.positions[ids] = motion.positions_at(move)[valid]
+            store.push_history(ids)
+            if tracker is not None:
+                tracker.record_many(ids, motion.distances_at(move)[valid])
+    finally:
+        store.convergence_tracker = tracker
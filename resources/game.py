@@ -1,19 +1,49 @@
-from resources.containers import EntityPosition, PositioningScenario, PositionScenerioBParams, GuiParams
-from resources.entity import Entity
+from resources.active_set import ActiveSet
+from resources.checkpoint import save_checkpoint, load_checkpoint, load_positions, pack_ragged, unpack_ragged
+from resources.config import GameConfig, apply_overrides, validate_params
+from resources.containers import EntityPosition, PositioningScenario, PositionScenerioBParams, GuiParams, RecorderParams, ProfilingParams, CheckpointParams, EquilibriumSolverParams, EquilibriumSolution, GameSummary
+from resources.convergence import ConvergenceTracker
+from resources.dependency_graph import DependencyGraph
+from resources.equilibrium import METHODS as EQUILIBRIUM_METHODS, solve_equilibrium
+from resources.fast_forward import StraightLineMotion, advance, predictable_movers
+from resources.entity import Entity, DEFAULT_ENTITY_RADIUS
+from resources.instrumentation import Instrumentation
+from resources.logger import GameLogger, LEVELS, DEBUG
+from resources.population import PopulationStore
+from resources.random_streams import RandomStreams, SPAWN, TRIPLETS, PROMOTION, STEP_ORDER
+from resources.recorder import TrajectoryRecorder
+from resources.spawning import Spawner
+from resources.step_engine import step_scenario_a, step_scenario_b
+from resources.step_view import StepView
 from resources.validity_checker import CollisionChecker
-from resources.visualization import visualize_scene, visualize_triplets
-from resources.math_utils import euclidean_distance, distance_from_point_to_line_between_two_points
+from resources.spatial_index import UniformGrid
+from resources.triplet_graph import TripletGraph
 
-import yaml
-from copy import deepcopy
+import numpy as np
+from collections import deque
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Callable, Iterator
 import os
 import random
 
+if TYPE_CHECKING:
+    from resources.parallel_step import ParallelStepper
+
 def generate_random_position(map_size: list[float, float]) -> EntityPosition:
     return EntityPosition(x=random.uniform(0, map_size[0]), y=random.uniform(0, map_size[1]))
 
 class Game:
-    def __init__(self, config_filepath: str):
+    def __init__(self, config_filepath: str = None, params: dict | GameConfig = None, checkpoint: dict = None):
+        """
+            Configured either from a YAML config file (see config/params.yaml), or from a params dictionary holding
+            the same keys or a GameConfig, which lets batch jobs create games without touching disk. Headless games
+            never load matplotlib.
+
+            If a checkpoint (see load_checkpoint()) is given, the population, triplets and random state are restored
+            from it instead of being created, and the game continues from the timestep it was saved at (see resume()).
+
+            Raises ValueError if the parameters are invalid.
+        """
         self._num_entities = None
         self._timesteps = None
         self._map_size = None
@@ -22,23 +52,282 @@ class Game:
         self._positioning_scenario = None
         self._positioning_scenario_B_params = None
         self._gui_params = None
+        self._recorder_params = None
+        self._profiling_params = None
         self._max_perception_radius = None
-        if not self._init_config(config_filepath):
-            print(f"[ERROR] Cannot continue with game initialization, configs could not be loaded from {config_filepath}")
-            return
+        self._random_seed = None
+        self._random_streams : RandomStreams = None
+        self._spawn_mode = None
+        self._vectorized = False
+        self._parallel_workers = 0
+        self._parallel_stepper : "ParallelStepper" = None
+        self._freeze_unresolvable = False
+        self._active_set_params = None
+        self._active_set : ActiveSet = None
+        self._fast_forward_enabled = False
+        self._equilibrium_params : EquilibriumSolverParams = None
+        self._observers : list[Callable[[StepView], None]] = []
+        self._stop_requested = False
+        self._summary : GameSummary = None
+        self._initial_positions_filepath = None
+        self._checkpoint_params = None
+        self._params = None
+        self._start_timestep = 0
+        self._recent_non_converged_ids : list[list[int]] = []
+        self._store : PopulationStore = None
+        self._instrumentation = Instrumentation()
+        self._log = GameLogger()    # replaced by one configured from the parameters once they are loaded
+        self._config_errors : list[str] = []
+        if not self._init_config(config_filepath, params):
+            message = f"Cannot continue with game initialization, configs could not be loaded from {config_filepath if params is None else 'params'}"
+            self._log.error(message)
+            self._log.close()
+            raise ValueError(f"{message}: {'; '.join(self._config_errors)}" if len(self._config_errors) > 0 else message)
 
         self._collision_checker = CollisionChecker()
 
-        self._population = self._create_population()
+        with self._instrumentation.phase("create_population"):
+            if checkpoint is not None:
+                self._population = self._population_from_positions(checkpoint["positions"])
+            elif self._initial_positions_filepath is not None:
+                self._log.info(f"Creating a population from positions in {self._initial_positions_filepath} ..")
+                self._population = self._population_from_positions(load_positions(self._initial_positions_filepath))
+                self._log.info(f"Population created")
+            else:
+                self._population = self._create_population()
+            self._num_entities = len(self._population)
+        if self._vectorized:
+            # entities become views into the array-backed store so that the population can be stepped in batches
+            self._store = PopulationStore.from_entities(self._population, self._map_size)
+            self._population = self._store.views(self._max_perception_radius, self._map_size)
+
+        with self._instrumentation.phase("create_triplets"):
+            if checkpoint is not None:
+                triplets, self._not_roots = checkpoint["triplets"].tolist(), checkpoint["not_roots"].tolist()
+                for id in self._not_roots:
+                    self._population[id].mark_as_not_root()
+            else:
+                triplets, self._not_roots = self._create_triplets()
+        self._triplets = TripletGraph([entity.id for entity in self._population], triplets)
+        if self._store is not None:
+            self._store.set_parents(triplets)
+        self._dependencies = DependencyGraph(len(self._population), self._positioning_scenario)
+        self._analyze_dependencies()
+        if self._active_set_params.get("enable", False):
+            self._active_set = ActiveSet(len(self._population), epsilon=self._active_set_params.get("epsilon", 0.0))
+            self._active_set.update(self._triplets.roots, self._triplets.parents)
+
+        # convergence state of all entities is maintained incrementally in a shared tracker as they move
+        self._convergence_tracker = ConvergenceTracker(len(self._population), history_n=self._population[0]._history_n)
+        if self._store is not None:
+            self._store.convergence_tracker = self._convergence_tracker
+        for slot, entity in enumerate(self._population):
+            entity.attach_convergence_tracker(self._convergence_tracker, slot)
+
+        if checkpoint is not None:
+            self._restore_checkpoint(checkpoint)
+        else:
+            if self._equilibrium_params.enabled:
+                solution = self.solve_equilibrium()
+                if self._equilibrium_params.warm_start:
+                    self._warm_start(solution)
+            if self._gui_params.enabled and self._save_directory is not None:
+                # imported here so that headless games never load matplotlib
+                from resources.visualization import visualize_triplets
+                with self._instrumentation.phase("render"):
+                    visualize_triplets(self._map_size, self._population, block=False, title="INITIAL STATE", save_filepath=os.path.join(self._save_directory, "INITIAL STATE"))
+
+        self._log.info(f"Game initialized!")
+
+    @classmethod
+    def resume(cls, checkpoint_filepath: str, params: dict | GameConfig = None, overrides: dict = None) -> "Game":
+        """
+            Creates a game that continues from a checkpoint saved by save_checkpoint(). The parameters saved with the
+            checkpoint are used unless others are given (e.g. with more timesteps or a different gui setting), with
+            the optional overrides (dotted keys address nested parameters) applied to them.
+        """
+        checkpoint = load_checkpoint(checkpoint_filepath)
+        if params is None:
+            params = checkpoint["params"]
+        if overrides:
+            params = apply_overrides(params.to_dict() if isinstance(params, GameConfig) else params, overrides)
+        return cls(params=params, checkpoint=checkpoint)
+
+    def save_checkpoint(self, filepath: str) -> None:
+        """
+            Saves positions, tracking histories, root flags, triplets, convergence state, the current timestep and
+            the random state as a single compressed NumPy archive, from which the game can be resumed.
+        """
+        histories, history_lengths = self._get_histories()
+        recent_ids, recent_lengths = pack_ragged(self._recent_non_converged_ids)
+        save_checkpoint(filepath, {
+            "params": self._params,
+            "random_state": random.getstate(),
+            "timestep": self._start_timestep,
+            "positions": self._get_positions(),
+            "histories": histories,
+            "history_lengths": history_lengths,
+            "not_roots": np.asarray(self._not_roots, dtype=np.int64),
+            "triplets": self._triplets.to_array(),
+            "recent_non_converged_ids": recent_ids,
+            "recent_non_converged_lengths": recent_lengths,
+            **{f"tracker_{key}": value for key, value in self._convergence_tracker.get_state().items()}
+        })
+
+    def solve_equilibrium(self) -> EquilibriumSolution:
+        """
+            Scenario A: solves for the positions the game settles at with the current triplets (see
+            resources/equilibrium.py), without moving the population. Non-roots keep their positions, although some of
+            them may become roots as the game is played. Returns None for scenario B.
+        """
+        if self._positioning_scenario != PositioningScenario.ScenarioA:
+            self._log.error(f"The equilibrium solver only applies to positioning scenario A")
+            return None
+
+        params = self._equilibrium_params
+        frozen = self._dependencies.unresolvable if self._freeze_unresolvable else None
+        with self._instrumentation.phase("solve_equilibrium"):
+            solution = solve_equilibrium(
+                self._get_positions(),
+                self._triplets.roots,
+                self._triplets.parents,
+                self._dependencies.component_of,
+                self._map_size,
+                fixed = frozen,
+                method = params.method,
+                tolerance = params.tolerance,
+                max_iterations = params.max_iterations
+            )
+
+        if solution.converged:
+            self._log.info(f"Equilibrium solved ({params.method}) in {solution.num_iterations} iterations, residual: {solution.residual:.3e}m")
+        else:
+            self._log.warn(f"Equilibrium solver ({params.method}) did not converge within {params.max_iterations} iterations, residual: {solution.residual:.3e}m")
+        if len(solution.singular_groups) > 0:
+            num_singular = sum(len(group) for group in solution.singular_groups)
+            self._log.info(f"\t{num_singular} entities in {len(solution.singular_groups)} groups depend on each other only and can settle anywhere (placed at their centroid), {int(np.count_nonzero(solution.undetermined)) - num_singular} other roots depend on where they do")
+            self._log.debug(lambda: f"\t\tSingular groups: {[self._triplets.ids_of(group) for group in solution.singular_groups]}")
+        # the IDs of the event are only looked up if events are saved
+        if self._log.has_events:
+            self._log.event(
+                "equilibrium",
+                method = params.method,
+                num_iterations = solution.num_iterations,
+                residual = solution.residual,
+                converged = solution.converged,
+                singular_groups = [self._triplets.ids_of(group) for group in solution.singular_groups],
+                undetermined = self._triplets.ids_of(np.flatnonzero(solution.undetermined))
+            )
+        return solution
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """
+            Per-phase timers and counters, per timestep and in total (see resources/instrumentation.py).
+        """
+        return self._instrumentation
+
+    def run(self) -> GameSummary:
+        """
+            Runs the game until all entities converge, the remaining ones cannot converge, or the timesteps run out.
+            Returns a summary of the end state (None if the game cannot be played).
+
+            If enabled, the run is profiled with cProfile and its stats are dumped to a file, and per-phase
+            timings are saved as JSON.
+        """
+        if not self._profiling_params.cprofile:
+            summary = self._run()
+        else:
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            summary = profiler.runcall(self._run)
+            profiler.dump_stats(self._profiling_params.cprofile_filepath)
+            self._log.info(f"Profile saved to {self._profiling_params.cprofile_filepath}")
+            if self._log.is_enabled_for(DEBUG):
+                pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+        self._log.info(lambda: repr(self._instrumentation))
+        if self._profiling_params.timings_filepath is not None:
+            self._instrumentation.to_json(self._profiling_params.timings_filepath)
+            self._log.info(f"Timings saved to {self._profiling_params.timings_filepath}")
+        return summary
+
+    def iter_steps(self) -> Iterator[StepView]:
+        """
+            Runs the game like run(), yielding a StepView after every timestep (a single one for the timesteps skipped by
+            a fast-forward). Breaking out of the loop stops the game right away, without the end-of-game summary;
+            stop() ends it after the current timestep with a summary, which is then available as Game.summary.
+
+            Example:
+                for view in game.iter_steps():
+                    spread = view.positions[view.is_root].std(axis=0)
+        """
+        return self._play(make_views=True)
+
+    def view(self) -> StepView:
+        """
+            Read-only view of the current state of the game, e.g. before it is played (see iter_steps()).
+        """
+        converged = self._convergence_tracker.converged
+        return StepView(
+            timestep = self._start_timestep,
+            num_converged = self._get_num_converged_entities(),
+            num_active = self._num_entities - len(self._not_roots),
+            new_root_ids = [],
+            get_positions = self._get_positions,
+            root_mask = self._triplets.root_mask,
+            converged = converged,
+            previous_converged = converged,
+            ids_of = self._triplets.ids_of
+        )
+
+    def add_observer(self, observer: Callable[[StepView], None]) -> None:
+        """
+            Registers a callback that is given a StepView after every timestep, whether the game is run with run()
+            or iter_steps(). Observers can end the game by calling stop().
+        """
+        self._observers.append(observer)
+
+    def stop(self) -> None:
+        """
+            Ends the game once the current timestep is over.
+        """
+        self._stop_requested = True
+
+    def close(self) -> None:
+        """
+            Closes the stream of events, if any. This happens by itself once the game has ended, but not if it is
+            dropped before (e.g. after breaking out of iter_steps()), hence games can also be used in a with statement.
+        """
+        self._log.close()
 
-        self._triplets, self._not_roots = self._create_triplets()
-        visualize_triplets(self._map_size, self._population, block=False, title="INITIAL STATE", save_filepath=os.path.join(self._save_directory, "INITIAL STATE"), timeout=self._gui_params.delay, on_keypress=self._gui_params.on_keypress)
+    def __enter__(self) -> "Game":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.close()
+        return False
+
+    @property
+    def summary(self) -> GameSummary:
+        """
+            Summary of the game once it has ended, None until then.
+        """
+        return self._summary
 
-        print(f"Game initialized!")
+    def _run(self) -> GameSummary:
+        for _ in self._play(make_views=False):
+            pass
+        return self._summary
 
-    def run(self):
+    def _play(self, make_views: bool) -> Iterator[StepView]:
+        """
+            Plays the game. After every timestep, the observers are called with its state, which is also yielded
+            if make_views is set (None is yielded otherwise, and no state is gathered if there are no observers).
+        """
         if len(self._triplets) == 0:
-            print("No triplets found, game cannot be played")
+            self._log.info("No triplets found, game cannot be played")
             return
 
         """
@@ -47,96 +336,327 @@ class Game:
             The IDs of non-converged entities per step are tracked, and if they have not changed for the last N steps,
             it can be assumed those entities are in a state that cannot be resolved.
         """
-        last_n_non_converged_ids : list[list[int]] = []
-        last_n = 10
         cannot_be_resolved = False
 
-        start_state = deepcopy(self._population)
-        
-        print(f"Running game for {self._timesteps} timesteps ..")
-        for iter in range(self._timesteps):
-            # step the game: this is where all entities move
-            self._step()
-
-            # after entities have moved, convert non-roots to roots, if applicable
-            self._convert_non_roots_to_roots()
-
-            # rendering
-            if self._gui_params.enabled:
-                title = f"Iteration_{iter+1}"
-                if iter == (self._timesteps - 1):
-                    title += "_FINAL_STATE"
-                visualize_triplets(self._map_size, self._population, block=True, title=title, save_filepath=os.path.join(self._save_directory, title), timeout=self._gui_params.delay, on_keypress=self._gui_params.on_keypress)
-
-            # game convergence check
-            num_converged_entities = self._get_num_converged_entities()
-            active_entities = self._num_entities - len(self._not_roots)
-            non_converged_ids = self._get_ids_non_converged_entities()
-            # print(f"\tTimestep {iter+1} / {self._timesteps}: {num_converged_entities} / {active_entities} have converged\r", end='', flush=True)
-            print(f"\tTimestep {iter+1} / {self._timesteps}: {num_converged_entities} / {active_entities} have converged. Ids left to converge: {non_converged_ids}")
-            if num_converged_entities == active_entities:
-                print("\nALL ENTITIES HAVE CONVERGED")
-                break
-            if len(last_n_non_converged_ids) >= last_n:
-                last_n_non_converged_ids.pop(0)
-            last_n_non_converged_ids.append(non_converged_ids)
-            if len(last_n_non_converged_ids) == last_n:
-                cannot_be_resolved = all(ids == last_n_non_converged_ids[0] for ids in last_n_non_converged_ids[1:])
-                if cannot_be_resolved:
-                    print(f"\nENTITIES LEFT TO CONVERGE CANNOT CONVERGE: {non_converged_ids}")
+        renderer = None
+        if self._gui_params.enabled:
+            from resources.visualization import TripletRenderer
+            renderer = TripletRenderer(
+                self._map_size,
+                [entity.id for entity in self._population],
+                queue_size=self._gui_params.frame_queue_size,
+                drop_frames_when_behind=self._gui_params.drop_frames_when_behind
+            )
+
+        recorder = None
+        if self._recorder_params.enabled:
+            recorder = TrajectoryRecorder(
+                self._recorder_params.filepath,
+                [entity.id for entity in self._population],
+                max_timesteps=self._timesteps + 1,
+                map_size=self._map_size,
+                metadata={"positioning_scenario": self._positioning_scenario.name, "step_size": self._step_size},
+                start_timestep=self._start_timestep
+            )
+            if self._start_timestep > 0:
+                if recorder.continued:
+                    self._log.info(f"Continuing the trajectory in {recorder.filepath} from timestep {self._start_timestep}")
+                else:
+                    self._log.warn(f"The trajectory in {self._recorder_params.filepath} cannot be continued from timestep {self._start_timestep}, recording to {recorder.filepath}")
+            self._record_timestep(recorder)   # initial state
+
+        self._log.info(f"Running game for {self._timesteps} timesteps ..")
+        if self._log.has_events:
+            self._log.event("game_start", num_entities=self._num_entities, num_triplets=len(self._triplets), non_roots=list(self._not_roots))
+        num_timesteps = self._start_timestep
+        instrumentation = self._instrumentation
+        if self._store is not None and self._parallel_workers > 0:
+            # imported here so that games stepped in their own process never load multiprocessing
+            from resources.parallel_step import ParallelStepper
+            self._parallel_stepper = ParallelStepper(self._store, self._positioning_scenario, self._step_size, self._positioning_scenario_B_params.dist_behind, self._parallel_workers)
+        make_views = make_views or len(self._observers) > 0
+        previous_converged = None
+        first_timestep = self._start_timestep
+        try:
+            for iter in range(first_timestep, self._timesteps):
+                num_timesteps = iter + 1
+                instrumentation.begin_step()
+                if make_views:
+                    previous_converged = self._convergence_tracker.converged.copy()
+
+                # step the game: this is where all entities move
+                with instrumentation.phase("step"):
+                    self._step()
+
+                # after entities have moved, convert non-roots to roots, if applicable
+                with instrumentation.phase("convert_non_roots_to_roots"):
+                    new_root_ids = self._convert_non_roots_to_roots()
+
+                if recorder is not None:
+                    with instrumentation.phase("record"):
+                        self._record_timestep(recorder)
+                    instrumentation.count("timesteps_recorded")
+
+                # rendering: the renderer only copies positions here, frames are drawn and saved in the background
+                if renderer is not None:
+                    title = f"Iteration_{iter+1}"
+                    if iter == (self._timesteps - 1):
+                        title += "_FINAL_STATE"
+                    with instrumentation.phase("render"):
+                        # the first and final frames are never dropped
+                        force = iter == first_timestep or iter == (self._timesteps - 1)
+                        renderer.submit(self._get_positions(), self._triplets.root_mask, title, os.path.join(self._save_directory, title), force=force)
+                    instrumentation.count("frames_submitted")
+
+                # game convergence check
+                with instrumentation.phase("convergence_checks"):
+                    num_converged_entities = self._get_num_converged_entities()
+                    active_entities = self._num_entities - len(self._not_roots)
+                    non_converged_ids = self._get_ids_non_converged_entities()
+                with instrumentation.phase("log"):
+                    self._log_timestep(iter + 1, num_converged_entities, active_entities, non_converged_ids, new_root_ids)
+                instrumentation.end_step()
+                self._start_timestep = iter + 1     # a checkpoint saved from here on continues with the next timestep
+                has_ended, cannot_be_resolved = self._has_game_ended(num_converged_entities, active_entities, non_converged_ids)
+                yield self._observe(iter + 1, num_converged_entities, active_entities, new_root_ids, previous_converged) if make_views else None
+                if has_ended:
+                    break
+                if self._stop_requested:
+                    self._log.info("\nGAME STOPPED")
                     break
 
-        print("\nGame has ended!")
+                if self._checkpoint_params.interval > 0 and (iter + 1) % self._checkpoint_params.interval == 0:
+                    filepath = os.path.join(self._checkpoint_params.directory, f"checkpoint_{iter+1:06d}.npz")
+                    with instrumentation.phase("checkpoint"):
+                        self.save_checkpoint(filepath)
+                    self._log.debug(f"\t\tCheckpoint saved to {filepath}")
+
+                if self._fast_forward_enabled and len(self._not_roots) == 0 and iter + 1 < self._timesteps:
+                    with instrumentation.phase("fast_forward"):
+                        fast_forwarded = self._fast_forward(iter + 1)
+                    if fast_forwarded is not None:
+                        num_timesteps, cannot_be_resolved = fast_forwarded
+                        yield self._observe(num_timesteps, self._get_num_converged_entities(), self._num_entities - len(self._not_roots), [], previous_converged) if make_views else None
+                        break
+        finally:
+            # also reached when the consumer of iter_steps() stops iterating
+            if self._parallel_stepper is not None:
+                self._parallel_stepper.close()
+                self._parallel_stepper = None
+            if recorder is not None:
+                recorder.close()
+                self._log.info(f"Trajectory of {recorder.num_timesteps} timesteps recorded to {recorder.filepath}")
+            if renderer is not None:
+                renderer.close()
+                instrumentation.set_count("frames_written", renderer.num_frames_written)
+                instrumentation.set_count("frames_dropped", renderer.num_frames_dropped)
+                self._log.info(f"Frames written: {renderer.num_frames_written}, dropped because the writer fell behind: {renderer.num_frames_dropped}")
+
+        self._log.info("\nGame has ended!")
+
+        self._log_game_summary(cannot_be_resolved)
+        self._summary = self._get_game_summary(num_timesteps, cannot_be_resolved)
+        self._log.event("game_end", **asdict(self._summary))
+        self._log.close()
+
+    def _observe(self, timestep: int, num_converged_entities: int, active_entities: int, new_root_ids: list[int], previous_converged: np.ndarray) -> StepView:
+        """
+            Creates the view of the current state and hands it to the observers.
+        """
+        view = StepView(
+            timestep = timestep,
+            num_converged = num_converged_entities,
+            num_active = active_entities,
+            new_root_ids = new_root_ids,
+            get_positions = self._get_positions,
+            root_mask = self._triplets.root_mask,
+            converged = self._convergence_tracker.converged,
+            previous_converged = previous_converged,
+            ids_of = self._triplets.ids_of
+        )
+        for observer in self._observers:
+            observer(view)
+        return view
+
+    def _fast_forward(self, timestep: int) -> tuple[int, bool]:
+        """
+            Once no root that is about to move is the parent of another root, every moving root travels in a straight
+            line towards a fixed halfway mark (see predictable_movers()), and the rest of the game is known in advance:
+            which entities have converged only changes during the next H-1 timesteps (H being the length of tracking
+            histories), after which the game ends by its own rules (all converged, or no change for the last N
+            timesteps) or runs out of timesteps. Those timesteps are played on a copy of the convergence tracker,
+            and the population is moved to the timestep the game ends at in a single closed-form jump.
+
+            Returns the timestep the game ended at and whether it cannot be resolved, or None if the game is not
+            predictable from the given timestep (which has been played).
+        """
+        frozen = self._dependencies.unresolvable if self._freeze_unresolvable else None
+        predictable = predictable_movers(self._store, frozen)
+        if predictable is None:
+            return None
+
+        ids, targets = predictable
+        motion = StraightLineMotion(ids, self._store.positions[ids].copy(), targets, self._step_size)
+        tracker = self._convergence_tracker.copy()
+        num_recorded_steps = self._store.history_n - 1
+        active_entities = self._num_entities - len(self._not_roots)
+
+        end_timestep, cannot_be_resolved = self._timesteps, False
+        num_arrived = 0
+        for t in range(timestep + 1, self._timesteps + 1):
+            step = t - timestep
+            # beyond H-1 timesteps, every entity still moving has only covered step_size (or less, when arriving)
+            # in every tracked movement, and has converged (see StraightLineMotion.distances_at())
+            if step <= num_recorded_steps:
+                moving = step <= motion.num_steps
+                tracker.record_many(ids[moving], motion.distances_at(step)[moving])
+            num_arrived += len(motion.pop_arrivals(step))
+
+            num_converged_entities = tracker.num_converged(self._triplets.root_mask)
+            non_converged_ids = self._triplets.ids_of(tracker.non_converged(self._triplets.root_mask))
+            self._log_timestep(t, num_converged_entities, active_entities, non_converged_ids, [])
+            has_ended, cannot_be_resolved = self._has_game_ended(num_converged_entities, active_entities, non_converged_ids, tracker)
+            if has_ended:
+                end_timestep = t
+                break
+
+        advance(self._store, motion, end_timestep - timestep)
+        self._start_timestep = end_timestep
+        if self._active_set is not None:
+            self._active_set.mark_all_dirty()
+        self._instrumentation.count("fast_forwarded_timesteps", end_timestep - timestep)
+        self._log.info(f"\tFast-forwarded from timestep {timestep} to {end_timestep}: {len(ids)} entities moving in a straight line, {len(ids) - num_arrived} of which have not arrived yet")
+        return end_timestep, cannot_be_resolved
+
+    def _all_resolvable_converged(self, tracker: ConvergenceTracker = None) -> bool:
+        """
+            Whether every root that the dependency analysis did not find unresolvable has converged
+            (according to the game's convergence tracker, unless another one is given).
+        """
+        tracker = tracker or self._convergence_tracker
+        resolvable = self._triplets.root_mask & ~self._dependencies.unresolvable
+        return tracker.num_converged(resolvable) == np.count_nonzero(resolvable)
+
+    def _log_timestep(self, timestep: int, num_converged_entities: int, active_entities: int, non_converged_ids: list[int], new_root_ids: list[int]) -> None:
+        # ids are only formatted when debugging, otherwise progress is printed at most every progress_interval seconds
+        if self._log.is_enabled_for(DEBUG):
+            self._log.debug(f"\tTimestep {timestep} / {self._timesteps}: {num_converged_entities} / {active_entities} have converged. Ids left to converge: {non_converged_ids}")
+        else:
+            self._log.progress(lambda: f"\tTimestep {timestep} / {self._timesteps}: {num_converged_entities} / {active_entities} have converged ({active_entities - num_converged_entities} left to converge)")
+        self._log.event("timestep", timestep=timestep, num_converged=num_converged_entities, num_active=active_entities, new_roots=new_root_ids)
+
+    def _has_game_ended(self, num_converged_entities: int, active_entities: int, non_converged_ids: list[int], tracker: ConvergenceTracker = None) -> tuple[bool, bool]:
+        """
+            Checks whether the game ends after a timestep, given the state of convergence at that timestep.
+            Returns whether the game has ended, and whether it cannot be resolved.
+
+            The IDs of non-converged entities are tracked, and if they have not changed for the last N timesteps,
+            it is assumed that those entities are in a state that cannot be resolved (see _run()).
+        """
+        last_n_non_converged_ids = self._recent_non_converged_ids
+        last_n = 10
+
+        if num_converged_entities == active_entities:
+            self._log.info("\nALL ENTITIES HAVE CONVERGED")
+            return True, False
+        if self._freeze_unresolvable and self._all_resolvable_converged(tracker):
+            # whatever is left was found unresolvable by the dependency analysis and is frozen
+            self._log.info(lambda: f"\nENTITIES LEFT TO CONVERGE CANNOT CONVERGE: {non_converged_ids}")
+            return True, True
+        if len(last_n_non_converged_ids) >= last_n:
+            last_n_non_converged_ids.pop(0)
+        last_n_non_converged_ids.append(non_converged_ids)
+        if len(last_n_non_converged_ids) == last_n:
+            cannot_be_resolved = all(ids == last_n_non_converged_ids[0] for ids in last_n_non_converged_ids[1:])
+            if cannot_be_resolved:
+                self._log.info(lambda: f"\nENTITIES LEFT TO CONVERGE CANNOT CONVERGE: {non_converged_ids}")
+            return cannot_be_resolved, cannot_be_resolved
+        return False, False
+
+    def _analyze_dependencies(self) -> None:
+        """
+            (Re-)classifies entities as resolvable or unresolvable from the dependency graph of the triplets.
+        """
+        previously_unresolvable = self._dependencies.unresolvable
+        self._dependencies.update(self._triplets.roots, self._triplets.parents)
+        if self._dependencies.num_unresolvable == 0 or np.array_equal(previously_unresolvable, self._dependencies.unresolvable):
+            return
 
-        end_state = deepcopy(self._population)
-        self._log_game_summary(start_state, end_state, cannot_be_resolved)
+        self._log.info(lambda: f"\tDependency analysis: {self._dependencies.num_unresolvable} entities in {len(self._dependencies.unresolvable_groups)} groups cannot be resolved")
+        self._log.debug(lambda: f"\t\tUnresolvable groups: {[self._triplets.ids_of(group) for group in self._dependencies.unresolvable_groups]}")
+        if self._log.has_events:
+            self._log.event("dependency_analysis", groups=[self._triplets.ids_of(group) for group in self._dependencies.unresolvable_groups])
 
-    def _convert_non_roots_to_roots(self):
+    def _convert_non_roots_to_roots(self) -> list[int]:
         """
             If the population has any entities that are not-root, this method will convert them to root
-            if at least two other entities are visible.
+            if at least two other entities are visible. Returns the IDs of the entities that became root.
 
             Mutates config class variables.
         """
         if len(self._not_roots) == 0:
-            return
+            return []
 
         # go over non-root entities, stage them to be converted to root if at least two other entities are visible
         new_triplets = []
         new_root_ids = []
-        non_root_entities = [self._get_entity_from_id(i) for i in self._not_roots]
-        for nre in non_root_entities:
-            # get all entities within view of the non-root entity
-            other_entities = [i for i in self._population if (i.id != nre.id)]
-            visible_entities = [i for i in other_entities if euclidean_distance(nre.current_position, i.current_position) <= self._max_perception_radius]
+        non_root_indices = np.array([self._triplets.slot_of(i) for i in self._not_roots], dtype=np.int64)
+
+        # get all entities within view of every non-root entity in one batched query
+        positions = self._get_positions()
+        grid = UniformGrid(positions, self._max_perception_radius)
+        offsets, neighbors = grid.query_radius(positions[non_root_indices], self._max_perception_radius, exclude=non_root_indices)
+        self._instrumentation.count("neighbor_queries", len(non_root_indices))
+        pairs = None
+        if self._random_streams is not None:
+            pairs = self._random_streams.sample_pairs(PROMOTION, self._start_timestep, self._not_roots, offsets, neighbors)
+        for k, index in enumerate(non_root_indices):
+            nre = self._population[index]
+            visible_indices = neighbors[offsets[k]:offsets[k+1]].tolist()
 
             # if there aren't at least two visible entities, the non-root entity will stay non-root
-            if len(visible_entities) < 2:
+            if len(visible_indices) < 2:
                 continue
 
             # randomly pick two of the visible entities to form a triplet with the non-root entity
-            random_selections = random.sample(visible_entities, 2)
-            triplet = [nre.id, random_selections[0].id, random_selections[1].id]
+            random_selections = pairs[k] if pairs is not None else random.sample(visible_indices, 2)
+            triplet = [nre.id, self._population[random_selections[0]].id, self._population[random_selections[1]].id]
             new_triplets.append(triplet)
             new_root_ids.append(nre.id)
 
         # update triplets record and drop the new root entities from the list of non-root entities
-        self._triplets.extend(new_triplets)
-        self._not_roots = [i for i in self._not_roots if i not in new_root_ids]
-        for entity in self._population:
-            if entity.id in new_root_ids:
-                entity.mark_as_root()
+        self._triplets.add_triplets(new_triplets)
+        if self._store is not None:
+            self._store.set_parents(new_triplets)
+        if len(new_triplets) > 0:
+            previously_unresolvable = self._dependencies.unresolvable
+            self._analyze_dependencies()
+            if self._active_set is not None:
+                # new roots, and roots that are no longer frozen, have to be processed whether or not anything moved
+                self._active_set.update(self._triplets.roots, self._triplets.parents)
+                self._active_set.mark_dirty(np.concatenate([
+                    [self._triplets.slot_of(triplet[0]) for triplet in new_triplets],
+                    np.flatnonzero(previously_unresolvable & ~self._dependencies.unresolvable)
+                ]))
+        new_root_id_set = set(new_root_ids)
+        self._not_roots = [i for i in self._not_roots if i not in new_root_id_set]
+        for id in new_root_ids:
+            self._get_entity_from_id(id).mark_as_root()
         if len(new_root_ids) > 0:
-            print(f"\n\t\tEntities that just became root: {new_root_ids}. Non roots ({len(self._not_roots)}): {self._not_roots}")
+            self._log.debug(lambda: f"\n\t\tEntities that just became root: {new_root_ids}. Non roots ({len(self._not_roots)}): {self._not_roots}")
+        return new_root_ids
 
     def _create_population(self) -> list[Entity]:
         """
             Spawns entities in map at random locations, making sure of no collisions.
         """
-        print(f"Creating a population of {self._num_entities} in a map of size {self._map_size} ..")
+        self._log.info(f"Creating a population of {self._num_entities} in a map of size {self._map_size} ..")
+        if self._spawn_mode != 'sequential':
+            return self._spawn_population()
+
         population = [
             Entity(
-                initial_position=generate_random_position(self._map_size),
+                initial_position=self._random_position(0, 0),
                 perception_radius=self._max_perception_radius,
                 id=0,
                 map_size=self._map_size
@@ -147,7 +667,7 @@ class Game:
             num_in_collision = 0
             while in_collision:
                 new_entity = Entity(
-                    initial_position=generate_random_position(self._map_size),
+                    initial_position=self._random_position(i, num_in_collision),
                     perception_radius=self._max_perception_radius,
                     id=i,
                     map_size=self._map_size
@@ -156,9 +676,95 @@ class Game:
                 num_in_collision += 1
             population.append(new_entity)
             # print(f"\tSpawned entity {i+1} / {self._num_entities}: {new_entity} (required {num_in_collision} collision checks)")
-        print(f"Population created")
+        self._log.info(f"Population created")
+        return population
+
+    def _random_position(self, id: int, attempt: int) -> EntityPosition:
+        """
+            Random position for an entity, drawn from its own stream (one position per attempt) if random streams
+            are used, or from the random module otherwise.
+        """
+        if self._random_streams is None:
+            return generate_random_position(self._map_size)
+        u = self._random_streams.uniform(SPAWN, 0, [id], 2, first_draw=2 * attempt)[0]
+        return EntityPosition(x=float(u[0] * self._map_size[0]), y=float(u[1] * self._map_size[1]))
+
+    def _spawn_population(self) -> list[Entity]:
+        """
+            Spawns entities with the batched spawner, either by batched rejection sampling or by
+            Poisson-disk sampling depending on the spawn mode.
+        """
+        spawner = Spawner(self._map_size, radius=DEFAULT_ENTITY_RADIUS, min_separation=self._collision_checker.min_separation, seed=self._random_seed if self._random_streams is None else self._random_streams.seed_sequence(SPAWN))
+        if self._spawn_mode == 'poisson_disk':
+            positions = spawner.spawn_poisson_disk(self._num_entities)
+        else:
+            positions = spawner.spawn_batched(self._num_entities)
+
+        if len(positions) < self._num_entities:
+            self._log.warn(f"Map of size {self._map_size} could only fit {len(positions)} / {self._num_entities} entities without collisions")
+            self._num_entities = len(positions)
+
+        population = self._population_from_positions(positions)
+        self._log.info(f"Population created")
         return population
 
+    def _population_from_positions(self, positions: np.ndarray) -> list[Entity]:
+        """
+            Creates one entity per row of an (N, 2) array of positions, with IDs following the order of the rows.
+        """
+        return [
+            Entity(
+                initial_position=EntityPosition(x=float(x), y=float(y)),
+                perception_radius=self._max_perception_radius,
+                id=i,
+                map_size=self._map_size
+            )
+            for i, (x, y) in enumerate(positions)
+        ]
+
+    def _restore_checkpoint(self, checkpoint: dict) -> None:
+        """
+            Restores tracking histories, convergence state, the random state and the current timestep from a
+            checkpoint, once the population and triplets have been created from it.
+        """
+        histories, lengths = checkpoint["histories"], checkpoint["history_lengths"]
+        if self._store is not None:
+            self._store.set_histories(histories, lengths)
+        else:
+            for entity, history, length in zip(self._population, histories, lengths):
+                entity._last_n_positions = deque(
+                    [EntityPosition(x = float(x), y = float(y)) for (x, y) in history[:length]],
+                    maxlen=entity._history_n
+                )
+        self._convergence_tracker.set_state({
+            key[len("tracker_"):]: value for key, value in checkpoint.items() if key.startswith("tracker_")
+        })
+        self._recent_non_converged_ids = unpack_ragged(checkpoint["recent_non_converged_ids"], checkpoint["recent_non_converged_lengths"])
+        random.setstate(checkpoint["random_state"])
+        self._start_timestep = int(checkpoint["timestep"])
+        self._log.info(f"Resuming from timestep {self._start_timestep}")
+
+    def _warm_start(self, solution: EquilibriumSolution) -> None:
+        """
+            Moves the roots to their solved positions, where they start out settled: their tracking histories only hold
+            that position (H-1 movements of zero), so that they count as converged for as long as they do not move.
+        """
+        movable = self._triplets.root_mask
+        if self._freeze_unresolvable:
+            movable = movable & ~self._dependencies.unresolvable
+        slots = np.flatnonzero(movable)
+        if self._store is not None:
+            self._store.positions[slots] = solution.positions[slots]
+            for _ in range(self._store.history_n):
+                self._store.push_history(slots)
+        else:
+            for slot in slots:
+                entity = self._population[slot]
+                position = EntityPosition(x = float(solution.positions[slot, 0]), y = float(solution.positions[slot, 1]))
+                for _ in range(entity._history_n):
+                    entity.update_current_position(position)
+        self._log.info(f"Starting from the solved positions of {len(slots)} roots")
+
     def _create_triplets(self) -> tuple[list[list[int]], list[int]]:
         """
             Creates groups-of-three from the population based on perception radius.
@@ -168,30 +774,40 @@ class Game:
             Such an entity will not move during the game as there are no two other entities to position
             itself relative to.
         """
-        print(f"Creating triplets ..")
+        self._log.info(f"Creating triplets ..")
         triplets = []
         not_roots = []
+
+        # get all entities within view of every entity in one batched query
+        positions = self._get_positions()
+        grid = UniformGrid(positions, self._max_perception_radius)
+        offsets, neighbors = grid.query_radius(positions, self._max_perception_radius, exclude=np.arange(len(positions)))
+        self._instrumentation.count("neighbor_queries", len(positions))
+        pairs = None
+        if self._random_streams is not None:
+            pairs = self._random_streams.sample_pairs(TRIPLETS, 0, [entity.id for entity in self._population], offsets, neighbors)
         for i, entity in enumerate(self._population):
-            # get all entities within view of the current entity
-            other_entities = self._population[:i] + self._population[i+1:]
-            visible_entities = [i for i in other_entities if euclidean_distance(entity.current_position, i.current_position) <= self._max_perception_radius]
+            visible_indices = neighbors[offsets[i]:offsets[i+1]].tolist()
 
             # out of the visible entities, randomly select two to form a triplet
-            if len(visible_entities) >= 2:
-                random_selections = random.sample(visible_entities, 2)
-                triplet = [entity.id, random_selections[0].id, random_selections[1].id]
+            if len(visible_indices) >= 2:
+                random_selections = pairs[i] if pairs is not None else random.sample(visible_indices, 2)
+                triplet = [entity.id, self._population[random_selections[0]].id, self._population[random_selections[1]].id]
 
                 triplets.append(triplet)
             else:
-                print(f"\t{len(visible_entities)} visible neighbors for entity {entity}")
+                self._log.debug(lambda: f"\t{len(visible_indices)} visible neighbors for entity {entity}")
                 not_roots.append(entity.id)
                 entity.mark_as_not_root()
 
-        print(f"Triplets created: {len(triplets)}")
-        for i, triplet in enumerate(triplets):
-            root, a, b = triplet
-            print(f"\t{i+1}) id {root} is linked to ids {a} and {b}")
-        print(f"\tNon root entities ({len(not_roots)}): {not_roots}")
+        self._log.info(f"Triplets created: {len(triplets)}")
+        if self._log.is_enabled_for(DEBUG):
+            for i, triplet in enumerate(triplets):
+                root, a, b = triplet
+                self._log.debug(f"\t{i+1}) id {root} is linked to ids {a} and {b}")
+            self._log.debug(f"\tNon root entities ({len(not_roots)}): {not_roots}")
+        else:
+            self._log.info(f"\tNon root entities: {len(not_roots)}")
         return triplets, not_roots
 
     def _entity_in_collision(self, entity: Entity, population: list[Entity]) -> bool:
@@ -204,142 +820,323 @@ class Game:
         return False
 
     def _get_entity_from_id(self, id: int) -> Entity:
-        for entity in self._population:
-            if id == entity.id:
-                return entity
+        if self._triplets.has_id(id):
+            return self._population[self._triplets.slot_of(id)]
 
-        print(f"[ERROR] Population does not have an entity with ID {id}")
+        self._log.error(f"Population does not have an entity with ID {id}")
         return None
 
     def _get_entity_parents(self, entity: Entity) -> tuple[Entity, Entity]:
         """
             Given an entity, get its parent entities
         """
-        for triplet_ids in self._triplets:
-            if entity.id == triplet_ids[0]:
-                parent_a = triplet_ids[1]
-                parent_b = triplet_ids[2]
-                return (self._get_entity_from_id(parent_a), self._get_entity_from_id(parent_b))
-        
-        return None, None
+        parent_a, parent_b = self._triplets.parents_of(self._triplets.slot_of(entity.id))
+        if parent_a is None:
+            return None, None
+
+        return (self._population[parent_a], self._population[parent_b])
+
+    def _get_positions(self) -> np.ndarray:
+        """
+            Returns an (N, 2) array where row i is the current position of self._population[i].
+            With a vectorized population this is the store's own array (not a copy).
+        """
+        if self._store is not None:
+            return self._store.positions
+
+        positions = np.zeros((len(self._population), 2), dtype=np.float64)
+        for i, entity in enumerate(self._population):
+            positions[i] = (entity.current_position.x, entity.current_position.y)
+        return positions
+
+    def _get_histories(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Returns the tracked positions of the population as an (N, H, 2) array, oldest first, along with
+            the (N,) number of valid positions of every entity.
+        """
+        if self._store is not None:
+            return self._store.get_histories()
+
+        history_n = self._population[0]._history_n
+        histories = np.zeros((len(self._population), history_n, 2), dtype=np.float64)
+        lengths = np.zeros(len(self._population), dtype=np.int64)
+        for i, entity in enumerate(self._population):
+            history = entity.get_tracking_history()
+            lengths[i] = len(history)
+            histories[i, :len(history)] = [(p.x, p.y) for p in history]
+        return histories, lengths
+
+    def _get_game_summary(self, num_timesteps: int, cannot_be_resolved: bool) -> GameSummary:
+        num_converged = self._get_num_converged_entities()
+        num_left_to_converge = self._num_entities - len(self._not_roots) - num_converged
+        return GameSummary(
+            num_timesteps = num_timesteps,
+            num_entities = self._num_entities,
+            num_converged = num_converged,
+            num_non_roots = len(self._not_roots),
+            num_left_to_converge = num_left_to_converge,
+            all_converged = (num_left_to_converge == 0),
+            cannot_be_resolved = cannot_be_resolved
+        )
 
     def _get_ids_non_converged_entities(self) -> list[int]:
         """
             Collects IDs of entities that have not converged
         """
-        ids = []
-        for entity in self._population:
-            # if not self._entity_meets_convergence_criteria(entity, not_root_is_converged = False):
-            if entity.is_root() and (not entity.has_converged()):
-                ids.append(entity.id)
-        return ids
+        return self._triplets.ids_of(self._convergence_tracker.non_converged(self._triplets.root_mask))
 
     def _get_num_converged_entities(self) -> int:
         """
             Returns the number of entities in the population that are root entities
             and have not moved during the last n steps.
         """
-        count = 0
-        for entity in self._population:
-            if entity.is_root() and entity.has_converged():
-                count += 1
-        return count
+        return self._convergence_tracker.num_converged(self._triplets.root_mask)
 
-    def _init_config(self, config_filepath: str) -> bool:
+    def _init_config(self, config_filepath: str = None, params: dict | GameConfig = None) -> bool:
         """
-            Loads parameters from config file. Returns True/False for success/failure.
+            Loads parameters from config file, unless a params dictionary or GameConfig is given.
+            Returns True/False for success/failure.
             Mutates config class variables.
         """
-        with open(config_filepath) as stream:
-            try:
-                params = yaml.safe_load(stream)
-            except yaml.YAMLError as exc:
-                print(f"[ERROR] Could not read parameters from {config_filepath}: {exc}")
-                return False
-            else:
-                print(f"Loaded parameters from {config_filepath}:")
-                for key in params.keys():
-                    print(f"\t{key} : {params[key]}")
+        from_file = params is None
+        if from_file:
+            # imported here so that games created from dictionaries or configs do not load yaml
+            import yaml
+            with open(config_filepath) as stream:
+                try:
+                    params = yaml.safe_load(stream)
+                except yaml.YAMLError as exc:
+                    return self._config_error(f"Could not read parameters from {config_filepath}: {exc}")
+        elif isinstance(params, GameConfig):
+            params = params.to_dict()
+
+        errors = validate_params(params)
+        for error in errors:
+            self._config_error(f"Invalid parameters: {error}")
+        if len(errors) > 0:
+            return False
+
+        # logging is configured first so that everything else is logged accordingly
+        logging_params = params.get("logging", {})
+        level = logging_params.get("level", "info")
+        if level not in LEVELS:
+            return self._config_error(f"Logging level must be one of {', '.join(LEVELS.keys())}. Cannot continue with game initialization!")
+        events_filepath = logging_params.get("events_filepath")
+        if events_filepath is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(events_filepath)), exist_ok=True)
+        self._log = GameLogger(
+            level = LEVELS[level],
+            quiet = logging_params.get("quiet", False),
+            progress_interval = logging_params.get("progress_interval", 1.0),
+            events_filepath = events_filepath
+        )
+
+        self._log.info(f"Loaded parameters from {config_filepath}:" if from_file else f"Loaded parameters:")
+        for key in params.keys():
+            self._log.info(f"\t{key} : {params[key]}")
         self._num_entities = max(3, params["num_entities"])
         self._timesteps = params["timesteps"]
         self._map_size = params["map_size"]
         self._step_size = params["step_size"]
         self._max_perception_radius = params["perception_radius"]
+        self._vectorized = params.get("vectorized", False)
+        self._parallel_workers = params.get("parallel", {}).get("workers", 0)
+        if self._parallel_workers < 0:
+            self._parallel_workers = os.cpu_count()
+        if self._parallel_workers > 0 and not self._vectorized:
+            self._log.warn(f"Parallel stepping requires a vectorized population (synchronous updates), stepping in a single process")
+            self._parallel_workers = 0
+        self._freeze_unresolvable = params.get("dependency_analysis", {}).get("freeze_unresolvable", False)
+        self._initial_positions_filepath = params.get("initial_positions")
+        self._active_set_params = params.get("active_set", {})
+        self._fast_forward_enabled = params.get("fast_forward", {}).get("enable", False)
 
         # random seed
         seed_val = params["random_seed"]
         random.seed(seed_val)
+        self._random_seed = seed_val
+        rng_mode = params.get("rng_mode", "global")
+        if rng_mode not in ['global', 'streams']:
+            return self._config_error(f"RNG mode must be either global or streams. Cannot continue with game initialization!")
+        if rng_mode == 'streams':
+            self._random_streams = RandomStreams(seed_val)
+            if seed_val is None:
+                # the entropy drawn from the OS is kept with the parameters, so that checkpoints resume the same streams
+                params = {**params, "random_seed": self._random_streams.entropy}
+                self._log.info(f"Random streams seeded with entropy {self._random_streams.entropy}")
+
+        # spawning
+        self._spawn_mode = params.get("spawn_mode", "sequential")
+        if self._spawn_mode not in ['sequential', 'batched', 'poisson_disk']:
+            return self._config_error(f"Spawn mode must be one of sequential, batched or poisson_disk. Cannot continue with game initialization!")
 
         # save filepath
-        self._save_directory = params["save_directory"]
+        self._save_directory = params.get("save_directory")
         if self._save_directory is not None:
             os.makedirs(self._save_directory, exist_ok=True)
 
         positioning_scenario = params["positioning_scenario"]
         if positioning_scenario not in ['A', 'B']:
-            print(f"[ERROR] Game positioning scenario must be either A or B. Cannot continue with game initialization!")
-            return False
+            return self._config_error(f"Game positioning scenario must be either A or B. Cannot continue with game initialization!")
         self._positioning_scenario = PositioningScenario.ScenarioA if (positioning_scenario == 'A') else PositioningScenario.ScenarioB
-        self._positioning_scenario_B_params = PositionScenerioBParams(dist_behind=params["positioning_scenario_B"]["dist_behind"])
+        self._positioning_scenario_B_params = PositionScenerioBParams(dist_behind=params.get("positioning_scenario_B", {}).get("dist_behind", 1.0))
 
-        gui_params = params["gui"]
+        gui_params = params.get("gui", {})
         self._gui_params = GuiParams(
-            enabled = gui_params["enable"],
-            on_keypress = gui_params["on_keypress"],
-            delay = gui_params["delay"]
+            enabled = gui_params.get("enable", False),
+            frame_queue_size = gui_params.get("frame_queue_size", 8),
+            drop_frames_when_behind = gui_params.get("drop_frames_when_behind", False)
+        )
+
+        recorder_params = params.get("recorder", {})
+        self._recorder_params = RecorderParams(
+            enabled = recorder_params.get("enable", False),
+            filepath = recorder_params.get("filepath", os.path.join(self._save_directory or ".", "trajectory.bin"))
+        )
+        if self._recorder_params.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(self._recorder_params.filepath)), exist_ok=True)
+
+        profiling_params = params.get("profiling", {})
+        self._profiling_params = ProfilingParams(
+            timings_filepath = profiling_params.get("timings_filepath"),
+            cprofile = profiling_params.get("cprofile", False),
+            cprofile_filepath = profiling_params.get("cprofile_filepath", os.path.join(self._save_directory or ".", "game.prof"))
+        )
+        if self._profiling_params.timings_filepath is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self._profiling_params.timings_filepath)), exist_ok=True)
+        if self._profiling_params.cprofile:
+            os.makedirs(os.path.dirname(os.path.abspath(self._profiling_params.cprofile_filepath)), exist_ok=True)
+
+        checkpoint_params = params.get("checkpoint", {})
+        self._checkpoint_params = CheckpointParams(
+            interval = checkpoint_params.get("interval", 0),
+            directory = checkpoint_params.get("directory", os.path.join(self._save_directory or ".", "checkpoints"))
+        )
+        if self._checkpoint_params.interval > 0:
+            os.makedirs(self._checkpoint_params.directory, exist_ok=True)
+
+        if self._fast_forward_enabled and (not self._vectorized or self._positioning_scenario != PositioningScenario.ScenarioA):
+            self._log.warn(f"Fast-forward requires positioning scenario A with a vectorized population, it is disabled")
+            self._fast_forward_enabled = False
+        if self._fast_forward_enabled and (self._gui_params.enabled or self._recorder_params.enabled):
+            self._log.warn(f"Fast-forward skips timesteps that would be rendered or recorded, it is disabled")
+            self._fast_forward_enabled = False
+
+        solver_params = params.get("equilibrium_solver", {})
+        self._equilibrium_params = EquilibriumSolverParams(
+            enabled = solver_params.get("enable", False),
+            method = solver_params.get("method", "cg"),
+            tolerance = solver_params.get("tolerance", 1e-9),
+            max_iterations = solver_params.get("max_iterations", 10000),
+            warm_start = solver_params.get("warm_start", False)
         )
-        if self._gui_params.on_keypress and (self._gui_params.delay > 0 or self._gui_params.delay is not None):
-            print(f"[WARN] For GUI settings, since on_keypress is True, delay will be superseded.")
-            self._gui_params.delay = None
+        if self._equilibrium_params.method not in EQUILIBRIUM_METHODS:
+            return self._config_error(f"Equilibrium solver method must be one of {', '.join(EQUILIBRIUM_METHODS)}. Cannot continue with game initialization!")
+        if self._equilibrium_params.enabled and self._positioning_scenario != PositioningScenario.ScenarioA:
+            self._log.warn(f"The equilibrium solver only applies to positioning scenario A, it is disabled")
+            self._equilibrium_params.enabled = False
+
+        self._params = params
 
         return True
 
-    def _log_game_summary(self, start_state: list[Entity], end_state: list[Entity], cannot_be_resolved : bool) -> None:
-        print(f"Number of converged entities: {self._get_num_converged_entities()}")
-        print(f"Number of non-roots: {len(self._not_roots)}")
+    def _config_error(self, message: str) -> bool:
+        """
+            Logs a problem with the parameters, which is raised by __init__ along with the others. Returns False.
+        """
+        self._log.error(message)
+        self._config_errors.append(message)
+        return False
+
+    def _log_game_summary(self, cannot_be_resolved : bool) -> None:
+        self._log.info(f"Number of converged entities: {self._get_num_converged_entities()}")
+        self._log.info(f"Number of non-roots: {len(self._not_roots)}")
 
-        ids_non_converged = self._get_ids_non_converged_entities()
-        print(f"Number of entities left to converge: {self._num_entities - len(self._not_roots) - self._get_num_converged_entities()} (ids: {ids_non_converged})")
+        num_left_to_converge = self._num_entities - len(self._not_roots) - self._get_num_converged_entities()
+        if self._log.is_enabled_for(DEBUG):
+            ids_non_converged = self._get_ids_non_converged_entities()
+            self._log.debug(f"Number of entities left to converge: {num_left_to_converge} (ids: {ids_non_converged})")
+        else:
+            self._log.info(f"Number of entities left to converge: {num_left_to_converge}")
         # if cannot_be_resolved:
         #     print("Following IDs cannot converge due to conflicting parents:")
         #     for id in ids_non_converged:
         #         entity = self._get_entity_from_id(id)
         #         parent_a, parent_b = self._get_entity_parents(entity)
         #         print(f"\t{id}: ({parent_a.id}, {parent_b.id})")
-        # print("Entities start --> end coordinates:")
-        # for (a, b) in zip(start_state, end_state):
-        #     if (a.id == b.id):
-        #         distance_moved = euclidean_distance(a.current_position, b.current_position)
-        #         if a.id in self._not_roots:
-        #             if distance_moved > 0:
-        #                 print(f"\t[WARN: should not have moved] ID {a.id}: ({a.current_position.x:.3f}, {a.current_position.y:.3f}) --> ({b.current_position.x:.3f}, {b.current_position.y:.3f}), distance moved = {distance_moved:.3f}m")
-        #             # else:
-        #             #     print(f"\tID {a.id}: ({a.current_position.x:.3f}, {a.current_position.y:.3f}) [DID NOT MOVE]")
-        #         else:
-        #             print(f"\tID {a.id}: ({a.current_position.x:.3f}, {a.current_position.y:.3f}) --> ({b.current_position.x:.3f}, {b.current_position.y:.3f}), distance moved = {distance_moved:.3f}m, convergence reached: {b.has_converged()}")
-        #     else:
-        #         print(f"[WARN] IDs should be in the same order for start and end states, but found start state ID {a.id} and end state ID {b.id}")
+
+    def _record_timestep(self, recorder: TrajectoryRecorder) -> None:
+        """
+            Appends positions, root flags and convergence flags of the population to a trajectory recorder.
+        """
+        recorder.append(self._get_positions(), self._triplets.root_mask, self._convergence_tracker.converged)
 
     def _step(self):
         """
             Step through and progress the game by calling this method.
-            All entities that are classified as 'root' will move (unless they've already achieved convergence).
+            All entities that are classified as 'root' will move (unless they've already achieved convergence,
+            or were found unresolvable and freeze_unresolvable is enabled).
+            With a vectorized population, all roots move at once using the batched step engine, split across
+            a pool of processes if parallel workers are configured.
 
             Mutates config class variables.
         """
-        entities = self._triplets_to_entities(self._triplets)
-        random.shuffle(entities)
-        for (root, a, b) in entities:
+        frozen = self._dependencies.unresolvable if self._freeze_unresolvable else None
+        # with an active set, only roots that or whose parents moved during the previous timestep are processed
+        candidates = self._active_set.dirty_ids if self._active_set is not None else None
+        if self._parallel_stepper is not None:
+            moved = self._parallel_stepper.step(frozen, candidates)
+            self._instrumentation.count("moves_applied", len(moved))
+            self._schedule_next_step(moved)
+            return
+
+        if self._store is not None:
             if self._positioning_scenario == PositioningScenario.ScenarioA:
-                root.move_towards_halfway_between(a.current_position, b.current_position, self._step_size)
+                moved = step_scenario_a(self._store, self._step_size, frozen, candidates)
             else:
-                root.move_behind_entity(a.current_position, b.current_position, self._step_size, self._positioning_scenario_B_params.dist_behind)
+                moved = step_scenario_b(self._store, self._step_size, self._positioning_scenario_B_params.dist_behind, frozen, candidates)
+            self._instrumentation.count("moves_applied", len(moved))
+            self._schedule_next_step(moved)
+            return
 
-    def _triplets_to_entities(self, ids: list[list[int]]) -> list[list[Entity]]:
+        roots = self._triplets.roots.tolist()
+        parents = self._triplets.parents.tolist()
+        dirty = self._active_set.dirty_mask() if self._active_set is not None else None
+        num_moves = 0
+        moved = []
+        # the order is shuffled even if some roots are skipped, so that random numbers are drawn the same way
+        if self._random_streams is not None:
+            order = self._random_streams.permutation(STEP_ORDER, self._start_timestep, self._triplets.root_ids).tolist()
+        else:
+            order = self._triplets.shuffled_order()
+        for i in order:
+            if frozen is not None and frozen[roots[i]]:
+                continue
+            if dirty is not None and not dirty[roots[i]]:
+                continue
+            num_moves += 1
+            root = self._population[roots[i]]
+            a = self._population[parents[i][0]]
+            b = self._population[parents[i][1]]
+            if self._positioning_scenario == PositioningScenario.ScenarioA:
+                has_moved = root.move_towards_halfway_between(a.current_position, b.current_position, self._step_size)
+            else:
+                has_moved = root.move_behind_entity(a.current_position, b.current_position, self._step_size, self._positioning_scenario_B_params.dist_behind)
+            if has_moved:
+                moved.append(roots[i])
+                if dirty is not None:
+                    # moves are applied one at a time, so roots later in the order already see this move
+                    dirty[self._active_set.dependents_of(roots[i])] = True
+        self._instrumentation.count("moves_applied", num_moves)
+        self._schedule_next_step(np.array(moved, dtype=np.int64))
+
+    def _schedule_next_step(self, moved: np.ndarray) -> None:
         """
-            Converts IDs to entities.
+            Lets the active set (if enabled) know which entities moved during this timestep.
         """
-        if len(self._population) == 0:
-            return []
+        if self._active_set is None:
+            return
 
-        return [[self._get_entity_from_id(i) for i in sublist] for sublist in ids]
+        self._instrumentation.count("active_entities", len(self._active_set))
+        distances = self._convergence_tracker.latest_deltas(moved) if self._active_set.epsilon > 0 else None
+        self._active_set.end_step(moved, distances)
@@ -0,0 +1,109 @@
+import json
+import time
+
+class _PhaseTimer:
+    """
+        Reusable context manager adding the time spent in its block to one phase of an Instrumentation.
+    """
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation, name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._instrumentation.add_time(self._name, time.perf_counter() - self._start)
+        return False
+
+class Instrumentation:
+    """
+        Per-phase timers and counters of a game.
+
+        Time spent in a phase and counter increments are accumulated for the current timestep and pushed
+        into a per-timestep time series by end_step(); anything measured outside of a timestep (e.g. while
+        the game initializes) only shows up in the totals.
+        Usage:
+            with instrumentation.phase("step"):
+                ...
+            instrumentation.count("moves_applied", n)
+    """
+    def __init__(self):
+        self._timers : dict[str, _PhaseTimer] = {}
+        self._step_times : dict[str, float] = {}
+        self._step_counts : dict[str, int] = {}
+        self.total_times : dict[str, float] = {}
+        self.total_counts : dict[str, int] = {}
+        self.time_series : dict[str, list[float]] = {}
+        self.count_series : dict[str, list[int]] = {}
+        self.num_steps = 0
+
+    def phase(self, name: str) -> _PhaseTimer:
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self, name)
+        return timer
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self._step_times[name] = self._step_times.get(name, 0.0) + seconds
+        self.total_times[name] = self.total_times.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self._step_counts[name] = self._step_counts.get(name, 0) + n
+        self.total_counts[name] = self.total_counts.get(name, 0) + n
+
+    def set_count(self, name: str, n: int) -> None:
+        """
+            Sets the total of a counter that is not tracked per timestep (e.g. frames written by a background thread).
+        """
+        self.total_counts[name] = n
+
+    def begin_step(self) -> None:
+        self._step_times.clear()
+        self._step_counts.clear()
+
+    def end_step(self) -> None:
+        """
+            Appends the times and counts of the current timestep to the time series. Phases and counters
+            not seen during the timestep are recorded as 0, and ones seen for the first time are back-filled with 0.
+        """
+        for name in self._step_times.keys() - self.time_series.keys():
+            self.time_series[name] = [0.0] * self.num_steps
+        for name, series in self.time_series.items():
+            series.append(self._step_times.get(name, 0.0))
+        for name in self._step_counts.keys() - self.count_series.keys():
+            self.count_series[name] = [0] * self.num_steps
+        for name, series in self.count_series.items():
+            series.append(self._step_counts.get(name, 0))
+        self.num_steps += 1
+        self.begin_step()
+
+    def summary(self) -> dict:
+        """
+            Totals, and mean / max per timestep, of all phases and counters.
+        """
+        times = {}
+        for name, total in self.total_times.items():
+            series = self.time_series.get(name, [])
+            times[name] = {
+                "total": total,
+                "mean_per_step": (sum(series) / len(series)) if len(series) > 0 else None,
+                "max_per_step": max(series) if len(series) > 0 else None
+            }
+        return {"num_steps": self.num_steps, "times": times, "counts": dict(self.total_counts)}
+
+    def to_json(self, filepath: str) -> None:
+        with open(filepath, "w") as stream:
+            json.dump({"summary": self.summary(), "time_series": self.time_series, "count_series": self.count_series}, stream)
+
+    def __repr__(self) -> str:
+        total = sum(self.total_times.values())
+        lines = [f"Timings over {self.num_steps} timesteps:"]
+        for name, seconds in sorted(self.total_times.items(), key=lambda item: -item[1]):
+            lines.append(f"\t{name}: {seconds:.3f}s ({100 * seconds / total if total > 0 else 0:.1f}%)")
+        lines.append("Counters: " + ", ".join(f"{name} {n}" for name, n in self.total_counts.items()))
+        return "\n".join(lines)
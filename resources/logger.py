@@ -0,0 +1,74 @@
+import json
+import time
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warn": WARN, "error": ERROR}
+
+class GameLogger:
+    """
+        Leveled logging to stdout, with progress messages throttled by wall-clock time and an optional
+        JSON-lines stream of structured events.
+
+        Messages can be given as callables returning the string, so that nothing is formatted unless it is
+        printed. With quiet=True only warnings and errors are printed.
+    """
+    def __init__(self, level: int = INFO, quiet: bool = False, progress_interval: float = 1.0, events_filepath: str = None):
+        self.level = max(level, WARN) if quiet else level
+        self._progress_interval = progress_interval
+        self._last_progress = None
+        self._events = open(events_filepath, "w") if events_filepath is not None else None
+
+    @property
+    def has_events(self) -> bool:
+        return self._events is not None
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def debug(self, msg) -> None:
+        if DEBUG >= self.level:
+            print(_format(msg))
+
+    def info(self, msg) -> None:
+        if INFO >= self.level:
+            print(_format(msg))
+
+    def warn(self, msg) -> None:
+        if WARN >= self.level:
+            print(f"[WARN] {_format(msg)}")
+
+    def error(self, msg) -> None:
+        if ERROR >= self.level:
+            print(f"[ERROR] {_format(msg)}")
+
+    def progress(self, msg, force: bool = False) -> bool:
+        """
+            Prints an info message if at least progress_interval seconds have passed since the last one
+            (or if forced). Returns True if it was printed.
+        """
+        if INFO < self.level:
+            return False
+        now = time.monotonic()
+        if not force and self._last_progress is not None and (now - self._last_progress) < self._progress_interval:
+            return False
+        self._last_progress = now
+        print(_format(msg))
+        return True
+
+    def event(self, name: str, **fields) -> None:
+        """
+            Appends one event to the JSON-lines stream, if there is one.
+        """
+        if self._events is not None:
+            self._events.write(json.dumps({"event": name, **fields}) + "\n")
+
+    def close(self) -> None:
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+def _format(msg) -> str:
+    return msg() if callable(msg) else msg
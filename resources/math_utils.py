@@ -1,6 +1,8 @@
 
 from resources.containers import EntityPosition
 
+import numpy as np
+
 def euclidean_distance(a: EntityPosition, b: EntityPosition) -> float:
     return ((a.x - b.x)**2 + (a.y - b.y)**2) ** 0.5
 
@@ -74,3 +76,73 @@ def point_falls_between_two_points(endpoint_a: EntityPosition, endpoint_b: Entit
 
     falls_between = (dist1 <= 0 and dist2 >= 0) or (dist1 >= 0 and dist2 <= 0)  # dist1 and dist2 should have opposite sites
     return falls_between
+
+"""
+    Batched counterparts of the functions above. Points are given as (N, 2) arrays (rows are (x, y)) and results are
+    arrays of length N, computed with the same formulas so that they match the scalar versions row by row.
+"""
+
+def euclidean_distance_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    diff = a - b
+    return np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2)
+
+def get_equation_coeff_of_line_from_two_points_batch(points_a: np.ndarray, points_b: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Coefficients A, B, C of the lines Ax + By + C = 0 through every pair of points, as three (N,) arrays.
+    """
+    x1, y1 = points_a[:, 0], points_a[:, 1]
+    x2, y2 = points_b[:, 0], points_b[:, 1]
+    a = y1 - y2
+    b = x2 - x1
+    c = (x1 - x2) * y1 + (y2 - y1) * x1
+    return a, b, c
+
+def distance_from_point_to_line_between_two_points_batch(endpoints_a: np.ndarray, endpoints_b: np.ndarray, some_points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Returns:
+        - (N,) shortest distances from some_points to the lines joining endpoints_a and endpoints_b
+        - (N, 2) closest points (projections) on those lines
+        Where both endpoints coincide, the distance to that endpoint and the endpoint itself are returned.
+    """
+    a, b, c = get_equation_coeff_of_line_from_two_points_batch(endpoints_a, endpoints_b)
+    x0, y0 = some_points[:, 0], some_points[:, 1]
+    a2_b2 = a ** 2 + b ** 2
+    degenerate = np.all(endpoints_a == endpoints_b, axis=1)
+    safe_a2_b2 = np.where(degenerate, 1.0, a2_b2)
+
+    a_y0 = a * y0
+    b_x0 = b * x0
+    distances = np.abs(a * x0 + b * y0 + c) / np.sqrt(safe_a2_b2)
+    nearest_points = np.empty_like(some_points, dtype=np.float64)
+    nearest_points[:, 0] = (b * (b_x0 - a_y0) - a * c) / safe_a2_b2
+    nearest_points[:, 1] = (a * (a_y0 - b_x0) - b * c) / safe_a2_b2
+
+    if np.any(degenerate):
+        distances[degenerate] = euclidean_distance_batch(some_points[degenerate], endpoints_a[degenerate])
+        nearest_points[degenerate] = endpoints_a[degenerate]
+    return distances, nearest_points
+
+def signed_distance_batch(a: np.ndarray, b: np.ndarray, c: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+        Signed distances of points to the lines Ax + By + C = 0 (positive on the side the normal (A, B) points to).
+    """
+    numerator = (a * points[:, 0]) + (b * points[:, 1]) + c
+    denominator = np.maximum(1e-6, np.sqrt(a ** 2 + b ** 2))   # to avoid division by zero error
+    return numerator / denominator
+
+def point_falls_between_two_points_batch(endpoints_a: np.ndarray, endpoints_b: np.ndarray, some_points: np.ndarray) -> np.ndarray:
+    """
+        Boolean mask of the points that fall in the region between the two lines perpendicular to the line
+        connecting endpoints_a and endpoints_b and passing through them (see point_falls_between_two_points).
+    """
+    a, b, _ = get_equation_coeff_of_line_from_two_points_batch(endpoints_a, endpoints_b)
+
+    # normal lines through both endpoints
+    a_normal = -b
+    b_normal = a
+    c_endpoints_a = (b * endpoints_a[:, 0]) - (a * endpoints_a[:, 1])
+    c_endpoints_b = (b * endpoints_b[:, 0]) - (a * endpoints_b[:, 1])
+
+    dist1 = signed_distance_batch(a_normal, b_normal, c_endpoints_a, some_points)
+    dist2 = signed_distance_batch(a_normal, b_normal, c_endpoints_b, some_points)
+    return ((dist1 <= 0) & (dist2 >= 0)) | ((dist1 >= 0) & (dist2 <= 0))
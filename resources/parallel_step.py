@@ -0,0 +1,152 @@
+from resources.containers import PositioningScenario
+from resources.population import PopulationStore
+from resources.step_engine import movable_roots, new_positions_scenario_a, new_positions_scenario_b
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+class ParallelStepper:
+    """
+        Synchronous (Jacobi) stepping of a PopulationStore split across a pool of processes: every root reads the
+        positions of step t and writes its position of step t+1, so roots can be moved in any order and on any core.
+
+        The state the workers need lives in a single shared memory block:
+            - positions: (2, N, 2) double buffer, every step reads one buffer and writes the other, after which they
+              are swapped. The store's positions always are the buffer holding the latest step.
+            - parents: (N, 2) parents of all entities, refreshed by the main process when they change
+              (see PopulationStore.parents_version)
+            - movable: (N,) roots that move this step, refreshed by the main process every step (only the rows that
+              change, when candidates are given)
+            - moved: (N,) entities that moved during the last step, written by the workers
+
+        Workers step contiguous ranges of rows. Every row is computed with the same element-wise operations from
+        positions of the previous step only, so results do not depend on the number of workers and are the same as
+        with step_scenario_a() / step_scenario_b().
+
+        Tracking histories and convergence are updated by the main process. close() must be called once done.
+    """
+    def __init__(self, store: PopulationStore, scenario: PositioningScenario, step_size: float = None, dist_behind: float = None, num_workers: int = 1):
+        self._store = store
+        self._num_workers = max(1, num_workers)
+        num_entities = len(store)
+
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=max(1, _block_size(num_entities)))
+        self._positions, self._parents, self._movable, self._moved = _views(self._shared_memory.buf, num_entities)
+        self._positions[0] = store.positions
+        self._parents_version = None    # version of the store's parents held in shared memory
+        self._movable[:] = False
+        self._movable_rows = None       # rows set in movable by the last step given candidates, None if unknown
+        self._read = 0
+        store.positions = self._positions[self._read]
+
+        bounds = np.linspace(0, num_entities, self._num_workers + 1).astype(np.int64)
+        self._ranges = [(int(start), int(stop)) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._num_workers,
+            initializer=_init_worker,
+            initargs=(self._shared_memory.name, num_entities, scenario, step_size, dist_behind, store.map_size)
+        )
+
+    @property
+    def num_workers(self) -> int:
+        return self._num_workers
+
+    def step(self, frozen: np.ndarray = None, candidates: np.ndarray = None) -> np.ndarray:
+        """
+            Moves every root of the store that has parents (and is not in the optional frozen mask, and is among the
+            optional candidate IDs) at once. Returns the IDs of entities that moved, like step_scenario_a() / step_scenario_b().
+        """
+        store = self._store
+        if candidates is None:
+            np.logical_and(store.is_root, store.parents[:, 0] >= 0, out=self._movable)
+            if frozen is not None:
+                self._movable &= ~frozen
+            self._movable_rows = None
+        else:
+            # with an active set, only the rows of the previous and current movable roots are touched
+            if self._movable_rows is None:
+                self._movable[:] = False
+            else:
+                self._movable[self._movable_rows] = False
+            self._movable_rows = movable_roots(store, frozen, candidates)
+            self._movable[self._movable_rows] = True
+        if self._parents_version != store.parents_version:
+            self._parents[:] = store.parents
+            self._parents_version = store.parents_version
+
+        write = 1 - self._read
+        starts, stops = zip(*self._ranges)
+        for _ in self._executor.map(_step_range, starts, stops, [self._read] * len(starts)):
+            pass
+
+        self._read = write
+        store.positions = self._positions[write]
+        moved = np.flatnonzero(self._moved)
+        store.push_history(moved)
+        return moved
+
+    def close(self) -> None:
+        """
+            Shuts the workers down and releases the shared memory, after giving the store a private copy of its positions.
+        """
+        if self._executor is None:
+            return
+
+        self._executor.shutdown()
+        self._executor = None
+        self._store.positions = self._store.positions.copy()
+        # views into the shared memory must be released before it can be closed
+        self._positions = self._parents = self._movable = self._moved = None
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+def _block_size(num_entities: int) -> int:
+    return num_entities * (2 * 2 * 8 + 2 * 8 + 1 + 1)
+
+def _views(buffer, num_entities: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    offset = 0
+    positions = np.ndarray((2, num_entities, 2), dtype=np.float64, buffer=buffer, offset=offset)
+    offset += positions.nbytes
+    parents = np.ndarray((num_entities, 2), dtype=np.int64, buffer=buffer, offset=offset)
+    offset += parents.nbytes
+    movable = np.ndarray((num_entities,), dtype=bool, buffer=buffer, offset=offset)
+    offset += movable.nbytes
+    moved = np.ndarray((num_entities,), dtype=bool, buffer=buffer, offset=offset)
+    return positions, parents, movable, moved
+
+# state of a worker process, set once by _init_worker()
+_worker = {}
+
+def _init_worker(name: str, num_entities: int, scenario: PositioningScenario, step_size: float, dist_behind: float, map_size: np.ndarray) -> None:
+    shared = shared_memory.SharedMemory(name=name)
+    positions, parents, movable, moved = _views(shared.buf, num_entities)
+    _worker.update(
+        shared_memory = shared,     # kept referenced so that the views stay valid
+        positions = positions,
+        parents = parents,
+        movable = movable,
+        moved = moved,
+        scenario = scenario,
+        step_size = step_size,
+        dist_behind = dist_behind,
+        map_size = map_size
+    )
+
+def _step_range(start: int, stop: int, read: int) -> None:
+    """
+        Steps the movable roots among rows start .. stop-1, reading positions from buffer 'read' and writing them
+        to the other buffer.
+    """
+    current = _worker["positions"][read]
+    new = _worker["positions"][1 - read]
+    new[start:stop] = current[start:stop]
+
+    roots = start + np.flatnonzero(_worker["movable"][start:stop])
+    if len(roots) > 0:
+        if _worker["scenario"] == PositioningScenario.ScenarioA:
+            new[roots] = new_positions_scenario_a(current, _worker["parents"], roots, _worker["map_size"], _worker["step_size"])
+        else:
+            new[roots] = new_positions_scenario_b(current, _worker["parents"], roots, _worker["map_size"], _worker["step_size"], _worker["dist_behind"])
+    _worker["moved"][start:stop] = np.any(new[start:stop] != current[start:stop], axis=1)
@@ -0,0 +1,175 @@
+from resources.containers import EntityPosition
+from resources.entity import Entity
+
+import numpy as np
+
+class PopulationStore:
+    """
+        Array-backed (struct-of-arrays) storage of a population. Instead of every entity owning its own
+        position and history, the state of all entities is held in NumPy arrays indexed by entity ID:
+            - positions: (N, 2) current positions
+            - radii: (N,) entity radii
+            - is_root: (N,) root flags
+            - parents: (N, 2) IDs of the two parents of a root entity, -1 if the entity has no parents
+            - history: (N, H, 2) ring buffer of the last H positions of every entity
+
+        The per-entity Entity API remains available through EntityView objects (see views()) which read from
+        and write to a row of the store.
+    """
+    def __init__(self, positions: np.ndarray, radii: np.ndarray, map_size: list[float, float], history_n: int = 5):
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        num_entities = len(self.positions)
+
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (num_entities,)).copy()
+        self.is_root = np.ones(num_entities, dtype=bool)
+        self.parents = np.full((num_entities, 2), -1, dtype=np.int64)
+        self.parents_version = 0   # incremented whenever parents change, so that copies of them know when to refresh
+        self.map_size = np.asarray(map_size, dtype=np.float64)
+
+        # ring buffer of positions, the initial position being the first entry for every entity
+        self.history_n = history_n
+        self.history = np.zeros((num_entities, history_n, 2), dtype=np.float64)
+        self.history[:, 0] = self.positions
+        self.history_len = np.ones(num_entities, dtype=np.int64)
+        self.history_head = np.ones(num_entities, dtype=np.int64) % history_n  # slot of the next write
+
+        # optional ConvergenceTracker fed with the distance of every movement pushed to the history
+        self.convergence_tracker = None
+
+    @classmethod
+    def from_entities(cls, population: list[Entity], map_size: list[float, float]) -> "PopulationStore":
+        """
+            Creates a store from a list of entities. Entity IDs are expected to be 0 .. N-1 since
+            they are used as row indices.
+        """
+        positions = np.zeros((len(population), 2), dtype=np.float64)
+        radii = np.zeros(len(population), dtype=np.float64)
+        for entity in population:
+            positions[entity.id] = (entity.current_position.x, entity.current_position.y)
+            radii[entity.id] = entity.radius
+
+        history_n = population[0]._history_n if len(population) > 0 else 5
+        store = cls(positions, radii, map_size, history_n)
+        for entity in population:
+            store.is_root[entity.id] = entity.is_root()
+        return store
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get_history(self, index: int) -> list[EntityPosition]:
+        """
+            Returns the tracked positions of an entity, oldest first.
+        """
+        length = self.history_len[index]
+        start = (self.history_head[index] - length) % self.history_n
+        slots = (start + np.arange(length)) % self.history_n
+        return [EntityPosition(x = float(x), y = float(y)) for (x, y) in self.history[index, slots]]
+
+    def get_histories(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Returns the tracked positions of all entities as an (N, H, 2) array, oldest first, along with
+            the (N,) number of valid positions of every entity.
+        """
+        starts = (self.history_head - self.history_len) % self.history_n
+        slots = (starts[:, None] + np.arange(self.history_n)) % self.history_n
+        return np.take_along_axis(self.history, slots[:, :, None], axis=1), self.history_len.copy()
+
+    def set_histories(self, histories: np.ndarray, lengths: np.ndarray) -> None:
+        """
+            Replaces the tracked positions of all entities, given as returned by get_histories().
+        """
+        self.history[:] = histories
+        self.history_len[:] = lengths
+        self.history_head[:] = lengths % self.history_n
+
+    def push_history(self, indices: np.ndarray) -> None:
+        """
+            Appends the current positions of the given entities to their tracking history.
+            Indices are expected to be unique.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+
+        heads = self.history_head[indices]
+        if self.convergence_tracker is not None:
+            latest = self.history[indices, (heads - 1) % self.history_n]
+            delta = self.positions[indices] - latest
+            self.convergence_tracker.record_many(indices, np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2))
+
+        self.history[indices, heads] = self.positions[indices]
+        self.history_head[indices] = (heads + 1) % self.history_n
+        self.history_len[indices] = np.minimum(self.history_len[indices] + 1, self.history_n)
+
+    def set_parents(self, triplets: list[list[int]]) -> None:
+        """
+            Records the parents of the roots of the given triplets ([root, parent_a, parent_b]).
+        """
+        if len(triplets) == 0:
+            return
+
+        triplets = np.asarray(triplets, dtype=np.int64).reshape(-1, 3)
+        self.parents[triplets[:, 0]] = triplets[:, 1:]
+        self.parents_version += 1
+
+    def views(self, perception_radius: float, map_size: list[float, float]) -> list["EntityView"]:
+        """
+            Returns one EntityView per row of the store, ordered by ID.
+        """
+        return [EntityView(self, i, perception_radius, map_size) for i in range(len(self))]
+
+
+class EntityView(Entity):
+    """
+        An Entity whose state (position, root flag, tracking history) lives in a row of a PopulationStore.
+        Behaves exactly like an Entity for existing callers, while allowing batched step engines to operate
+        on the whole population at once.
+    """
+    __slots__ = ("_store",)
+
+    def __init__(self, store: PopulationStore, index: int, perception_radius: float, map_size: list[float, float]):
+        # Entity.__init__() is deliberately not called: all state it would create is owned by the store
+        self._store = store
+        self.id = index
+        self.perception_radius = perception_radius
+        self._map_size = map_size
+        self._history_n = store.history_n
+        self._initial_position = EntityPosition(x = float(store.history[index, 0, 0]), y = float(store.history[index, 0, 1]))
+        self._convergence_tracker = None
+        self._tracker_slot = None
+
+    @property
+    def radius(self) -> float:
+        return float(self._store.radii[self.id])
+
+    @radius.setter
+    def radius(self, value: float) -> None:
+        self._store.radii[self.id] = value
+
+    @property
+    def current_position(self) -> EntityPosition:
+        row = self._store.positions[self.id]
+        return EntityPosition(x = float(row[0]), y = float(row[1]))
+
+    @current_position.setter
+    def current_position(self, position: EntityPosition) -> None:
+        self._store.positions[self.id] = (position.x, position.y)
+
+    @property
+    def _is_root(self) -> bool:
+        return bool(self._store.is_root[self.id])
+
+    @_is_root.setter
+    def _is_root(self, value: bool) -> None:
+        self._store.is_root[self.id] = value
+
+    @property
+    def _last_n_positions(self) -> list[EntityPosition]:
+        return self._store.get_history(self.id)
+
+    def _update_tracking_history(self, position: EntityPosition) -> None:
+        """
+            Stores last N positions of entity in the store's ring buffer
+        """
+        self._store.push_history([self.id])
@@ -0,0 +1,93 @@
+import numpy as np
+
+# phases of a game that draw random numbers, each with streams of its own
+SPAWN = 0
+TRIPLETS = 1
+PROMOTION = 2
+STEP_ORDER = 3
+
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+class RandomStreams:
+    """
+        Random numbers of a game drawn from independent streams, one per (seed, phase, timestep, entity ID), so that
+        what an entity draws does not depend on the order entities are processed in, how they are batched, or how
+        many workers process them.
+
+        The key of every (phase, timestep) is derived from the seed by NumPy's SeedSequence, as if spawned with
+        spawn_key=(phase, timestep). Within it, the stream of an entity is counter-based: its j-th draw is a SplitMix64
+        hash of (key, entity ID, j), so that the draws of any set of entities are computed at once instead of creating
+        a Generator per entity.
+    """
+    def __init__(self, seed: int = None):
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._keys : dict[tuple[int, int], np.uint64] = {}
+
+    @property
+    def entropy(self) -> int:
+        """
+            Entropy the streams are derived from: the seed, or the one drawn from the OS if no seed was given.
+        """
+        return self._seed_sequence.entropy
+
+    def seed_sequence(self, phase: int, timestep: int = 0) -> np.random.SeedSequence:
+        """
+            SeedSequence of a phase and timestep, e.g. to seed a Generator drawing for all entities at once.
+        """
+        return np.random.SeedSequence(self._seed_sequence.entropy, spawn_key=(phase, timestep))
+
+    def uniform(self, phase: int, timestep: int, ids: np.ndarray, num_draws: int, first_draw: int = 0) -> np.ndarray:
+        """
+            Returns (len(ids), num_draws) numbers uniform in [0, 1): draws first_draw .. first_draw+num_draws-1 of the
+            streams of the given entities.
+        """
+        key = self._key(phase, timestep)
+        ids = np.asarray(ids, dtype=np.uint64).reshape(-1, 1)
+        draws = np.arange(first_draw, first_draw + num_draws, dtype=np.uint64).reshape(1, -1)
+        streams = _mix(key + (ids + np.uint64(1)) * _GOLDEN_GAMMA)
+        values = _mix(streams + (draws + np.uint64(1)) * _GOLDEN_GAMMA)
+        return (values >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def permutation(self, phase: int, timestep: int, ids: np.ndarray) -> np.ndarray:
+        """
+            Returns the indices of ids in a random order, which only depends on the IDs themselves (not on their order).
+        """
+        return np.argsort(self.uniform(phase, timestep, ids, 1)[:, 0], kind="stable")
+
+    def sample_pairs(self, phase: int, timestep: int, ids: np.ndarray, offsets: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """
+            Picks two distinct candidates for every entity, candidates being given in the compressed sparse row form
+            of UniformGrid.query_radius() (those of ids[i] are candidates[offsets[i]:offsets[i+1]]).
+            Returns (len(ids), 2) picks, rows being -1 for entities with fewer than two candidates.
+        """
+        counts = np.diff(offsets)
+        pairs = np.full((len(counts), 2), -1, dtype=np.int64)
+        rows = np.flatnonzero(counts >= 2)
+        if len(rows) == 0:
+            return pairs
+
+        u = self.uniform(phase, timestep, np.asarray(ids)[rows], 2)
+        counts = counts[rows]
+        first = np.minimum((u[:, 0] * counts).astype(np.int64), counts - 1)
+        second = np.minimum((u[:, 1] * (counts - 1)).astype(np.int64), counts - 2)
+        second += second >= first
+        pairs[rows, 0] = candidates[offsets[rows] + first]
+        pairs[rows, 1] = candidates[offsets[rows] + second]
+        return pairs
+
+    def _key(self, phase: int, timestep: int) -> np.uint64:
+        key = self._keys.get((phase, timestep))
+        if key is None:
+            key = self.seed_sequence(phase, timestep).generate_state(1, dtype=np.uint64)[0]
+            if len(self._keys) > 1024:
+                self._keys.clear()
+            self._keys[(phase, timestep)] = key
+        return key
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """
+        SplitMix64 finalizer (uint64 arithmetic wraps around).
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
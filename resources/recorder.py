@@ -0,0 +1,158 @@
+import numpy as np
+import json
+import os
+
+TRAJECTORY_MAGIC = b"WASPTRAJ"
+TRAJECTORY_VERSION = 1
+HEADER_SIZE = 4096  # [bytes] magic followed by JSON metadata, zero padded
+
+class TrajectoryRecorder:
+    """
+        Records the state of the population at every timestep to a preallocated memory-mapped file, so that long runs
+        of large populations can be kept on disk cheaply and rendered later (see render_trajectory.py).
+
+        File layout:
+            - header: magic + JSON metadata (num_entities, max_timesteps, num_timesteps, map_size, ...), HEADER_SIZE bytes
+            - ids: (N,) int64
+            - positions: (T, N, 2) float32
+            - is_root: (T, N) bool
+            - converged: (T, N) bool
+        where T is max_timesteps. Only the first num_timesteps rows are valid. Row t holds timestep first_timestep + t
+        (first_timestep being 0 unless the file was started by a resumed game).
+
+        A game resumed at start_timestep continues the file it recorded to, if it holds at least start_timestep
+        timesteps of the same entities and layout: the recorder then appends from row start_timestep on. Otherwise,
+        the existing file is left untouched and a new one (filepath, suffixed with the timestep) is started.
+    """
+    def __init__(self, filepath: str, ids: list[int], max_timesteps: int, map_size: list[float, float], metadata: dict = None, flush_interval: int = 100, start_timestep: int = 0):
+        self._flush_interval = flush_interval
+        self._metadata = {
+            "version": TRAJECTORY_VERSION,
+            "num_entities": len(ids),
+            "max_timesteps": max_timesteps,
+            "num_timesteps": 0,
+            "first_timestep": 0,
+            "map_size": list(map_size),
+            **(metadata or {})
+        }
+        layout = _layout(len(ids), max_timesteps)
+
+        self.continued = False
+        if start_timestep > 0 and os.path.exists(filepath):
+            self.continued = _can_continue(filepath, self._metadata, ids, start_timestep)
+            if not self.continued:
+                stem, extension = os.path.splitext(filepath)
+                filepath = f"{stem}_from_{start_timestep:06d}{extension}"
+        self.filepath = filepath
+
+        if self.continued:
+            self._file = np.memmap(filepath, dtype=np.uint8, mode="r+", shape=(layout["size"],))
+            self._ids, self._positions, self._is_root, self._converged = _views(self._file, len(ids), max_timesteps)
+            self._metadata["num_timesteps"] = start_timestep
+        else:
+            self._metadata["first_timestep"] = start_timestep
+            self._file = np.memmap(filepath, dtype=np.uint8, mode="w+", shape=(layout["size"],))
+            self._ids, self._positions, self._is_root, self._converged = _views(self._file, len(ids), max_timesteps)
+            self._ids[:] = ids
+        self._write_header()
+
+    @property
+    def num_timesteps(self) -> int:
+        return self._metadata["num_timesteps"]
+
+    def append(self, positions: np.ndarray, is_root: np.ndarray, converged: np.ndarray) -> bool:
+        """
+            Appends the state of one timestep. Returns False if the file is full.
+        """
+        t = self._metadata["num_timesteps"]
+        if t >= self._metadata["max_timesteps"]:
+            return False
+
+        self._positions[t] = positions
+        self._is_root[t] = is_root
+        self._converged[t] = converged
+        self._metadata["num_timesteps"] = t + 1
+        if (t + 1) % self._flush_interval == 0:
+            self.flush()
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        del self._ids, self._positions, self._is_root, self._converged
+        del self._file
+
+    def flush(self) -> None:
+        self._write_header()
+        self._file.flush()
+
+    def _write_header(self) -> None:
+        encoded = TRAJECTORY_MAGIC + json.dumps(self._metadata).encode("utf-8")
+        if len(encoded) > HEADER_SIZE:
+            raise ValueError(f"Trajectory metadata does not fit in {HEADER_SIZE} bytes")
+        self._file[:HEADER_SIZE] = 0
+        self._file[:len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+
+class Trajectory:
+    """
+        Read-only, memory-mapped access to a file written by TrajectoryRecorder. Arrays are trimmed to the
+        timesteps that were recorded, and nothing is loaded from disk until it is indexed.
+    """
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        with open(filepath, "rb") as stream:
+            header = stream.read(HEADER_SIZE)
+        if not header.startswith(TRAJECTORY_MAGIC):
+            raise ValueError(f"{filepath} is not a trajectory file")
+        self.metadata = json.loads(header[len(TRAJECTORY_MAGIC):].rstrip(b"\0").decode("utf-8"))
+
+        num_entities = self.metadata["num_entities"]
+        max_timesteps = self.metadata["max_timesteps"]
+        num_timesteps = self.metadata["num_timesteps"]
+        self._file = np.memmap(filepath, dtype=np.uint8, mode="r", shape=(_layout(num_entities, max_timesteps)["size"],))
+        ids, positions, is_root, converged = _views(self._file, num_entities, max_timesteps)
+        self.ids = ids
+        self.positions = positions[:num_timesteps]
+        self.is_root = is_root[:num_timesteps]
+        self.converged = converged[:num_timesteps]
+
+    @property
+    def map_size(self) -> list[float, float]:
+        return self.metadata["map_size"]
+
+    @property
+    def num_timesteps(self) -> int:
+        return len(self.positions)
+
+def _can_continue(filepath: str, metadata: dict, ids: list[int], start_timestep: int) -> bool:
+    """
+        Whether a recorder with the given metadata can continue the trajectory in filepath from row start_timestep.
+    """
+    try:
+        trajectory = Trajectory(filepath)
+    except (ValueError, OSError):
+        return False
+    existing = trajectory.metadata
+    if any(existing.get(key) != metadata[key] for key in ("version", "num_entities", "max_timesteps", "map_size")):
+        return False
+    if existing.get("first_timestep", 0) != 0 or existing["num_timesteps"] < start_timestep:
+        return False
+    return bool(np.array_equal(trajectory.ids, ids))
+
+def _layout(num_entities: int, max_timesteps: int) -> dict:
+    """
+        Byte offsets of the sections of a trajectory file.
+    """
+    ids = HEADER_SIZE
+    positions = ids + 8 * num_entities
+    is_root = positions + 4 * 2 * num_entities * max_timesteps
+    converged = is_root + num_entities * max_timesteps
+    size = converged + num_entities * max_timesteps
+    return {"ids": ids, "positions": positions, "is_root": is_root, "converged": converged, "size": size}
+
+def _views(file: np.memmap, num_entities: int, max_timesteps: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    layout = _layout(num_entities, max_timesteps)
+    ids = file[layout["ids"]:layout["positions"]].view(np.int64)
+    positions = file[layout["positions"]:layout["is_root"]].view(np.float32).reshape(max_timesteps, num_entities, 2)
+    is_root = file[layout["is_root"]:layout["converged"]].view(bool).reshape(max_timesteps, num_entities)
+    converged = file[layout["converged"]:layout["size"]].view(bool).reshape(max_timesteps, num_entities)
+    return ids, positions, is_root, converged
@@ -0,0 +1,309 @@
+from resources.config import apply_overrides
+from resources.game import Game
+from resources.step_view import StepView
+from resources.sweep import make_headless
+
+from dataclasses import asdict
+from multiprocessing import resource_tracker, shared_memory
+import asyncio
+import itertools
+import json
+import numpy as np
+import os
+import socket
+import time
+import yaml
+
+DEFAULT_SOCKET_PATH = "/tmp/triplet_game.sock"
+SLICE_TIMESTEPS = 10    # timesteps a game is stepped for before other requests get their turn
+
+# names of the shared memory blocks created by this process (see SharedState)
+_created_names = set()
+
+class SharedState:
+    """
+        State of a game published in a shared memory block, so that other processes can read it without copies or
+        requests going through the socket:
+            - header: (2,) int64, a sequence number and the timestep of the state
+            - positions: (N, 2) float64
+            - is_root: (N,) bool
+            - converged: (N,) bool
+
+        The sequence number is odd while the state is being written. A reader has a consistent state if the sequence
+        number is even and has not changed between before and after reading (see snapshot()).
+    """
+    def __init__(self, num_entities: int, name: str = None):
+        create = name is None
+        self._shared_memory = shared_memory.SharedMemory(name=name, create=create, size=_state_size(num_entities) if create else 0)
+        if create:
+            _created_names.add(self._shared_memory.name)
+        elif self._shared_memory.name not in _created_names:
+            # the block belongs to the service: the resource tracker of a reader must not unlink it when the reader exits
+            resource_tracker.unregister(self._shared_memory._name, "shared_memory")
+        self._owner = create
+        self.header, self.positions, self.is_root, self.converged = _state_views(self._shared_memory.buf, num_entities)
+
+    @property
+    def name(self) -> str:
+        return self._shared_memory.name
+
+    @property
+    def timestep(self) -> int:
+        return int(self.header[1])
+
+    def publish(self, view: StepView) -> None:
+        self.header[0] += 1
+        self.header[1] = view.timestep
+        self.positions[:] = view.positions
+        self.is_root[:] = view.is_root
+        self.converged[:] = view.converged
+        self.header[0] += 1
+
+    def snapshot(self) -> tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Copies a consistent state: timestep, positions, root flags and convergence flags.
+        """
+        while True:
+            sequence = int(self.header[0])
+            if sequence % 2 == 0:
+                state = (int(self.header[1]), self.positions.copy(), self.is_root.copy(), self.converged.copy())
+                if int(self.header[0]) == sequence:
+                    return state
+            time.sleep(0)
+
+    def close(self) -> None:
+        """
+            Releases the block, which is also destroyed if it was created by this object.
+        """
+        # views into the shared memory must be released before it can be closed
+        self.header = self.positions = self.is_root = self.converged = None
+        self._shared_memory.close()
+        if self._owner:
+            self._shared_memory.unlink()
+            _created_names.discard(self._shared_memory.name)
+
+def _state_size(num_entities: int) -> int:
+    return 2 * 8 + num_entities * (2 * 8 + 1 + 1)
+
+def _state_views(buffer, num_entities: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    offset = 0
+    header = np.ndarray((2,), dtype=np.int64, buffer=buffer, offset=offset)
+    offset += header.nbytes
+    positions = np.ndarray((num_entities, 2), dtype=np.float64, buffer=buffer, offset=offset)
+    offset += positions.nbytes
+    is_root = np.ndarray((num_entities,), dtype=bool, buffer=buffer, offset=offset)
+    offset += is_root.nbytes
+    converged = np.ndarray((num_entities,), dtype=bool, buffer=buffer, offset=offset)
+    return header, positions, is_root, converged
+
+class ServedGame:
+    """
+        A game held by the service, played one timestep at a time through Game.iter_steps().
+    """
+    def __init__(self, game_id: int, game: Game):
+        self.game_id = game_id
+        self.game = game
+        self.lock = asyncio.Lock()      # requests to the same game are served one at a time, in order
+        self.view = game.view()
+        self.ended = False
+        self.closed = False
+        self._steps = game.iter_steps()
+        self.state = SharedState(len(self.view.converged))
+        self.state.publish(self.view)
+
+    def advance(self, num_timesteps: int) -> int:
+        """
+            Plays up to num_timesteps timesteps and publishes the resulting state. Returns the number played.
+        """
+        num_played = 0
+        while num_played < num_timesteps and not self.ended:
+            view = next(self._steps, None)
+            if view is None:
+                self.ended = True
+                break
+            self.view = view
+            num_played += 1
+        self.state.publish(self.view)
+        return num_played
+
+    def status(self) -> dict:
+        summary = self.game.summary
+        return {
+            "game_id": self.game_id,
+            "timestep": self.view.timestep,
+            "num_converged": self.view.num_converged,
+            "num_active": self.view.num_active,
+            "ended": self.ended,
+            "summary": None if summary is None else asdict(summary),
+            "shared_memory": self.state.name,
+            "num_entities": len(self.view.converged)
+        }
+
+    def close(self) -> None:
+        self.closed = True
+        self._steps.close()
+        self.game.close()
+        self.state.close()
+
+class SimulationService:
+    """
+        Long-lived service keeping games loaded, so that they are created once and played over many requests
+        without paying for interpreter start, imports and setup every time.
+
+        Clients connect to a Unix domain socket and send one JSON request per line, answered by one JSON line:
+            - {"op": "create", "config": <filepath>, "overrides": {<param>: <value>}}: creates a headless game
+              (config defaults to config/params.yaml, overrides address nested parameters with dots)
+            - {"op": "step", "game_id": <id>, "timesteps": <n>}: plays n timesteps (1 by default)
+            - {"op": "run", "game_id": <id>}: plays until the game ends
+            - {"op": "query", "game_id": <id>}: returns the status of a game
+            - {"op": "list"}: returns the status of all games
+            - {"op": "close", "game_id": <id>}: drops a game
+            - {"op": "shutdown"}: drops all games and stops the service
+        Answers hold "ok" and, on success, the status of the game: timestep, convergence counts, whether it ended
+        with its summary, and the name of the shared memory block holding its state (see SharedState), which is
+        updated after every request.
+
+        Requests are served concurrently. Games are played SLICE_TIMESTEPS timesteps at a time, after which other
+        requests get their turn, so that long runs do not hold up other games.
+    """
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, slice_timesteps: int = SLICE_TIMESTEPS):
+        self._socket_path = socket_path
+        self._slice_timesteps = max(1, slice_timesteps)
+        self._games : dict[int, ServedGame] = {}
+        self._game_ids = itertools.count()
+        self._server = None
+
+    async def serve_forever(self) -> None:
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self._socket_path)
+        print(f"Serving games on {self._socket_path}")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for served in self._games.values():
+                served.close()
+            self._games.clear()
+            if os.path.exists(self._socket_path):
+                os.unlink(self._socket_path)
+            print(f"Service stopped")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self._dispatch(json.loads(line))
+                except Exception as exc:
+                    response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # clients that are still connected when the service stops are cancelled
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "create":
+            try:
+                served = await self._create(request.get("config", "config/params.yaml"), request.get("overrides", {}))
+            except ValueError as exc:
+                # invalid parameters, as reported by Game
+                return {"ok": False, "error": str(exc)}
+            return {"ok": True, **served.status()}
+        if op == "list":
+            return {"ok": True, "games": [served.status() for served in self._games.values()]}
+        if op == "shutdown":
+            # ends serve_forever() once this answer is sent
+            asyncio.get_running_loop().call_soon(self._server.close)
+            return {"ok": True}
+
+        served = self._games.get(request.get("game_id"))
+        if served is None:
+            return {"ok": False, "error": f"No game with ID {request.get('game_id')}"}
+        if op == "query":
+            return {"ok": True, **served.status()}
+        if op in ("step", "run"):
+            if not await self._play(served, request.get("timesteps", 1) if op == "step" else None):
+                return {"ok": False, "error": f"No game with ID {served.game_id}"}
+            return {"ok": True, **served.status()}
+        if op == "close":
+            async with served.lock:
+                if served.closed:
+                    return {"ok": False, "error": f"No game with ID {served.game_id}"}
+                served.close()
+                del self._games[served.game_id]
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown operation {op}"}
+
+    async def _create(self, config_filepath: str, overrides: dict) -> ServedGame:
+        """
+            Creates a game in a worker thread, so that creating a large game does not hold up the requests of
+            other clients.
+        """
+        game = await asyncio.get_running_loop().run_in_executor(None, _create_game, config_filepath, overrides)
+        game_id = next(self._game_ids)
+        served = ServedGame(game_id, game)
+        self._games[game_id] = served
+        return served
+
+    async def _play(self, served: ServedGame, num_timesteps: int = None) -> bool:
+        """
+            Plays num_timesteps timesteps of a game (or until it ends if None), one slice at a time.
+            Returns False if the game was closed before it could be played.
+        """
+        async with served.lock:
+            if served.closed:
+                # a close request held the lock first
+                return False
+            remaining = num_timesteps
+            while not served.ended and not served.closed and (remaining is None or remaining > 0):
+                num_played = served.advance(self._slice_timesteps if remaining is None else min(remaining, self._slice_timesteps))
+                if remaining is not None:
+                    remaining -= num_played
+                # let other requests play a slice of their own
+                await asyncio.sleep(0)
+        return not served.closed
+
+def _create_game(config_filepath: str, overrides: dict) -> Game:
+    with open(config_filepath) as stream:
+        params = yaml.safe_load(stream)
+    return Game(params=make_headless(apply_overrides(params, overrides)))
+
+class ServiceClient:
+    """
+        Blocking client of a SimulationService, e.g.
+            client = ServiceClient()
+            game = client.request("create", overrides={"random_seed": 3})
+            client.request("run", game_id=game["game_id"])
+            state = client.attach(game)     # SharedState, positions can be read directly
+    """
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socket_path)
+        self._stream = self._socket.makefile("rwb")
+
+    def request(self, op: str, **fields) -> dict:
+        """
+            Sends a request and returns the answer. Raises RuntimeError if the request failed.
+        """
+        self._stream.write((json.dumps({"op": op, **fields}) + "\n").encode())
+        self._stream.flush()
+        response = json.loads(self._stream.readline())
+        if not response.get("ok", False):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    def attach(self, status: dict) -> SharedState:
+        """
+            Maps the shared state of a game, given its status (as returned by requests). Has to be closed once done.
+        """
+        return SharedState(status["num_entities"], name=status["shared_memory"])
+
+    def close(self) -> None:
+        self._stream.close()
+        self._socket.close()
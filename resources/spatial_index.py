@@ -0,0 +1,109 @@
+import numpy as np
+
+class UniformGrid:
+    """
+        Spatial index bucketing points into square cells of a uniform grid. With the cell size set to the
+        perception radius, all neighbors of a point within that radius are found in the 3x3 block of cells
+        around it, so radius queries cost O(N) overall instead of O(N^2).
+
+        Points are stored sorted by cell key, which lets a batch of queries be answered with a few
+        array operations per neighboring cell offset.
+    """
+    def __init__(self, points: np.ndarray, cell_size: float):
+        self._points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self._cell_size = max(float(cell_size), 1e-9)   # should be positive
+
+        if len(self._points) == 0:
+            self._origin = np.zeros(2, dtype=np.int64)
+            self._shape = np.ones(2, dtype=np.int64)
+        else:
+            cells = self._to_cells(self._points, origin=np.zeros(2, dtype=np.int64))
+            self._origin = cells.min(axis=0)
+            self._shape = cells.max(axis=0) - self._origin + 1
+
+        keys = self._to_keys(self._to_cells(self._points))
+        self._order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def query_radius(self, queries: np.ndarray, radius: float, exclude: np.ndarray = None, chunk_size: int = 65536) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Finds, for every query point, the indices of all indexed points within radius (inclusive).
+            If exclude is given, exclude[k] is an index that is left out of the result of queries[k]
+            (typically the query point itself).
+
+            Results are returned in compressed sparse row form: the neighbors of queries[k] are
+            indices[offsets[k]:offsets[k+1]], sorted in ascending order.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if exclude is not None:
+            exclude = np.asarray(exclude, dtype=np.int64)
+
+        neighbor_counts = np.zeros(len(queries), dtype=np.int64)
+        neighbor_chunks = []
+        for start in range(0, len(queries), chunk_size):
+            stop = min(start + chunk_size, len(queries))
+            chunk_exclude = None if exclude is None else exclude[start:stop]
+            query_ids, neighbor_ids = self._query_chunk(queries[start:stop], radius, chunk_exclude)
+            neighbor_counts[start:stop] = np.bincount(query_ids, minlength=stop - start)
+            neighbor_chunks.append(neighbor_ids)
+
+        offsets = np.zeros(len(queries) + 1, dtype=np.int64)
+        np.cumsum(neighbor_counts, out=offsets[1:])
+        indices = np.concatenate(neighbor_chunks) if len(neighbor_chunks) > 0 else np.zeros(0, dtype=np.int64)
+        return offsets, indices
+
+    def _query_chunk(self, queries: np.ndarray, radius: float, exclude: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+            Returns (query_ids, neighbor_ids) pairs sorted by query and then by neighbor.
+        """
+        query_cells = self._to_cells(queries)
+        reach = int(np.ceil(radius / self._cell_size))
+
+        query_ids = []
+        neighbor_ids = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                cells = query_cells + (dx, dy)
+                valid = np.all((cells >= 0) & (cells < self._shape), axis=1)
+                keys = self._to_keys(cells)
+
+                first = np.searchsorted(self._sorted_keys, keys, side="left")
+                last = np.searchsorted(self._sorted_keys, keys, side="right")
+                counts = np.where(valid, last - first, 0)
+                total = counts.sum()
+                if total == 0:
+                    continue
+
+                # expand every [first, last) range into the individual sorted positions it covers
+                range_starts = np.cumsum(counts) - counts
+                query_ids.append(np.repeat(np.arange(len(queries)), counts))
+                positions = np.repeat(first, counts) + (np.arange(total) - np.repeat(range_starts, counts))
+                neighbor_ids.append(self._order[positions])
+
+        if len(query_ids) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        query_ids = np.concatenate(query_ids)
+        neighbor_ids = np.concatenate(neighbor_ids)
+
+        dx = queries[query_ids, 0] - self._points[neighbor_ids, 0]
+        dy = queries[query_ids, 1] - self._points[neighbor_ids, 1]
+        keep = np.sqrt(dx ** 2 + dy ** 2) <= radius
+        if exclude is not None:
+            keep &= (neighbor_ids != exclude[query_ids])
+        query_ids = query_ids[keep]
+        neighbor_ids = neighbor_ids[keep]
+
+        order = np.lexsort((neighbor_ids, query_ids))
+        return query_ids[order], neighbor_ids[order]
+
+    def _to_cells(self, points: np.ndarray, origin: np.ndarray = None) -> np.ndarray:
+        if origin is None:
+            origin = self._origin
+        return np.floor(points / self._cell_size).astype(np.int64) - origin
+
+    def _to_keys(self, cells: np.ndarray) -> np.ndarray:
+        return cells[:, 0] * self._shape[1] + cells[:, 1]
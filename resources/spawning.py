@@ -0,0 +1,175 @@
+from resources.spatial_index import UniformGrid
+
+import numpy as np
+
+# a Poisson-disk packing (as grown by spawn_poisson_disk) holds about one point per 1.56 * d^2 of map area, d being
+# the minimum distance between points (measured on 20x20 to 400x400 maps)
+POISSON_DISK_AREA_PER_POINT = 1.56
+
+class Spawner:
+    """
+        Places entities at random, collision-free positions in the map. Two entities are in collision if their
+        separation (distance between centers minus both radii) is below min_separation, the same criterion as
+        CollisionChecker, so centers have to be at least min_distance = 2 * radius + min_separation apart.
+
+        Accepted positions are kept in a background grid whose cells are min_distance / sqrt(2) wide: such a cell
+        can hold at most one entity, and every entity that could collide with a candidate lies in the 5x5 block
+        of cells around it. Checking a candidate is therefore a constant number of array lookups.
+
+        Two modes are available:
+            - batched rejection sampling: candidates are drawn uniformly in NumPy batches and rejected if
+              they collide with an accepted entity or with an earlier candidate of the same batch
+            - Poisson-disk sampling (Bridson's algorithm): a maximal packing of the map is grown outwards from random
+              seed points, with the largest minimum distance for which it holds the requested number of positions.
+              Entities are spread more evenly than with rejection sampling, but a full map holds about 10% fewer
+              of them, and it is several times slower; its cost grows with the number of entities.
+    """
+    def __init__(self, map_size: list[float, float], radius: float, min_separation: float = 0.0, seed: int = None, batch_size: int = 4096):
+        self._map_size = np.asarray(map_size, dtype=np.float64)
+        self._min_distance = 2.0 * radius + max(0.0, min_separation)
+        self._rng = np.random.default_rng(seed)
+        self._batch_size = batch_size
+
+        self._cell_size = self._min_distance / np.sqrt(2.0)
+        if self._min_distance > 0:
+            self._grid_shape = (np.floor(self._map_size / self._cell_size).astype(np.int64) + 1)
+        else:
+            self._grid_shape = np.ones(2, dtype=np.int64)
+
+    def spawn_batched(self, num_entities: int, max_batches: int = 10000, patience: int = 50) -> np.ndarray:
+        """
+            Returns (num_entities, 2) collision-free positions drawn uniformly at random. Fewer positions are returned
+            if the map could not fit the population within max_batches batches of candidates, or if 'patience'
+            consecutive batches did not add a single entity (the map is then considered full).
+        """
+        if self._min_distance <= 0:
+            return self._rng.uniform((0.0, 0.0), self._map_size, size=(num_entities, 2))
+
+        grid, positions, count = self._empty_grid(num_entities)
+        num_fruitless_batches = 0
+        for _ in range(max_batches):
+            if (count == num_entities) or (num_fruitless_batches >= patience):
+                break
+
+            candidates = self._rng.uniform((0.0, 0.0), self._map_size, size=(self._batch_size, 2))
+            candidates = candidates[~self._in_collision(candidates, grid, positions)]
+            candidates = candidates[~self._in_collision_with_earlier(candidates)]
+
+            candidates = candidates[:num_entities - count]
+            self._insert(candidates, grid, positions, count)
+            count += len(candidates)
+            num_fruitless_batches = 0 if len(candidates) > 0 else num_fruitless_batches + 1
+
+        return positions[:count]
+
+    def spawn_poisson_disk(self, num_entities: int, num_attempts: int = 30, num_active: int = 4096) -> np.ndarray:
+        """
+            Returns (num_entities, 2) collision-free positions picked at random from a Poisson-disk packing of the map.
+            The minimum distance of the packing is raised so that it holds about 10% more than num_entities positions
+            (and lowered again, down to the collision distance, if it turns out to hold fewer). Fewer positions are
+            returned if even the packing with the collision distance holds fewer than num_entities positions.
+
+            num_attempts: number of candidates tried around an active point before it is retired (k in Bridson's algorithm)
+            num_active: number of active points expanded together in one batch
+        """
+        if self._min_distance <= 0:
+            return self._rng.uniform((0.0, 0.0), self._map_size, size=(num_entities, 2))
+
+        distance = max(self._min_distance, np.sqrt(np.prod(self._map_size) / (1.1 * max(1, num_entities) * POISSON_DISK_AREA_PER_POINT)))
+        while True:
+            # the spawner of the packing draws from the same generator
+            packer = self if distance <= self._min_distance else Spawner(self._map_size, radius=distance / 2.0, seed=self._rng)
+            positions = packer._poisson_disk_packing(num_attempts, num_active)
+            if len(positions) >= num_entities or distance <= self._min_distance:
+                break
+            distance = max(self._min_distance, distance / 1.1)
+
+        if len(positions) <= num_entities:
+            return self._rng.permutation(positions)
+        return positions[self._rng.choice(len(positions), size=num_entities, replace=False)]
+
+    def _poisson_disk_packing(self, num_attempts: int, num_active: int) -> np.ndarray:
+        """
+            Returns the positions of a maximal Poisson-disk packing of the map, in the order they were accepted.
+        """
+        capacity = int(np.prod(self._grid_shape))
+        grid, positions, count = self._empty_grid(capacity)
+
+        # the packing grows outwards from random seed points, about one per (16 * min_distance)^2 area
+        num_seeds = max(1, int(np.prod(self._map_size) / (16.0 * self._min_distance) ** 2))
+        seeds = self._rng.uniform((0.0, 0.0), self._map_size, size=(num_seeds, 2))
+        seeds = seeds[~self._in_collision_with_earlier(seeds)]
+        self._insert(seeds, grid, positions, count)
+        count += len(seeds)
+        active = np.arange(count, dtype=np.int64)
+        while len(active) > 0:
+            # expand a random subset of active points, trying candidates in the annulus [min_distance, 2 * min_distance) around each
+            picked = self._rng.permutation(len(active))[:num_active]
+            owners = np.repeat(picked, num_attempts)
+            distance = self._min_distance * np.sqrt(self._rng.uniform(1.0, 4.0, size=len(owners)))
+            angle = self._rng.uniform(0.0, 2.0 * np.pi, size=len(owners))
+            candidates = positions[active[owners]] + np.stack((distance * np.cos(angle), distance * np.sin(angle)), axis=1)
+
+            valid = np.all((candidates >= 0.0) & (candidates <= self._map_size), axis=1)
+            valid[valid] = ~self._in_collision(candidates[valid], grid, positions)
+
+            # an active point is retired once none of its candidates fit
+            num_valid = np.bincount(owners[valid], minlength=len(active))
+            retired = np.zeros(len(active), dtype=bool)
+            retired[picked] = num_valid[picked] == 0
+
+            candidates = candidates[valid]
+            candidates = candidates[~self._in_collision_with_earlier(candidates)]
+            self._insert(candidates, grid, positions, count)
+            active = np.concatenate((active[~retired], np.arange(count, count + len(candidates))))
+            count += len(candidates)
+
+        return positions[:count]
+
+    def _empty_grid(self, capacity: int) -> tuple[np.ndarray, np.ndarray, int]:
+        # the grid is padded with two empty cells on every side so that neighborhoods never fall outside of it
+        grid = np.full(self._grid_shape + 4, -1, dtype=np.int64)
+        positions = np.zeros((capacity, 2), dtype=np.float64)
+        return grid, positions, 0
+
+    def _in_collision(self, candidates: np.ndarray, grid: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """
+            Returns a mask of the candidates that collide with a position already in the grid.
+        """
+        cells = self._to_cells(candidates)
+        collides = np.zeros(len(candidates), dtype=bool)
+        # candidates found in collision are not looked up in the remaining cells, nearest cells first
+        remaining = np.arange(len(candidates))
+        for dx, dy in _NEIGHBOR_CELLS:
+            occupants = grid[cells[remaining, 0] + dx, cells[remaining, 1] + dy]
+            occupied = occupants >= 0
+            delta = candidates[remaining[occupied]] - positions[occupants[occupied]]
+            hits = remaining[occupied][np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2) < self._min_distance]
+            if len(hits) > 0:
+                collides[hits] = True
+                remaining = remaining[~collides[remaining]]
+        return collides
+
+    def _in_collision_with_earlier(self, candidates: np.ndarray) -> np.ndarray:
+        """
+            Returns a mask of the candidates that collide with an earlier candidate of the same batch.
+        """
+        if len(candidates) < 2:
+            return np.zeros(len(candidates), dtype=bool)
+
+        offsets, neighbors = UniformGrid(candidates, self._min_distance).query_radius(candidates, self._min_distance, exclude=np.arange(len(candidates)))
+        candidate_ids = np.repeat(np.arange(len(candidates)), np.diff(offsets))
+        delta = candidates[candidate_ids] - candidates[neighbors]
+        conflicting = (neighbors < candidate_ids) & (np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2) < self._min_distance)
+        return np.bincount(candidate_ids[conflicting], minlength=len(candidates)) > 0
+
+    def _insert(self, new_positions: np.ndarray, grid: np.ndarray, positions: np.ndarray, count: int) -> None:
+        cells = self._to_cells(new_positions)
+        positions[count:count + len(new_positions)] = new_positions
+        grid[cells[:, 0], cells[:, 1]] = np.arange(count, count + len(new_positions))
+
+    def _to_cells(self, points: np.ndarray) -> np.ndarray:
+        return np.floor(points / self._cell_size).astype(np.int64) + 2     # offset by the grid padding
+
+# offsets of the 5x5 block of cells around a cell, nearest first
+_NEIGHBOR_CELLS = sorted(((dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)), key=lambda cell: cell[0] ** 2 + cell[1] ** 2)
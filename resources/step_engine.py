@@ -0,0 +1,134 @@
+from resources.math_utils import distance_from_point_to_line_between_two_points_batch, point_falls_between_two_points_batch
+from resources.population import PopulationStore
+
+import numpy as np
+
+def clamp_positions(positions: np.ndarray, map_size: np.ndarray) -> np.ndarray:
+    """
+        Clamps (N, 2) positions to be inside the map. Operates in place and returns the same array.
+    """
+    np.clip(positions, 0.0, map_size, out=positions)
+    return positions
+
+def move_towards_batch(current: np.ndarray, target: np.ndarray, step_size: float = None) -> np.ndarray:
+    """
+        Batched counterpart of Entity.move_towards(): returns the (N, 2) positions reached when moving
+        from current towards target.
+
+        step_size:
+            - If not specified, jump to target
+            - If specified, move at most step_size towards target (overshooting cannot happen)
+    """
+    if step_size is None:
+        return target.copy()
+
+    delta = target - current
+    distance = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2)
+
+    arrives = step_size >= distance
+    new_positions = target.copy()
+    stepping = ~arrives
+    new_positions[stepping] = current[stepping] + (delta[stepping] / distance[stepping, None]) * step_size
+    return new_positions
+
+def movable_roots(store: PopulationStore, frozen: np.ndarray = None, candidates: np.ndarray = None) -> np.ndarray:
+    """
+        IDs of the root entities of the store that have parents, leaving out frozen ones (mask over all entities).
+        If candidate IDs are given (e.g. by an ActiveSet), only those are considered, in time proportional to their number.
+    """
+    if candidates is not None:
+        movable = store.is_root[candidates] & (store.parents[candidates, 0] >= 0)
+        if frozen is not None:
+            movable &= ~frozen[candidates]
+        return candidates[movable]
+
+    movable = store.is_root & (store.parents[:, 0] >= 0)
+    if frozen is not None:
+        movable &= ~frozen
+    return np.flatnonzero(movable)
+
+def new_positions_scenario_a(positions: np.ndarray, parents: np.ndarray, roots: np.ndarray, map_size: np.ndarray, step_size: float = None) -> np.ndarray:
+    """
+        Positions reached by the given roots when moving towards the halfway mark between their parents,
+        reading all positions from the (N, 2) positions (parents being the (N, 2) parents of all entities).
+        Every row only depends on the positions it reads, so any subset of roots can be computed independently.
+    """
+    current = positions[roots]
+    parents = parents[roots]
+    halfway_mark = (positions[parents[:, 0]] + positions[parents[:, 1]]) / 2.0
+    return clamp_positions(move_towards_batch(current, halfway_mark, step_size), map_size)
+
+def step_scenario_a(store: PopulationStore, step_size: float = None, frozen: np.ndarray = None, candidates: np.ndarray = None) -> np.ndarray:
+    """
+        Moves every root entity of the store towards the halfway mark between its parents, all at once.
+        Every root reads the positions of its parents from before the step (synchronous update).
+        Entities in the optional frozen mask do not move, and only candidate IDs move if given (see movable_roots()).
+
+        Returns the IDs of entities that moved.
+    """
+    roots = movable_roots(store, frozen, candidates)
+    if len(roots) == 0:
+        return roots
+
+    current = store.positions[roots]
+    new_positions = new_positions_scenario_a(store.positions, store.parents, roots, store.map_size, step_size)
+
+    moved = np.any(new_positions != current, axis=1)
+    store.positions[roots] = new_positions
+    store.push_history(roots[moved])
+    return roots[moved]
+
+def targets_behind_batch(current: np.ndarray, shield_from: np.ndarray, use_as_shield: np.ndarray, dist_behind: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Batched counterpart of the targets picked by Entity.move_behind_entity(), for (N, 2) arrays of positions:
+            - if use_as_shield falls between shield_from and current, the closest point to current on the line
+              through shield_from and use_as_shield
+            - otherwise, the point dist_behind beyond use_as_shield, seen from shield_from
+        Returns the (N, 2) targets and a mask of the rows that have one (shield_from and use_as_shield differ).
+    """
+    valid = np.any(shield_from != use_as_shield, axis=1)
+    targets = current.copy()
+
+    between = valid & point_falls_between_two_points_batch(shield_from, current, use_as_shield)
+    if np.any(between):
+        _, targets[between] = distance_from_point_to_line_between_two_points_batch(shield_from[between], use_as_shield[between], current[between])
+
+    behind = valid & ~between
+    if np.any(behind):
+        vector = use_as_shield[behind] - shield_from[behind]
+        distance = np.sqrt(vector[:, 0] ** 2 + vector[:, 1] ** 2)
+        targets[behind] = use_as_shield[behind] + (vector / distance[:, None]) * dist_behind
+    return targets, valid
+
+def new_positions_scenario_b(positions: np.ndarray, parents: np.ndarray, roots: np.ndarray, map_size: np.ndarray, step_size: float = None, dist_behind: float = None) -> np.ndarray:
+    """
+        Positions reached by the given roots when moving behind their second parent as seen from their first parent,
+        reading all positions from the (N, 2) positions (see new_positions_scenario_a()).
+    """
+    current = positions[roots]
+    parents = parents[roots]
+    targets, valid = targets_behind_batch(current, positions[parents[:, 0]], positions[parents[:, 1]], dist_behind)
+
+    new_positions = clamp_positions(move_towards_batch(current, targets, step_size), map_size)
+    new_positions[~valid] = current[~valid]
+    return new_positions
+
+def step_scenario_b(store: PopulationStore, step_size: float = None, dist_behind: float = None, frozen: np.ndarray = None, candidates: np.ndarray = None) -> np.ndarray:
+    """
+        Moves every root entity of the store so that its second parent shields it from its first parent, all at once.
+        Every root reads the positions of its parents from before the step (synchronous update).
+        Entities in the optional frozen mask do not move, and only candidate IDs move if given (see movable_roots()).
+
+        Returns the IDs of entities that moved.
+    """
+    roots = movable_roots(store, frozen, candidates)
+    if len(roots) == 0:
+        return roots
+
+    current = store.positions[roots]
+    new_positions = new_positions_scenario_b(store.positions, store.parents, roots, store.map_size, step_size, dist_behind)
+
+    moved = np.any(new_positions != current, axis=1)
+    store.positions[roots] = new_positions
+    store.push_history(roots[moved])
+    return roots[moved]
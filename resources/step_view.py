@@ -0,0 +1,71 @@
+from typing import Callable
+import numpy as np
+
+class StepView:
+    """
+        Read-only state of a game after a timestep, handed to observers (see Game.add_observer()) and yielded by
+        Game.iter_steps(). Row i of the arrays is entity i of the population.
+
+        Arrays are read-only views into the game's own state (except for positions of a non-vectorized population,
+        which are gathered from the entities), created when first accessed. They are only valid until the game moves on
+        to the next timestep and have to be copied to be kept.
+    """
+    __slots__ = ("timestep", "num_converged", "num_active", "new_root_ids", "_get_positions", "_root_mask", "_converged", "_previous_converged", "_ids_of", "_positions")
+
+    def __init__(
+        self,
+        timestep: int,
+        num_converged: int,
+        num_active: int,
+        new_root_ids: list[int],
+        get_positions: Callable[[], np.ndarray],
+        root_mask: np.ndarray,
+        converged: np.ndarray,
+        previous_converged: np.ndarray,
+        ids_of: Callable[[np.ndarray], list[int]]
+    ):
+        self.timestep = timestep
+        self.num_converged = num_converged
+        self.num_active = num_active
+        self.new_root_ids = new_root_ids    # IDs of non-roots that became root during this timestep
+        self._get_positions = get_positions
+        self._root_mask = root_mask
+        self._converged = converged
+        self._previous_converged = previous_converged
+        self._ids_of = ids_of
+        self._positions = None
+
+    @property
+    def positions(self) -> np.ndarray:
+        """
+            (N, 2) positions of the population.
+        """
+        if self._positions is None:
+            self._positions = _read_only(self._get_positions())
+        return self._positions
+
+    @property
+    def is_root(self) -> np.ndarray:
+        return _read_only(self._root_mask)
+
+    @property
+    def converged(self) -> np.ndarray:
+        """
+            (N,) convergence flags of the population (of roots and non-roots alike).
+        """
+        return _read_only(self._converged)
+
+    @property
+    def newly_converged_ids(self) -> list[int]:
+        """
+            IDs of entities that converged during this timestep.
+        """
+        return self._ids_of(np.flatnonzero(self._converged & ~self._previous_converged))
+
+    def __repr__(self) -> str:
+        return f"StepView(timestep = {self.timestep}, converged = {self.num_converged} / {self.num_active}, new roots = {len(self.new_root_ids)})"
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
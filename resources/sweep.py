@@ -0,0 +1,145 @@
+from resources.config import apply_overrides
+from resources.ensemble import Ensemble
+from resources.game import Game
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from copy import deepcopy
+from dataclasses import asdict
+import csv
+import itertools
+import json
+import os
+import time
+
+def expand_sweep(sweep: dict) -> list[dict]:
+    """
+        Expands a sweep specification into a list of parameter overrides, one per run:
+            - 'grid': maps parameter names to lists of values, every combination becomes a run
+            - 'runs': explicit list of overrides, each one a run
+        Both can be combined, in which case every explicit run is combined with every grid point.
+        Nested parameters are addressed with dots, e.g. 'positioning_scenario_B.dist_behind'.
+    """
+    grid = sweep.get("grid") or {}
+    keys = list(grid.keys())
+    grid_points = [dict(zip(keys, values)) for values in itertools.product(*[grid[k] for k in keys])]
+
+    runs = sweep.get("runs") or [{}]
+    return [{**run, **point} for run in runs for point in grid_points]
+
+def make_headless(params: dict) -> dict:
+    """
+        Disables everything that renders, writes to disk or logs anything but warnings and errors, so that games
+        running side by side never write to the same files (snapshots, trajectories, checkpoints, profiles, events).
+    """
+    params = deepcopy(params)
+    params["gui"] = {**params.get("gui", {}), "enable": False}
+    params["recorder"] = {**params.get("recorder", {}), "enable": False}
+    params["checkpoint"] = {**params.get("checkpoint", {}), "interval": 0}
+    params["profiling"] = {**params.get("profiling", {}), "timings_filepath": None, "cprofile": False}
+    params["save_directory"] = None
+    params["logging"] = {**params.get("logging", {}), "quiet": True, "events_filepath": None}
+    return params
+
+def run_single(run_id: int, params: dict, overrides: dict) -> dict:
+    """
+        Runs one headless game and returns a flat result row. Game output is discarded.
+    """
+    row = {"run_id": run_id, **overrides}
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            game = Game(params=params)
+            summary = game.run()
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        summary = None
+    row["wall_time"] = time.perf_counter() - start
+
+    if summary is not None:
+        row.update(asdict(summary))
+        row["steps_to_convergence"] = summary.num_timesteps if summary.all_converged else None
+    return row
+
+def run_ensemble(run_ids: list[int], params: dict, all_overrides: list[dict]) -> list[dict]:
+    """
+        Runs headless games differing only by their random seed as one Ensemble, and returns a result row per game.
+        Wall times are those of the whole ensemble divided by the number of games.
+    """
+    rows = [{"run_id": run_id, **overrides} for run_id, overrides in zip(run_ids, all_overrides)]
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            seeds = [overrides.get("random_seed", params["random_seed"]) for overrides in all_overrides]
+            summaries = Ensemble(params, seeds).run()
+    except Exception as exc:
+        for row in rows:
+            row["error"] = f"{type(exc).__name__}: {exc}"
+        summaries = [None] * len(rows)
+    wall_time = (time.perf_counter() - start) / len(rows)
+
+    for row, summary in zip(rows, summaries):
+        row["wall_time"] = wall_time
+        if summary is not None:
+            row.update(asdict(summary))
+            row["steps_to_convergence"] = summary.num_timesteps if summary.all_converged else None
+    return rows
+
+def group_by_seed(all_overrides: list[dict], ensemble_size: int) -> list[list[int]]:
+    """
+        Groups the runs (by index) whose overrides only differ by random_seed, in groups of at most ensemble_size runs.
+    """
+    groups = {}
+    for run_id, overrides in enumerate(all_overrides):
+        key = tuple(sorted((k, repr(v)) for k, v in overrides.items() if k != "random_seed"))
+        groups.setdefault(key, []).append(run_id)
+    return [run_ids[i:i + ensemble_size] for run_ids in groups.values() for i in range(0, len(run_ids), ensemble_size)]
+
+def run_sweep(base_params: dict, sweep: dict, output_filepath: str, workers: int = None) -> list[dict]:
+    """
+        Runs all games of a sweep on a process pool. Results are written to output_filepath as they come in,
+        as CSV or as JSON lines depending on the file extension (.csv or .jsonl/.json).
+
+        With ensemble_size > 0 in the sweep, games only differing by their random seed are played together as
+        ensembles of up to ensemble_size (vectorized) games, one ensemble per task.
+    """
+    all_overrides = expand_sweep(sweep)
+    ensemble_size = sweep.get("ensemble_size", 0)
+    print(f"Running {len(all_overrides)} games on {workers or os.cpu_count()} workers ..")
+
+    results = []
+    as_csv = output_filepath.endswith(".csv")
+    columns = list(dict.fromkeys(["run_id"] + [k for o in all_overrides for k in o.keys()] + \
+        ["num_timesteps", "steps_to_convergence", "num_entities", "num_converged", "num_non_roots", "num_left_to_converge",
+         "all_converged", "cannot_be_resolved", "wall_time", "error"]))
+    with open(output_filepath, "w", newline="") as stream, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(stream, fieldnames=columns) if as_csv else None
+        if writer is not None:
+            writer.writeheader()
+
+        if ensemble_size > 0:
+            futures = [
+                executor.submit(run_ensemble, run_ids, make_headless(apply_overrides(base_params, all_overrides[run_ids[0]])), [all_overrides[i] for i in run_ids])
+                for run_ids in group_by_seed(all_overrides, ensemble_size)
+            ]
+        else:
+            futures = [
+                executor.submit(run_single, run_id, make_headless(apply_overrides(base_params, overrides)), overrides)
+                for run_id, overrides in enumerate(all_overrides)
+            ]
+        for future in as_completed(futures):
+            rows = future.result()
+            for row in (rows if isinstance(rows, list) else [rows]):
+                results.append(row)
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    stream.write(json.dumps(row) + "\n")
+                stream.flush()
+                if row.get("error") is not None:
+                    print(f"\t[ERROR] Run {row['run_id']} failed ({len(results)} / {len(all_overrides)}): {row['error']}")
+                else:
+                    print(f"\tRun {row['run_id']} finished ({len(results)} / {len(all_overrides)}) in {row['wall_time']:.2f}s")
+
+    print(f"Sweep results saved to {output_filepath}")
+    return sorted(results, key=lambda row: row["run_id"])
@@ -0,0 +1,121 @@
+import numpy as np
+import random
+
+class TripletGraph:
+    """
+        Compiled form of the game's triplets ([root_id, parent_a_id, parent_b_id]). Entity IDs are mapped
+        once to slots (indices into the population list) and triplets are held as dense index arrays:
+            - roots: (T,) slot of the root of every triplet
+            - parents: (T, 2) slots of the two parents of every triplet
+        so that looking up an entity or the parents of a root is O(1) instead of a scan.
+
+        Triplets can be appended incrementally (e.g. when non-roots become roots) with amortized O(1) cost.
+    """
+    def __init__(self, entity_ids: list[int], triplets: list[list[int]] = None):
+        self._slot_of_id = {id: slot for slot, id in enumerate(entity_ids)}
+        self._ids = np.asarray(entity_ids, dtype=np.int64)
+
+        self._size = 0
+        self._roots = np.zeros(0, dtype=np.int64)
+        self._parents = np.zeros((0, 2), dtype=np.int64)
+        self._triplet_of_slot = np.full(len(entity_ids), -1, dtype=np.int64)  # index of the triplet an entity is root of
+        self._root_ids = None   # cached IDs of the roots, reset whenever triplets are added
+
+        if triplets is not None:
+            self.add_triplets(triplets)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        """
+            Iterates over triplets as [root_id, parent_a_id, parent_b_id] lists, in insertion order.
+        """
+        return iter(self.to_list())
+
+    @property
+    def roots(self) -> np.ndarray:
+        return self._roots[:self._size]
+
+    @property
+    def parents(self) -> np.ndarray:
+        return self._parents[:self._size]
+
+    @property
+    def root_ids(self) -> np.ndarray:
+        """
+            (T,) IDs of the root of every triplet, i.e. the first column of to_array().
+        """
+        if self._root_ids is None:
+            self._root_ids = self._ids[self.roots]
+        return self._root_ids
+
+    @property
+    def root_mask(self) -> np.ndarray:
+        """
+            (N,) mask of the slots that are the root of a triplet.
+        """
+        return self._triplet_of_slot >= 0
+
+    def ids_of(self, slots: np.ndarray) -> list[int]:
+        return self._ids[slots].tolist()
+
+    def add_triplets(self, triplets: list[list[int]]) -> None:
+        """
+            Appends triplets given as [root_id, parent_a_id, parent_b_id].
+        """
+        if len(triplets) == 0:
+            return
+
+        slots = np.array([[self._slot_of_id[i] for i in triplet] for triplet in triplets], dtype=np.int64)
+        new_size = self._size + len(slots)
+        if new_size > len(self._roots):
+            # grow geometrically so that incremental appends stay cheap
+            capacity = max(new_size, 2 * len(self._roots))
+            roots = np.zeros(capacity, dtype=np.int64)
+            parents = np.zeros((capacity, 2), dtype=np.int64)
+            roots[:self._size] = self.roots
+            parents[:self._size] = self.parents
+            self._roots, self._parents = roots, parents
+
+        self._roots[self._size:new_size] = slots[:, 0]
+        self._parents[self._size:new_size] = slots[:, 1:]
+        self._triplet_of_slot[slots[:, 0]] = np.arange(self._size, new_size)
+        self._size = new_size
+        self._root_ids = None
+
+    def has_id(self, id: int) -> bool:
+        return id in self._slot_of_id
+
+    def parents_of(self, slot: int) -> tuple[int, int]:
+        """
+            Returns the slots of the parents of a root, or (None, None) if the entity is not a root of any triplet.
+        """
+        triplet = self._triplet_of_slot[slot]
+        if triplet < 0:
+            return None, None
+        parent_a, parent_b = self._parents[triplet]
+        return int(parent_a), int(parent_b)
+
+    def shuffled_order(self) -> list[int]:
+        """
+            Returns the triplet indices in a random order, obtained by permuting an index array.
+        """
+        order = list(range(self._size))
+        random.shuffle(order)
+        return order
+
+    def slot_of(self, id: int) -> int:
+        return self._slot_of_id[id]
+
+    def to_array(self) -> np.ndarray:
+        """
+            Returns the triplets as a (T, 3) array of IDs.
+        """
+        triplets = np.zeros((self._size, 3), dtype=np.int64)
+        triplets[:, 0] = self.root_ids
+        triplets[:, 1:] = self._ids[self.parents]
+        return triplets
+
+    def to_list(self) -> list[list[int]]:
+        return self.to_array().tolist()
@@ -5,6 +5,10 @@ class CollisionChecker:
     def __init__(self, min_separation: float = 0.0):
         self._min_separation = max(0.0, min_separation)   # should be positive
 
+    @property
+    def min_separation(self) -> float:
+        return self._min_separation
+
     def in_collision(self, a: Entity, b: Entity) -> bool:
         return (self.get_separation(a, b) < self._min_separation)
     
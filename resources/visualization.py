@@ -1,7 +1,10 @@
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from resources.entity import Entity
 
 import numpy as np 
+import queue
+import threading
 
 def visualize_scene(map_size: list[float, float], population: list[Entity]) -> None :
     fig, ax = plt.subplots(figsize=(8, 6))
@@ -87,4 +90,132 @@ def visualize_triplets(
 
     # plt.show(block=block)
 
+    plt.close(fig)
     del fig, ax
+
+class TripletFigure:
+    """
+        A single figure showing the population like visualize_triplets(), whose scatter offsets, annotations and
+        title are updated in place for every frame instead of creating a new figure. The figure is built without
+        pyplot, so no GUI backend is involved and it can be used from worker threads and processes.
+    """
+    def __init__(self, map_size: list[float, float], ids: list[int], annotate_ids: bool = True):
+        self._fig = Figure(figsize=(10, 8))
+        self._ax = self._fig.add_subplot()
+        self._roots = self._ax.scatter([], [], color='blue')
+        self._non_roots = self._ax.scatter([], [], facecolors='none', edgecolors='b')
+        self._annotations = [self._ax.annotate(f"{id}", (0.0, 0.0)) for id in ids] if annotate_ids else []
+
+        self._ax.set_xlabel('X [meters]')
+        self._ax.set_ylabel('Y [meters]')
+        self._ax.set_xlim(-3, map_size[0]+3)
+        self._ax.set_ylim(-3, map_size[1]+3)
+        self._ax.grid(True)
+
+    def draw(self, positions: np.ndarray, is_root: np.ndarray, title: str = None, save_filepath: str = None) -> None:
+        """
+            Updates the figure with (N, 2) positions and (N,) root flags, in the order of the ids given at construction.
+        """
+        self._roots.set_offsets(positions[is_root])
+        self._non_roots.set_offsets(positions[~is_root])
+        for annotation, (x, y) in zip(self._annotations, positions):
+            annotation.set_position((x, y + 0.2))
+        self._ax.set_title('Population of entities' if title is None else title)
+
+        if save_filepath:
+            self._fig.savefig(save_filepath)
+
+class TripletRenderer:
+    """
+        Renders game snapshots like visualize_triplets(), but keeps a single TripletFigure alive. Drawing and PNG
+        encoding happen in a background thread: the game only pays for copying the position arrays into a
+        bounded queue.
+
+        If the writer falls behind and the queue is full, the game waits for a free slot, unless
+        drop_frames_when_behind is True: frames are then dropped, except those submitted with force = True. The last
+        frame submitted is never dropped either: if it was, it is queued by close().
+
+        If writing a frame fails, the writer keeps emptying the queue without drawing (so that the game never waits
+        on it), and the error is raised by the next call to submit() or close().
+    """
+    def __init__(self, map_size: list[float, float], ids: list[int], queue_size: int = 8, drop_frames_when_behind: bool = False, annotate_ids: bool = True):
+        self._map_size = map_size
+        self._ids = list(ids)
+        self._annotate_ids = annotate_ids
+        self._drop_frames_when_behind = drop_frames_when_behind
+
+        self.num_frames_written = 0
+        self.num_frames_dropped = 0
+        self._last_dropped_frame : tuple = None
+        self._error : Exception = None
+        self._error_raised = False
+
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread = threading.Thread(target=self._write_frames, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """
+            Waits for all queued frames to be written and stops the background thread.
+        """
+        if not self._thread.is_alive():
+            return
+        if self._last_dropped_frame is not None and self._error is None:
+            # the final state of the game is always written
+            self._queue.put(self._last_dropped_frame)
+            self._last_dropped_frame = None
+            self.num_frames_dropped -= 1
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+    def submit(self, positions: np.ndarray, is_root: np.ndarray, title: str, save_filepath: str, force: bool = False) -> bool:
+        """
+            Queues a frame for rendering. positions is (N, 2) and is_root is (N,), both in the order of ids.
+            With force = True, the frame is queued even if frames are dropped when the writer is behind.
+            Returns False if the frame was dropped because the writer is behind (or failed, see above).
+        """
+        self._raise_error()
+        if self._error is not None:
+            return False
+        frame = (np.array(positions, dtype=np.float64), np.array(is_root, dtype=bool), title, save_filepath)
+        self._last_dropped_frame = None
+        if force or not self._drop_frames_when_behind:
+            self._queue.put(frame)
+            return True
+
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.num_frames_dropped += 1
+            self._last_dropped_frame = frame
+            return False
+        return True
+
+    def _write_frames(self) -> None:
+        """
+            Background thread: owns the figure.
+        """
+        figure = None
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is not None:
+                continue
+
+            try:
+                if figure is None:
+                    figure = TripletFigure(self._map_size, self._ids, self._annotate_ids)
+                figure.draw(*frame)
+                self.num_frames_written += 1
+            except Exception as exc:
+                self._error = exc
+
+    def _raise_error(self) -> None:
+        """
+            Raises the error of the writer thread, if any and if it has not been raised yet.
+        """
+        if self._error is not None and not self._error_raised:
+            self._error_raised = True
+            raise RuntimeError(f"Writing frames failed: {self._error}") from self._error
@@ -0,0 +1,12 @@
+from resources.service import DEFAULT_SOCKET_PATH, SLICE_TIMESTEPS, SimulationService
+
+import argparse
+import asyncio
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves games over a Unix domain socket (see resources/service.py)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="path of the Unix domain socket")
+    parser.add_argument("--slice-timesteps", type=int, default=SLICE_TIMESTEPS, help="timesteps a game is played for before other requests get their turn")
+    args = parser.parse_args()
+
+    asyncio.run(SimulationService(args.socket, args.slice_timesteps).serve_forever())
@@ -0,0 +1,18 @@
+from resources.sweep import run_sweep
+
+import argparse
+import yaml
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many headless games across a grid or list of configs")
+    parser.add_argument("sweep", nargs="?", default="config/sweep.yaml", help="sweep specification (see config/sweep.yaml)")
+    parser.add_argument("--output", default=None, help="results file, .csv or .jsonl (overrides the sweep specification)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    args = parser.parse_args()
+
+    with open(args.sweep) as stream:
+        sweep = yaml.safe_load(stream)
+    with open(sweep.get("base_config", "config/params.yaml")) as stream:
+        base_params = yaml.safe_load(stream)
+
+    run_sweep(base_params, sweep, args.output or sweep.get("output", "sweep_results.csv"), args.workers)
@@ -0,0 +1,63 @@
+"""
+    Run this as 'python -m tests.active_set' (see tests/math_utils.py)
+"""
+
+from resources.active_set import ActiveSet
+from resources.game import Game
+from tests.helpers import small_params
+
+import numpy as np
+import unittest
+
+class TestActiveSet(unittest.TestCase):
+    """
+        Entities that moved must wake up exactly the roots having them as a parent.
+    """
+    def test_wakeup(self):
+        rng = np.random.default_rng(0)
+        num_entities = 50
+        roots = rng.permutation(num_entities)[:40]
+        parents = np.stack([rng.choice(num_entities, size=40), rng.choice(num_entities, size=40)], axis=1)
+        active_set = ActiveSet(num_entities)
+        active_set.update(roots, parents)
+
+        for slot in range(num_entities):
+            expected = sorted(roots[(parents[:, 0] == slot)].tolist() + roots[(parents[:, 1] == slot)].tolist())
+            self.assertEqual(sorted(active_set.dependents_of(slot).tolist()), expected)
+
+        moved = np.array([3, 7, 11, 42])
+        expected = set(moved.tolist()) | {root for root, (a, b) in zip(roots, parents) if a in moved or b in moved}
+        self.assertEqual(sorted(active_set.dependents_of(moved).tolist()), sorted(np.concatenate([active_set.dependents_of(slot) for slot in moved]).tolist()))
+        active_set.end_step(moved)
+        self.assertEqual(active_set.dirty_ids.tolist(), sorted(expected))
+        active_set.mark_dirty([0, 1])
+        self.assertEqual(active_set.dirty_ids.tolist(), sorted(expected | {0, 1}))
+
+        # with epsilon > 0, small movements wake up nobody, not even the entity itself
+        active_set = ActiveSet(num_entities, epsilon=0.1)
+        active_set.update(roots, parents)
+        active_set.end_step(moved, np.array([0.2, 0.05, 0.1, 0.3]))
+        expected = {3, 42} | set(active_set.dependents_of(np.array([3, 42])).tolist())
+        self.assertEqual(active_set.dirty_ids.tolist(), sorted(expected))
+
+    def test_same_as_unscheduled(self):
+        """
+            With epsilon = 0, scheduling must not change the game.
+        """
+        for vectorized in [False, True]:
+            for scenario in ["A", "B"]:
+                for seed in [30, 7]:
+                    params = small_params(timesteps = 300, random_seed = seed, vectorized = vectorized, positioning_scenario = scenario)
+                    games, converged = [], []
+                    for enable in [False, True]:
+                        # games are played one after the other, since entity-mode games draw from the random module
+                        games.append(Game(params = {**params, "active_set": {"enable": enable, "epsilon": 0.0}}))
+                        converged.append([view.num_converged for view in games[-1].iter_steps()])
+                    msg = f"vectorized {vectorized}, scenario {scenario}, seed {seed}"
+                    self.assertEqual(converged[1], converged[0], msg=msg)
+                    self.assertEqual(games[1].summary, games[0].summary, msg=msg)
+                    np.testing.assert_array_equal(games[1].view().positions, games[0].view().positions, err_msg=msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""
+    Run this as 'python -m tests.checkpoint' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from tests.helpers import small_params
+
+import numpy as np
+import os
+import tempfile
+import unittest
+
+class TestResume(unittest.TestCase):
+    """
+        A game resumed from a checkpoint must end exactly like the game the checkpoint was saved from.
+    """
+    def test_same_as_uninterrupted(self):
+        params = small_params(timesteps = 150)
+        with tempfile.TemporaryDirectory() as directory:
+            self.check(params, directory)
+
+    def check(self, params: dict, directory: str):
+        for rng_mode in ["global", "streams"]:
+            for vectorized in [False, True]:
+                for scenario in ["A", "B"]:
+                    game_params = {**params, "rng_mode": rng_mode, "vectorized": vectorized, "positioning_scenario": scenario}
+                    checkpoint_directory = os.path.join(directory, f"{rng_mode}_{vectorized}_{scenario}")
+                    game = Game(params = {**game_params, "checkpoint": {"interval": 10, "directory": checkpoint_directory}})
+                    expected = game.run()
+
+                    resumed = Game.resume(os.path.join(checkpoint_directory, "checkpoint_000010.npz"), params=game_params)
+                    msg = f"rng_mode {rng_mode}, vectorized {vectorized}, scenario {scenario}"
+                    self.assertEqual(resumed.run(), expected, msg=msg)
+                    np.testing.assert_array_equal(resumed.view().positions, game.view().positions, err_msg=msg)
+                    np.testing.assert_array_equal(resumed.view().converged, game.view().converged, err_msg=msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
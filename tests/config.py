@@ -0,0 +1,35 @@
+"""
+    Run this as 'python -m tests.config' (see tests/math_utils.py)
+"""
+
+from resources.config import GameConfig, parse_overrides, validate_params
+from resources.game import Game
+from tests.helpers import PARAMS_FILEPATH, load_params
+
+import unittest
+import yaml
+
+class TestGameConfig(unittest.TestCase):
+    """
+        A game created from a GameConfig must play like one created from the same parameters read from YAML.
+    """
+    def test_same_as_yaml(self):
+        overrides = parse_overrides(["num_entities=60", "map_size=[15, 15]", "timesteps=300", "vectorized=true", "gui.enable=false", "save_directory=null"])
+        config = GameConfig.from_yaml(PARAMS_FILEPATH, overrides)
+        self.assertEqual(config.map_size, [15, 15])
+        self.assertEqual(Game(params=config).run(), Game(params=load_params(**overrides)).run())
+
+    def test_invalid_params(self):
+        with open(PARAMS_FILEPATH) as stream:
+            params = yaml.safe_load(stream)
+        self.assertEqual(validate_params(params), [])
+        self.assertEqual(len(validate_params({**params, "num_entities": 0, "map_size": [10]})), 2)
+        self.assertEqual(validate_params({"num_entities": 10}), [f"Missing parameter: {key}" for key in ["random_seed", "timesteps", "map_size", "step_size", "perception_radius", "positioning_scenario"]])
+        with self.assertRaises(ValueError):
+            GameConfig.from_dict({"num_entitites": 10})
+        with self.assertRaisesRegex(ValueError, "num_entities must be a positive integer"):
+            Game(params=load_params(num_entities = 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
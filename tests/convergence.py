@@ -0,0 +1,87 @@
+"""
+    Run this as 'python -m tests.convergence' (see tests/math_utils.py)
+"""
+
+from resources.containers import EntityPosition
+from resources.convergence import ConvergenceTracker
+from resources.entity import Entity
+
+from collections import deque
+import numpy as np
+import unittest
+
+def random_movements(rng: np.random.Generator, num_entities: int, num_moves: int) -> list[tuple[int, float]]:
+    # distances are often repeated or on the threshold, so that ties between consecutive movements are covered
+    choices = [0.0, 0.01, 0.05, 0.1, 0.3]
+    return [
+        (int(rng.integers(num_entities)), float(rng.choice(choices)) if rng.random() < 0.7 else float(rng.random() * 0.2))
+        for _ in range(num_moves)
+    ]
+
+def brute_force_converged(deltas: deque, num_deltas: int, threshold_dist: float = 0.05) -> bool:
+    """
+        Convergence criteria of Entity.has_converged(), from the last num_deltas movements of an entity.
+    """
+    if len(deltas) < num_deltas:
+        return False
+    deltas = list(deltas)
+    return all(d <= threshold_dist for d in deltas) or all(earlier >= later for earlier, later in zip(deltas, deltas[1:]))
+
+class TestConvergenceTracker(unittest.TestCase):
+    """
+        Convergence maintained incrementally must match checking the tracked movements of every entity from scratch.
+    """
+    def test_same_as_brute_force(self):
+        rng = np.random.default_rng(1)
+        num_entities = 30
+        for history_n in [1, 2, 3, 5]:
+            tracker = ConvergenceTracker(num_entities, history_n=history_n)
+            deltas = [deque(maxlen=history_n - 1) for _ in range(num_entities)]
+            for _ in range(300):
+                # a batch of movements of distinct entities
+                slots = rng.choice(num_entities, size=int(rng.integers(1, num_entities)), replace=False)
+                distances = np.array([d for _, d in random_movements(rng, 1, len(slots))])
+                tracker.record_many(slots, distances)
+                for slot, distance in zip(slots, distances):
+                    deltas[slot].append(distance)
+
+                expected = np.array([brute_force_converged(d, history_n - 1) for d in deltas])
+                np.testing.assert_array_equal(tracker.converged, expected, err_msg=f"history_n {history_n}")
+                mask = rng.random(num_entities) < 0.5
+                self.assertEqual(tracker.num_converged(mask), int(np.count_nonzero(mask & expected)))
+                np.testing.assert_array_equal(tracker.non_converged(mask), np.flatnonzero(mask & ~expected))
+                if history_n > 1:
+                    np.testing.assert_array_equal(tracker.latest_deltas(np.arange(num_entities)), [d[-1] if len(d) > 0 else 0.0 for d in deltas])
+
+    def test_same_as_entity(self):
+        rng = np.random.default_rng(2)
+        tracker = ConvergenceTracker(10)
+        entities = [Entity(EntityPosition(x=10.0, y=10.0), perception_radius=2.5, id=i, map_size=[20, 20]) for i in range(10)]
+        tracked = [Entity(EntityPosition(x=10.0, y=10.0), perception_radius=2.5, id=i, map_size=[20, 20]) for i in range(10)]
+        for slot, entity in enumerate(tracked):
+            entity.attach_convergence_tracker(tracker, slot)
+        for _ in range(200):
+            i = int(rng.integers(10))
+            target = EntityPosition(x=float(rng.uniform(9, 11)), y=float(rng.uniform(9, 11)))
+            step_size = float(rng.choice([0.01, 0.05, 0.3]))
+            entities[i].move_towards(target, step_size)
+            tracked[i].move_towards(target, step_size)
+            self.assertEqual([entity.has_converged() for entity in tracked], [entity.has_converged() for entity in entities])
+
+class TestRecordOne(unittest.TestCase):
+    """
+        Recording movements one at a time must leave the tracker exactly as recording them in batches.
+    """
+    def test_same_as_record_many(self):
+        rng = np.random.default_rng(0)
+        for history_n in [1, 2, 5]:
+            one, many = ConvergenceTracker(20, history_n=history_n), ConvergenceTracker(20, history_n=history_n)
+            for slot, distance in random_movements(rng, 20, 2000):
+                one.record_one(slot, distance)
+                many.record_many(np.array([slot], dtype=np.int64), np.array([distance], dtype=np.float64))
+            for key, value in many.get_state().items():
+                np.testing.assert_array_equal(one.get_state()[key], value, err_msg=f"{key}, history_n {history_n}")
+
+
+if __name__ == "__main__":
+    unittest.main()
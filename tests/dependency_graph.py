@@ -0,0 +1,101 @@
+"""
+    Run this as 'python -m tests.dependency_graph' (see tests/math_utils.py)
+"""
+
+from resources.containers import PositioningScenario
+from resources.dependency_graph import DependencyGraph
+
+import numpy as np
+import unittest
+
+def reachability(successors: np.ndarray) -> np.ndarray:
+    """
+        (N, N) matrix of whether node j can be reached from node i (i itself included), by repeated squaring.
+    """
+    num_nodes = len(successors)
+    reach = np.eye(num_nodes, dtype=bool)
+    sources, position = np.nonzero(successors >= 0)
+    reach[sources, successors[sources, position]] = True
+    for _ in range(int(np.ceil(np.log2(max(2, num_nodes))))):
+        reach = (reach.astype(np.int64) @ reach.astype(np.int64)) > 0
+    return reach
+
+def brute_force_groups(successors: np.ndarray) -> list[list[int]]:
+    """
+        Strongly connected components (nodes reaching each other), as sorted lists of nodes.
+    """
+    reach = reachability(successors)
+    mutual = reach & reach.T
+    return sorted(set(tuple(np.flatnonzero(row).tolist()) for row in mutual))
+
+def brute_force_unresolvable(successors: np.ndarray, scenario: PositioningScenario) -> list[list[int]]:
+    if scenario == PositioningScenario.ScenarioB:
+        shields = np.full_like(successors, -1)
+        shields[:, 0] = successors[:, 1]
+        return [list(group) for group in brute_force_groups(shields) if len(group) > 1]
+
+    unresolvable = []
+    for group in brute_force_groups(successors):
+        external_parents = set(int(p) for node in group for p in successors[node] if p >= 0 and p not in group)
+        if len(group) > 1 and len(external_parents) <= 1:
+            unresolvable.append(list(group))
+    return unresolvable
+
+class TestDependencyGraph(unittest.TestCase):
+    """
+        Components and unresolvable groups must be those found from the reachability of every pair of entities.
+    """
+    def analyze(self, num_entities: int, triplets: list[list[int]], scenario: PositioningScenario) -> tuple[DependencyGraph, np.ndarray]:
+        triplets = np.array(triplets, dtype=np.int64).reshape(-1, 3)
+        graph = DependencyGraph(num_entities, scenario)
+        graph.update(triplets[:, 0], triplets[:, 1:])
+        successors = np.full((num_entities, 2), -1, dtype=np.int64)
+        successors[triplets[:, 0]] = triplets[:, 1:]
+        return graph, successors
+
+    def test_random_graphs(self):
+        rng = np.random.default_rng(0)
+        for _ in range(100):
+            num_entities = int(rng.integers(2, 40))
+            roots = np.flatnonzero(rng.random(num_entities) < rng.uniform(0.3, 1.0))
+            # parents are picked among a few entities, so that cycles and shared parents are common
+            candidates = rng.choice(num_entities, size=min(num_entities, int(rng.integers(2, 10))), replace=False)
+            triplets = []
+            for root in roots:
+                choices = [c for c in candidates if c != root]
+                if len(choices) >= 2:
+                    triplets.append([root, *rng.choice(choices, size=2, replace=False)])
+
+            for scenario in [PositioningScenario.ScenarioA, PositioningScenario.ScenarioB]:
+                graph, successors = self.analyze(num_entities, triplets, scenario)
+                components = sorted(set(tuple(np.flatnonzero(graph.component_of == c).tolist()) for c in range(graph.num_components)))
+                self.assertEqual(components, brute_force_groups(successors))
+                self.assertEqual(sorted(graph.unresolvable_groups), brute_force_unresolvable(successors, scenario))
+                expected = np.zeros(num_entities, dtype=bool)
+                for group in graph.unresolvable_groups:
+                    expected[group] = True
+                np.testing.assert_array_equal(graph.unresolvable, expected)
+                self.assertEqual(graph.num_unresolvable, int(np.count_nonzero(expected)))
+
+    def test_examples(self):
+        # 0 picked 1 and 2, 1 picked 0 and 2: they can only meet at one point in scenario A
+        graph, _ = self.analyze(3, [[0, 1, 2], [1, 0, 2]], PositioningScenario.ScenarioA)
+        self.assertEqual(graph.unresolvable_groups, [[0, 1]])
+        # with two parents outside of the group, it is resolvable
+        graph, _ = self.analyze(4, [[0, 1, 2], [1, 0, 3]], PositioningScenario.ScenarioA)
+        self.assertEqual(graph.unresolvable_groups, [])
+        # 0 shields behind 1, which shields behind 0 in scenario B
+        graph, _ = self.analyze(3, [[0, 2, 1], [1, 2, 0]], PositioningScenario.ScenarioB)
+        self.assertEqual(graph.unresolvable_groups, [[0, 1]])
+
+    def test_long_chain(self):
+        # a chain much deeper than the recursion limit, closed into a single cycle
+        num_entities = 5000
+        triplets = [[i, (i + 1) % num_entities, (i + 2) % num_entities] for i in range(num_entities)]
+        graph, _ = self.analyze(num_entities, triplets, PositioningScenario.ScenarioA)
+        self.assertEqual(graph.num_components, 1)
+        self.assertEqual(graph.num_unresolvable, num_entities)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+"""
+    Run this as 'python -m tests.ensemble' (see tests/math_utils.py)
+"""
+
+from resources.ensemble import Ensemble
+from resources.game import Game
+from tests.helpers import small_params
+
+import unittest
+
+class TestEnsemble(unittest.TestCase):
+    """
+        Every game of an ensemble must end exactly like a vectorized game with the same seed.
+    """
+    def test_same_as_games(self):
+        params = small_params(timesteps = 300)
+        seeds = [3, 5, 8, 13]
+        for scenario in ["A", "B"]:
+            params["positioning_scenario"] = scenario
+            summaries = Ensemble(params, seeds).run()
+            for seed, summary in zip(seeds, summaries):
+                expected = Game(params = {**params, "random_seed": seed, "vectorized": True}).run()
+                self.assertEqual(summary, expected, msg=f"Scenario {scenario}, seed {seed}")
+
+    def test_scenario_a_without_scenario_b_params(self):
+        params = small_params(timesteps = 100)
+        del params["positioning_scenario_B"]
+        self.assertEqual(Ensemble(params, [3]).run()[0], Game(params = {**params, "random_seed": 3, "vectorized": True}).run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+    Run this as 'python -m tests.entity' (see tests/math_utils.py)
+"""
+
+from resources.containers import EntityPosition
+from resources.entity import Entity
+from resources.game import Game
+from tests.helpers import load_params
+
+import unittest
+
+# entities converged after every timestep of the game configured in config/params.yaml (random_seed 30), now that
+# steps no longer rewrite the latest tracking history entry (the baseline counted 12 at timestep 4)
+DEFAULT_GAME_CONVERGED = [
+    0, 0, 0, 9, 12, 15, 14, 19, 22, 24, 24, 36, 42, 39, 41, 44, 42, 44, 43, 45, 42, 41, 46, 46, 51, 48, 51, 49, 49, 48,
+    50, 51, 51, 51, 51, 54, 55, 55, 56, 58, 58, 59, 63, 63, 64, 67, 70, 69, 69, 69, 71, 73, 75, 74, 71, 70, 70, 71, 71, 72,
+    71, 70, 71, 72, 73, 75, 74, 74, 76, 75, 77, 80, 81, 82, 84, 84, 84, 85, 86, 86, 86, 87, 87, 87, 87, 87, 88, 88, 88, 88,
+    88, 88, 88, 88, 88, 88
+]
+
+class TestTrackingHistory(unittest.TestCase):
+    """
+        A step must add a position to the tracking history without changing the positions already in it.
+    """
+    def test_step_keeps_history(self):
+        entity = Entity(EntityPosition(x=0.0, y=0.0), perception_radius=2.5, id=0, map_size=[10, 10])
+        self.assertTrue(entity.move_towards(EntityPosition(x=5.0, y=0.0), step_size=1.0))
+        self.assertTrue(entity.move_towards(EntityPosition(x=5.0, y=0.0), step_size=1.0))
+        self.assertEqual([(p.x, p.y) for p in entity.get_tracking_history()], [(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)])
+        self.assertEqual(entity.get_movement_deltas(), [1.0, 1.0])
+
+    def test_history_is_clamped(self):
+        # like a store-backed entity, the history holds the position the entity ended up at, inside the map
+        entity = Entity(EntityPosition(x=9.0, y=5.0), perception_radius=2.5, id=0, map_size=[10, 10])
+        self.assertTrue(entity.move_towards(EntityPosition(x=10.5, y=5.0), step_size=2.0))
+        self.assertEqual(entity.current_position, EntityPosition(x=10.0, y=5.0))
+        self.assertEqual(entity.get_tracking_history()[-1], entity.current_position)
+        self.assertEqual(entity.get_movement_deltas(), [1.0])
+
+    def test_default_game(self):
+        params = load_params(vectorized = False, positioning_scenario = "A")
+        game = Game(params=params)
+        self.assertEqual([view.num_converged for view in game.iter_steps()], DEFAULT_GAME_CONVERGED)
+        self.assertEqual(game.summary.num_timesteps, 96)
+        self.assertEqual(game.summary.num_converged, 88)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+    Run this as 'python -m tests.equilibrium' (see tests/math_utils.py)
+"""
+
+from resources.dependency_graph import DependencyGraph
+from resources.containers import PositioningScenario
+from resources.equilibrium import solve_equilibrium
+
+import numpy as np
+import unittest
+
+class TestEquilibrium(unittest.TestCase):
+    def _solve(self, positions: np.ndarray, triplets: list[list[int]], method: str):
+        triplets = np.asarray(triplets, dtype=np.int64)
+        dependencies = DependencyGraph(len(positions), PositioningScenario.ScenarioA)
+        dependencies.update(triplets[:, 0], triplets[:, 1:])
+        return solve_equilibrium(positions, triplets[:, 0], triplets[:, 1:], dependencies.component_of, [20.0, 20.0], method=method, tolerance=1e-10)
+
+    def test_chain(self):
+        """
+            0 and 1 do not move, 2 settles halfway between them, 3 halfway between 2 and 0, and 4 (which depends on 5,
+            which depends on 4) where both solve their equations.
+        """
+        positions = np.array([[0.0, 0.0], [8.0, 4.0], [3.0, 3.0], [9.0, 9.0], [1.0, 18.0], [15.0, 2.0]])
+        triplets = [[2, 0, 1], [3, 2, 0], [4, 5, 1], [5, 4, 3]]
+        x3 = np.array([2.0, 1.0])
+        x4 = (2 * np.array([8.0, 4.0]) + x3) / 3.0
+        expected = np.array([[0.0, 0.0], [8.0, 4.0], [4.0, 2.0], x3, x4, (x4 + x3) / 2.0])
+        for method in ["jacobi", "cg"]:
+            solution = self._solve(positions, triplets, method)
+            self.assertTrue(solution.converged, msg=method)
+            np.testing.assert_allclose(solution.positions, expected, rtol=0, atol=1e-9, err_msg=method)
+            self.assertEqual(solution.singular_groups, [])
+            self.assertFalse(np.any(solution.undetermined))
+
+    def test_singular_group(self):
+        """
+            0, 1 and 2 only depend on each other and collapse onto their centroid, 3 depends on them, 4 does not.
+        """
+        positions = np.array([[0.0, 0.0], [6.0, 0.0], [0.0, 6.0], [10.0, 10.0], [18.0, 18.0], [12.0, 2.0]])
+        triplets = [[0, 1, 2], [1, 0, 2], [2, 0, 1], [3, 0, 5], [4, 5, 5]]
+        for method in ["jacobi", "cg"]:
+            solution = self._solve(positions, triplets, method)
+            self.assertTrue(solution.converged, msg=method)
+            self.assertEqual(solution.singular_groups, [[0, 1, 2]])
+            np.testing.assert_array_equal(solution.undetermined, [True, True, True, True, False, False])
+            np.testing.assert_allclose(solution.positions[:3], [[2.0, 2.0]] * 3, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(solution.positions[3], [7.0, 2.0], rtol=0, atol=1e-9)
+            np.testing.assert_allclose(solution.positions[4], [12.0, 2.0], rtol=0, atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
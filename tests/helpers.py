@@ -0,0 +1,29 @@
+"""
+    Parameters shared by the test modules (not a test module itself)
+"""
+
+import yaml
+
+PARAMS_FILEPATH = "config/params.yaml"
+
+def load_params(filepath: str = PARAMS_FILEPATH, **overrides) -> dict:
+    """
+        Parameters of a YAML file for a game that renders, records, checkpoints, profiles and logs nothing (but
+        warnings and errors), updated with the given top-level overrides.
+    """
+    with open(filepath) as stream:
+        params = yaml.safe_load(stream)
+    params["gui"] = {**params.get("gui", {}), "enable": False}
+    params["recorder"] = {**params.get("recorder", {}), "enable": False}
+    params["checkpoint"] = {**params.get("checkpoint", {}), "interval": 0}
+    params["profiling"] = {**params.get("profiling", {}), "timings_filepath": None, "cprofile": False}
+    params["logging"] = {**params.get("logging", {}), "quiet": True, "events_filepath": None}
+    params["save_directory"] = None
+    params.update(overrides)
+    return params
+
+def small_params(**overrides) -> dict:
+    """
+        Like load_params(), for a population of 60 entities on a 15x15 map, so that games end within a second.
+    """
+    return load_params(**{"num_entities": 60, "map_size": [15, 15], **overrides})
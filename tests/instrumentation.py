@@ -0,0 +1,57 @@
+"""
+    Run this as 'python -m tests.instrumentation' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from resources.instrumentation import Instrumentation
+from tests.helpers import small_params
+
+import unittest
+
+STEP_PHASES = {"step", "convert_non_roots_to_roots", "convergence_checks", "log"}
+
+class TestInstrumentation(unittest.TestCase):
+    """
+        Every timestep of a game must be recorded with the same phases, and counters must add up to their totals.
+    """
+    def test_series(self):
+        instrumentation = Instrumentation()
+        instrumentation.add_time("init", 1.0)
+        for timestep in range(3):
+            instrumentation.begin_step()
+            instrumentation.add_time("step", 0.5)
+            if timestep > 0:
+                instrumentation.count("moves", timestep)
+            instrumentation.end_step()
+        self.assertEqual(instrumentation.num_steps, 3)
+        self.assertEqual(instrumentation.time_series, {"step": [0.5, 0.5, 0.5]})
+        self.assertEqual(instrumentation.count_series, {"moves": [0, 1, 2]})
+        self.assertEqual(instrumentation.total_times, {"init": 1.0, "step": 1.5})
+        summary = instrumentation.summary()
+        self.assertEqual(summary["times"]["step"], {"total": 1.5, "mean_per_step": 0.5, "max_per_step": 0.5})
+        self.assertEqual(summary["times"]["init"], {"total": 1.0, "mean_per_step": None, "max_per_step": None})
+        self.assertEqual(summary["counts"], {"moves": 3})
+
+    def test_game(self):
+        for vectorized in [False, True]:
+            game = Game(params = small_params(timesteps = 100, vectorized = vectorized))
+            game.run()
+            instrumentation = game.instrumentation
+            msg = f"vectorized {vectorized}"
+
+            self.assertEqual(instrumentation.num_steps, game.summary.num_timesteps, msg=msg)
+            self.assertEqual(set(instrumentation.time_series), STEP_PHASES, msg=msg)
+            self.assertEqual(set(instrumentation.total_times), STEP_PHASES | {"create_population", "create_triplets"}, msg=msg)
+            self.assertEqual(set(instrumentation.count_series), {"moves_applied", "neighbor_queries"}, msg=msg)
+            for name, series in list(instrumentation.time_series.items()) + list(instrumentation.count_series.items()):
+                self.assertEqual(len(series), instrumentation.num_steps, msg=f"{msg}, {name}")
+            # moves only happen during timesteps, while triplets are created with one neighbor query per entity
+            self.assertEqual(sum(instrumentation.count_series["moves_applied"]), instrumentation.total_counts["moves_applied"], msg=msg)
+            self.assertEqual(sum(instrumentation.count_series["neighbor_queries"]) + game.summary.num_entities, instrumentation.total_counts["neighbor_queries"], msg=msg)
+            # at most every root moves once per timestep
+            self.assertGreater(instrumentation.total_counts["moves_applied"], 0, msg=msg)
+            self.assertTrue(all(n <= game.summary.num_entities for n in instrumentation.count_series["moves_applied"]), msg=msg)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+    Run this as 'python -m tests.logger' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from resources.logger import GameLogger, DEBUG, INFO, WARN, ERROR
+from tests.helpers import small_params
+
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+def printed(log: GameLogger, *calls) -> list[str]:
+    """
+        Lines printed by the given (method name, message) calls of a logger.
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        for method, msg in calls:
+            getattr(log, method)(msg)
+    return output.getvalue().splitlines()
+
+class TestGameLogger(unittest.TestCase):
+    """
+        Messages must be printed according to their level, progress messages at most once per interval, and events
+        must be written as JSON lines.
+    """
+    def test_levels(self):
+        calls = [("debug", "d"), ("info", "i"), ("warn", "w"), ("error", "e")]
+        self.assertEqual(printed(GameLogger(level=DEBUG), *calls), ["d", "i", "[WARN] w", "[ERROR] e"])
+        self.assertEqual(printed(GameLogger(level=INFO), *calls), ["i", "[WARN] w", "[ERROR] e"])
+        self.assertEqual(printed(GameLogger(level=ERROR), *calls), ["[ERROR] e"])
+        self.assertEqual(printed(GameLogger(level=DEBUG, quiet=True), *calls), ["[WARN] w", "[ERROR] e"])
+        self.assertTrue(GameLogger(level=WARN).is_enabled_for(ERROR))
+        self.assertFalse(GameLogger(level=WARN).is_enabled_for(INFO))
+
+        # messages given as callables are only formatted if printed
+        formatted = []
+        def message() -> str:
+            formatted.append(True)
+            return "m"
+        self.assertEqual(printed(GameLogger(level=INFO), ("debug", message), ("info", message)), ["m"])
+        self.assertEqual(len(formatted), 1)
+
+    def test_progress(self):
+        log = GameLogger(progress_interval=1.0)
+        with unittest.mock.patch("resources.logger.time.monotonic", side_effect=[10.0, 10.5, 10.7, 11.2, 11.8]), redirect_stdout(io.StringIO()) as output:
+            self.assertEqual([log.progress("a"), log.progress("b"), log.progress("c", force=True), log.progress("d"), log.progress("e")], [True, False, True, False, True])
+        self.assertEqual(output.getvalue().splitlines(), ["a", "c", "e"])
+        self.assertFalse(GameLogger(quiet=True).progress("a", force=True))
+
+    def test_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "events.jsonl")
+            game = Game(params = small_params(timesteps = 50, logging = {"quiet": True, "events_filepath": filepath}))
+            summary = game.run()
+            with open(filepath) as stream:
+                events = [json.loads(line) for line in stream]
+            names = [event["event"] for event in events]
+            self.assertEqual(names.count("game_start"), 1)
+            self.assertLess(names.index("game_start"), names.index("timestep"))
+            self.assertEqual(events[-1], {"event": "game_end", **summary.__dict__})
+            timesteps = [event for event in events if event["event"] == "timestep"]
+            self.assertEqual([event["timestep"] for event in timesteps], list(range(1, summary.num_timesteps + 1)))
+            self.assertEqual(timesteps[-1]["num_converged"], summary.num_converged)
+
+    def test_closed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "events.jsonl")
+            params = small_params(timesteps = 50, logging = {"quiet": True, "events_filepath": filepath})
+
+            # a game dropped before its end is closed by the with statement
+            with Game(params = params) as game:
+                for view in game.iter_steps():
+                    if view.timestep == 3:
+                        break
+                self.assertTrue(game._log.has_events)
+            self.assertFalse(game._log.has_events)
+            with open(filepath) as stream:
+                names = [json.loads(line)["event"] for line in stream]
+            self.assertEqual(names.count("timestep"), 3)
+            self.assertNotIn("game_end", names)
+
+            # as is one that cannot be created
+            with redirect_stdout(io.StringIO()), self.assertRaises(ValueError), unittest.mock.patch("resources.logger.GameLogger.close", autospec=True, side_effect=GameLogger.close) as close:
+                Game(params = {**params, "positioning_scenario": "C"})
+            self.assertEqual(close.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,7 @@
 from resources import math_utils
 from resources.containers import EntityPosition
 
+import numpy as np
 import unittest
 
 class TestMathUtils(unittest.TestCase):
@@ -48,6 +49,57 @@ class TestMathUtils(unittest.TestCase):
         expected_result = True
         self.assertEqual(result, expected_result, f"Origin is between two points (x = -45, y = 3) and (x = 45, y = -3)")
 
+class TestMathUtilsBatch(unittest.TestCase):
+    """
+        The batched functions must match the scalar ones row by row.
+    """
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 1000
+        self.a = rng.uniform(-10, 10, (n, 2))
+        self.b = rng.uniform(-10, 10, (n, 2))
+        self.p = rng.uniform(-10, 10, (n, 2))
+        # degenerate and axis-aligned cases
+        self.b[:10] = self.a[:10]
+        self.b[10:20, 0] = self.a[10:20, 0]
+        self.b[20:30, 1] = self.a[20:30, 1]
+        self.p[30:40] = self.a[30:40]
+
+    @staticmethod
+    def _position(row: np.ndarray) -> EntityPosition:
+        return EntityPosition(x = float(row[0]), y = float(row[1]))
+
+    def test_euclidean_distance_batch(self):
+        result = math_utils.euclidean_distance_batch(self.a, self.b)
+        for i in range(len(self.a)):
+            self.assertAlmostEqual(result[i], math_utils.euclidean_distance(self._position(self.a[i]), self._position(self.b[i])), places=12)
+
+    def test_get_equation_coeff_of_line_from_two_points_batch(self):
+        a, b, c = math_utils.get_equation_coeff_of_line_from_two_points_batch(self.a, self.b)
+        for i in range(len(self.a)):
+            expected_result = math_utils.get_equation_coeff_of_line_from_two_points(self._position(self.a[i]), self._position(self.b[i]))
+            self.assertEqual([a[i], b[i], c[i]], expected_result)
+
+    def test_distance_from_point_to_line_between_two_points_batch(self):
+        distances, nearest_points = math_utils.distance_from_point_to_line_between_two_points_batch(self.a, self.b, self.p)
+        for i in range(len(self.a)):
+            expected_distance, expected_point = math_utils.distance_from_point_to_line_between_two_points(self._position(self.a[i]), self._position(self.b[i]), self._position(self.p[i]))
+            self.assertAlmostEqual(distances[i], expected_distance, places=9)
+            self.assertAlmostEqual(nearest_points[i, 0], expected_point.x, places=9)
+            self.assertAlmostEqual(nearest_points[i, 1], expected_point.y, places=9)
+
+    def test_point_falls_between_two_points_batch(self):
+        result = math_utils.point_falls_between_two_points_batch(self.a, self.b, self.p)
+        for i in range(len(self.a)):
+            expected_result = math_utils.point_falls_between_two_points(self._position(self.a[i]), self._position(self.b[i]), self._position(self.p[i]))
+            self.assertEqual(bool(result[i]), expected_result, f"Mismatch for row {i}: {self.a[i]}, {self.b[i]}, {self.p[i]}")
+
+    def test_signed_distance_batch(self):
+        # the origin is at signed distance C / sqrt(A^2 + B^2) from the line Ax + By + C = 0
+        a, b, c = np.array([3.0, 0.0]), np.array([4.0, 1.0]), np.array([10.0, -2.0])
+        result = math_utils.signed_distance_batch(a, b, c, np.zeros((2, 2)))
+        np.testing.assert_allclose(result, [2.0, -2.0])
+
 
 if __name__ == "__main__":
     unittest.main()
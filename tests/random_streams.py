@@ -0,0 +1,61 @@
+"""
+    Run this as 'python -m tests.random_streams' (see tests/math_utils.py)
+"""
+
+from resources.ensemble import Ensemble
+from resources.game import Game
+from resources.random_streams import RandomStreams, PROMOTION, TRIPLETS
+from tests.helpers import small_params
+
+import numpy as np
+import random
+import unittest
+
+class TestRandomStreams(unittest.TestCase):
+    """
+        What an entity draws must only depend on the seed, its ID, the phase and the timestep.
+    """
+    def test_independent_of_order(self):
+        streams = RandomStreams(30)
+        ids = np.arange(100)
+        order = np.random.default_rng(0).permutation(100)
+        draws = streams.uniform(TRIPLETS, 0, ids, 3)
+        np.testing.assert_array_equal(streams.uniform(TRIPLETS, 0, ids[order], 3), draws[order])
+        np.testing.assert_array_equal(streams.uniform(TRIPLETS, 0, ids, 2, first_draw=1), draws[:, 1:])
+        self.assertFalse(np.any(streams.uniform(PROMOTION, 0, ids, 3) == draws))
+        self.assertFalse(np.any(streams.uniform(TRIPLETS, 1, ids, 3) == draws))
+        self.assertTrue(np.all((draws >= 0) & (draws < 1)))
+
+        # candidates of entity i are 1000*i .. 1000*i+i-1
+        counts = np.arange(100)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        candidates = np.concatenate([1000 * i + np.arange(i) for i in range(100)])
+        pairs = streams.sample_pairs(TRIPLETS, 0, ids, offsets, candidates)
+        np.testing.assert_array_equal(pairs[:2], -1)
+        self.assertTrue(np.all(pairs[2:, 0] != pairs[2:, 1]))
+        self.assertTrue(np.all((pairs[2:] // 1000) == ids[2:, None]))
+        offsets = np.concatenate([[0], np.cumsum(counts[order])])
+        candidates = np.concatenate([1000 * i + np.arange(i) for i in order])
+        np.testing.assert_array_equal(streams.sample_pairs(TRIPLETS, 0, ids[order], offsets, candidates), pairs[order])
+
+    def test_games(self):
+        params = small_params(rng_mode = "streams", timesteps = 300)
+        seeds = [3, 5]
+        for scenario in ["A", "B"]:
+            params["positioning_scenario"] = scenario
+            random.seed(1)
+            expected = Game(params = {**params, "random_seed": seeds[0]}).run()
+            random.seed(2)
+            self.assertEqual(Game(params = {**params, "random_seed": seeds[0]}).run(), expected)
+
+            # the same streams are drawn from by ensembles, whatever their size
+            params["vectorized"] = True
+            summaries = Ensemble(params, seeds).run()
+            for seed, summary in zip(seeds, summaries):
+                self.assertEqual(summary, Game(params = {**params, "random_seed": seed}).run(), msg=f"Scenario {scenario}, seed {seed}")
+                self.assertEqual(Ensemble(params, [seed]).run()[0], summary)
+            params["vectorized"] = False
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+    Run this as 'python -m tests.recorder' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from resources.recorder import Trajectory
+from tests.helpers import small_params
+
+import numpy as np
+import os
+import tempfile
+import unittest
+
+class TestResumedRecording(unittest.TestCase):
+    """
+        A game resumed from a checkpoint must continue its trajectory, ending up with the one of an uninterrupted game.
+    """
+    def setUp(self):
+        self.params = small_params(timesteps = 200, vectorized = True)
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = self.temporary_directory.name
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def record(self, filepath: str, stop_at: int = None) -> Game:
+        game = Game(params = {**self.params, "recorder": {"enable": True, "filepath": filepath}})
+        for view in game.iter_steps():
+            if view.timestep == stop_at:
+                game.stop()
+        return game
+
+    def test_continued(self):
+        self.record(os.path.join(self.directory, "expected.bin"))
+        expected = Trajectory(os.path.join(self.directory, "expected.bin"))
+
+        filepath = os.path.join(self.directory, "resumed.bin")
+        checkpoint_filepath = os.path.join(self.directory, "checkpoint.npz")
+        self.record(filepath, stop_at=5).save_checkpoint(checkpoint_filepath)
+        Game.resume(checkpoint_filepath).run()
+
+        resumed = Trajectory(filepath)
+        self.assertEqual(resumed.num_timesteps, expected.num_timesteps)
+        np.testing.assert_array_equal(resumed.positions, expected.positions)
+        np.testing.assert_array_equal(resumed.converged, expected.converged)
+
+    def test_new_file(self):
+        filepath = os.path.join(self.directory, "short.bin")
+        checkpoint_filepath = os.path.join(self.directory, "checkpoint.npz")
+        self.record(filepath, stop_at=5).save_checkpoint(checkpoint_filepath)
+        recorded = Trajectory(filepath).positions.copy()
+
+        # a different number of timesteps changes the layout of the file, which is kept as it is
+        Game.resume(checkpoint_filepath, overrides={"timesteps": 300}).run()
+        np.testing.assert_array_equal(Trajectory(filepath).positions, recorded)
+        resumed = Trajectory(os.path.join(self.directory, "short_from_000005.bin"))
+        self.assertEqual(resumed.metadata["first_timestep"], 5)
+        np.testing.assert_array_equal(resumed.positions[0], recorded[5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+    Run this as 'python -m tests.service' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from resources.service import ServiceClient, SimulationService
+from tests.helpers import load_params
+
+import asyncio
+import numpy as np
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+class TestService(unittest.TestCase):
+    """
+        A served game must play like a game of its own, its shared state following every request.
+    """
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.temporary_directory.name, "service.sock")
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_served_game(self):
+        socket_path = self.socket_path
+        service = threading.Thread(target=asyncio.run, args=(SimulationService(socket_path, slice_timesteps=3).serve_forever(),))
+        service.start()
+        while not os.path.exists(socket_path):
+            time.sleep(0.01)
+
+        overrides = {"vectorized": True, "num_entities": 60, "timesteps": 200}
+        client = ServiceClient(socket_path)
+        try:
+            status = client.request("create", overrides=overrides)
+            state = client.attach(status)
+            status = client.request("step", game_id=status["game_id"], timesteps=7)
+            self.assertEqual(status["timestep"], 7)
+            self.assertEqual(state.timestep, 7)
+
+            game = Game(params=load_params(**overrides))
+            for view in game.iter_steps():
+                if view.timestep == 7:
+                    break
+            np.testing.assert_array_equal(state.positions, view.positions)
+            np.testing.assert_array_equal(state.converged, view.converged)
+            state.close()
+
+            with self.assertRaisesRegex(RuntimeError, "num_entities must be a positive integer"):
+                client.request("create", overrides={"num_entities": 0})
+
+            status = client.request("run", game_id=status["game_id"])
+            self.assertTrue(status["ended"])
+            with self.assertRaises(RuntimeError):
+                client.request("query", game_id=status["game_id"] + 1)
+        finally:
+            client.request("shutdown")
+            client.close()
+            service.join()
+
+    def test_close_while_waiting(self):
+        """
+            Requests waiting for a game that is closed in the meantime must fail, rather than play a closed game.
+        """
+        async def requests() -> list[dict]:
+            service = SimulationService(self.socket_path, slice_timesteps=1)
+            status = await service._dispatch({"op": "create", "overrides": {"vectorized": True, "num_entities": 60, "timesteps": 50}})
+            game_id = status["game_id"]
+            # the close request waits for the run to end, and the step request for the close
+            return await asyncio.gather(
+                service._dispatch({"op": "run", "game_id": game_id}),
+                service._dispatch({"op": "close", "game_id": game_id}),
+                service._dispatch({"op": "step", "game_id": game_id})
+            )
+
+        run, close, step = asyncio.run(requests())
+        self.assertTrue(run["ok"] and run["ended"])
+        self.assertTrue(close["ok"])
+        self.assertEqual(step, {"ok": False, "error": f"No game with ID {run['game_id']}"})
+
+    def test_create_in_background(self):
+        """
+            Requests of other clients must be answered while a game is being created.
+        """
+        async def requests() -> list[str]:
+            service = SimulationService(self.socket_path)
+            answered = []
+            async def create():
+                status = await service._dispatch({"op": "create", "overrides": {"vectorized": True, "spawn_mode": "batched", "num_entities": 5000, "map_size": [100, 100]}})
+                answered.append("create" if status["ok"] else status["error"])
+            async def list_games():
+                status = await service._dispatch({"op": "list"})
+                answered.append("list" if status["ok"] else status["error"])
+            await asyncio.gather(create(), list_games())
+            for served in service._games.values():
+                served.close()
+            return answered
+
+        self.assertEqual(asyncio.run(requests()), ["list", "create"])
+
+
+if __name__ == "__main__":
+    unittest.main()
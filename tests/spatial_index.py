@@ -0,0 +1,55 @@
+"""
+    Run this as 'python -m tests.spatial_index' (see tests/math_utils.py)
+"""
+
+from resources.spatial_index import UniformGrid
+
+import numpy as np
+import unittest
+
+def brute_force_neighbors(points: np.ndarray, queries: np.ndarray, radius: float, exclude: np.ndarray = None) -> list[list[int]]:
+    neighbors = []
+    for k, query in enumerate(queries):
+        distances = np.sqrt((points[:, 0] - query[0]) ** 2 + (points[:, 1] - query[1]) ** 2)
+        indices = np.flatnonzero(distances <= radius)
+        if exclude is not None:
+            indices = indices[indices != exclude[k]]
+        neighbors.append(indices.tolist())
+    return neighbors
+
+class TestUniformGrid(unittest.TestCase):
+    """
+        Radius queries must find exactly the points a brute-force search over all points finds.
+    """
+    def assert_same_as_brute_force(self, points: np.ndarray, queries: np.ndarray, cell_size: float, radius: float, exclude: np.ndarray = None, chunk_size: int = 65536):
+        offsets, indices = UniformGrid(points, cell_size).query_radius(queries, radius, exclude=exclude, chunk_size=chunk_size)
+        self.assertEqual(len(offsets), len(queries) + 1)
+        result = [indices[offsets[k]:offsets[k+1]].tolist() for k in range(len(queries))]
+        self.assertEqual(result, brute_force_neighbors(points, queries, radius, exclude), msg=f"cell size {cell_size}, radius {radius}")
+
+    def test_random_points(self):
+        rng = np.random.default_rng(0)
+        points = rng.uniform(0, 20, (500, 2))
+        for cell_size, radius in [(2.5, 2.5), (2.5, 1.0), (1.0, 2.5), (0.7, 0.0)]:
+            # the points themselves, leaving each one out, and points outside of the indexed area
+            self.assert_same_as_brute_force(points, points, cell_size, radius, exclude=np.arange(len(points)))
+            self.assert_same_as_brute_force(points, rng.uniform(-5, 25, (300, 2)), cell_size, radius, chunk_size=64)
+
+    def test_on_the_radius(self):
+        # points on a lattice, many of them exactly at the radius of each other, in clusters sharing cells
+        points = np.array([(x, y) for x in range(10) for y in range(10)], dtype=np.float64)
+        points = np.concatenate([points, points + 1e-12, points[:20]])
+        for radius in [1.0, 2.0, np.sqrt(2.0)]:
+            self.assert_same_as_brute_force(points, points, radius, radius, exclude=np.arange(len(points)))
+
+    def test_empty(self):
+        offsets, indices = UniformGrid(np.zeros((0, 2)), 1.0).query_radius(np.array([[0.0, 0.0]]), 1.0)
+        np.testing.assert_array_equal(offsets, [0, 0])
+        self.assertEqual(len(indices), 0)
+        offsets, indices = UniformGrid(np.ones((3, 2)), 1.0).query_radius(np.zeros((0, 2)), 1.0)
+        np.testing.assert_array_equal(offsets, [0])
+        self.assertEqual(len(indices), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+    Run this as 'python -m tests.spawning' (see tests/math_utils.py)
+"""
+
+from resources.spawning import Spawner
+
+import numpy as np
+import unittest
+
+def min_pairwise_distance(positions: np.ndarray) -> float:
+    delta = positions[:, None, :] - positions[None, :, :]
+    distances = np.sqrt(delta[..., 0] ** 2 + delta[..., 1] ** 2)
+    return distances[~np.eye(len(positions), dtype=bool)].min()
+
+class TestSpawner(unittest.TestCase):
+    """
+        Spawned positions must lie in the map, be at least the collision distance apart, and only depend on the seed.
+    """
+    def spawn(self, mode: str, map_size: list[float, float], num_entities: int, seed: int) -> np.ndarray:
+        spawner = Spawner(map_size, radius=0.3, min_separation=0.1, seed=seed)
+        return spawner.spawn_batched(num_entities) if mode == "batched" else spawner.spawn_poisson_disk(num_entities)
+
+    def test_positions(self):
+        for mode in ["batched", "poisson_disk"]:
+            # from a sparse map to one that cannot fit the population
+            for map_size, num_entities in [([20, 20], 100), ([30, 10], 600), ([10, 10], 2000)]:
+                for seed in range(3):
+                    msg = f"{mode}, {num_entities} entities in {map_size}, seed {seed}"
+                    positions = self.spawn(mode, map_size, num_entities, seed)
+                    self.assertEqual(positions.shape[1], 2, msg=msg)
+                    self.assertLessEqual(len(positions), num_entities, msg=msg)
+                    self.assertGreaterEqual(len(positions), min(num_entities, 100), msg=msg)
+                    self.assertTrue(np.all((positions >= 0.0) & (positions <= map_size)), msg=msg)
+                    self.assertGreaterEqual(min_pairwise_distance(positions), 0.7, msg=msg)
+                    np.testing.assert_array_equal(self.spawn(mode, map_size, num_entities, seed), positions, err_msg=msg)
+
+            self.assertEqual(len(self.spawn(mode, [20, 20], 100, 0)), 100)
+            self.assertFalse(np.array_equal(self.spawn(mode, [20, 20], 100, 0), self.spawn(mode, [20, 20], 100, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+    Run this as 'python -m tests.step_engine' (see tests/math_utils.py)
+"""
+
+from resources import step_engine
+from resources.containers import EntityPosition, PositioningScenario
+from resources.convergence import ConvergenceTracker
+from resources.entity import Entity
+from resources.fast_forward import StraightLineMotion, advance, predictable_movers
+from resources.parallel_step import ParallelStepper
+from resources.population import PopulationStore
+
+import numpy as np
+import unittest
+
+class TestStepEngine(unittest.TestCase):
+    """
+        A batched step must move every root exactly like the per-entity path would, given the same parent positions.
+    """
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2000
+        self.map_size = [20.0, 20.0]
+        self.current = rng.uniform(0, 20, (n, 2))
+        self.parent_a = rng.uniform(0, 20, (n, 2))
+        self.parent_b = rng.uniform(0, 20, (n, 2))
+        # parents at the same position, an entity on top of a parent, and entities next to the map edges
+        self.parent_b[:10] = self.parent_a[:10]
+        self.current[10:20] = self.parent_b[10:20]
+        self.current[20:30, 0] = 0.0
+        self.parent_a[20:30, 0] = 5.0
+
+    def _entity(self, i: int) -> Entity:
+        position = EntityPosition(x = float(self.current[i, 0]), y = float(self.current[i, 1]))
+        return Entity(initial_position=position, perception_radius=2.5, id=i, map_size=self.map_size)
+
+    def _positions(self, i: int) -> tuple[EntityPosition, EntityPosition]:
+        a = EntityPosition(x = float(self.parent_a[i, 0]), y = float(self.parent_a[i, 1]))
+        b = EntityPosition(x = float(self.parent_b[i, 0]), y = float(self.parent_b[i, 1]))
+        return a, b
+
+    def _store(self) -> PopulationStore:
+        """
+            Store holding the entities (rows 0 .. n-1), followed by their first and second parents which do not move.
+        """
+        n = len(self.current)
+        store = PopulationStore(np.concatenate([self.current, self.parent_a, self.parent_b]), radii=0.3, map_size=self.map_size)
+        store.set_parents([[i, n + i, 2 * n + i] for i in range(n)])
+        return store
+
+    def _assert_same_positions(self, expected: list[Entity], result: np.ndarray):
+        for i, entity in enumerate(expected):
+            self.assertAlmostEqual(result[i, 0], entity.current_position.x, places=9, msg=f"Mismatch for row {i}")
+            self.assertAlmostEqual(result[i, 1], entity.current_position.y, places=9, msg=f"Mismatch for row {i}")
+
+    def test_scenario_a(self):
+        entities = [self._entity(i) for i in range(len(self.current))]
+        for i, entity in enumerate(entities):
+            entity.move_towards_halfway_between(*self._positions(i), step_size=0.3)
+
+        store = self._store()
+        step_engine.step_scenario_a(store, step_size=0.3)
+        self._assert_same_positions(entities, store.positions[:len(entities)])
+
+    def test_scenario_b(self):
+        for step_size in [0.3, 100.0]:
+            entities = [self._entity(i) for i in range(len(self.current))]
+            for i, entity in enumerate(entities):
+                entity.move_behind_entity(*self._positions(i), step_size=step_size, dist_behind=1.0)
+
+            store = self._store()
+            moved = step_engine.step_scenario_b(store, step_size=step_size, dist_behind=1.0)
+            self.assertFalse(np.any(moved < 10), "Parents at the same position cannot shield anything")
+            self._assert_same_positions(entities, store.positions[:len(entities)])
+
+    def test_parallel(self):
+        """
+            Stepping over a pool of processes gives the same positions as a single batched step, for any number of workers.
+        """
+        for scenario in [PositioningScenario.ScenarioA, PositioningScenario.ScenarioB]:
+            expected = self._store()
+            if scenario == PositioningScenario.ScenarioA:
+                expected_moved = step_engine.step_scenario_a(expected, step_size=0.3)
+            else:
+                expected_moved = step_engine.step_scenario_b(expected, step_size=0.3, dist_behind=1.0)
+
+            for num_workers in [1, 3]:
+                store = self._store()
+                stepper = ParallelStepper(store, scenario, step_size=0.3, dist_behind=1.0, num_workers=num_workers)
+                try:
+                    moved = stepper.step()
+                finally:
+                    stepper.close()
+                np.testing.assert_array_equal(moved, expected_moved)
+                np.testing.assert_array_equal(store.positions, expected.positions)
+                np.testing.assert_array_equal(store.history, expected.history)
+
+    def test_parallel_changing_parents(self):
+        """
+            Parents changed between steps (as when non-roots become roots) and changing candidates reach the workers.
+        """
+        n = len(self.current)
+        steps = [(np.arange(0, 500), None), (np.arange(300, 900), [[i, 2 * n + i, n + i] for i in range(100, 400)]), (None, None), (np.arange(50), [[i, n + i, 2 * n + i] for i in range(100, 200)])]
+        expected = self._store()
+        store = self._store()
+        stepper = ParallelStepper(store, PositioningScenario.ScenarioB, step_size=0.3, dist_behind=1.0, num_workers=2)
+        try:
+            for candidates, triplets in steps:
+                if triplets is not None:
+                    expected.set_parents(triplets)
+                    store.set_parents(triplets)
+                expected_moved = step_engine.step_scenario_b(expected, step_size=0.3, dist_behind=1.0, candidates=candidates)
+                np.testing.assert_array_equal(stepper.step(candidates=candidates), expected_moved)
+                np.testing.assert_array_equal(store.positions, expected.positions)
+        finally:
+            stepper.close()
+
+    def test_fast_forward(self):
+        """
+            Jumping ahead in closed form gives the positions, tracking histories and convergence state reached by stepping
+            one timestep at a time, when parents do not move (here, the parent rows have no parents themselves).
+        """
+        for num_steps in [3, 40, 200]:
+            expected = self._store()
+            expected.convergence_tracker = ConvergenceTracker(len(expected))
+            for _ in range(num_steps):
+                step_engine.step_scenario_a(expected, step_size=0.3)
+
+            store = self._store()
+            store.convergence_tracker = ConvergenceTracker(len(store))
+            ids, targets = predictable_movers(store)
+            motion = StraightLineMotion(ids, store.positions[ids].copy(), targets, step_size=0.3)
+            advance(store, motion, num_steps)
+
+            np.testing.assert_allclose(store.positions, expected.positions, rtol=0, atol=1e-9)
+            np.testing.assert_allclose(store.get_histories()[0], expected.get_histories()[0], rtol=0, atol=1e-9)
+            np.testing.assert_array_equal(store.history_len, expected.history_len)
+            arrived = ids[motion.num_steps <= num_steps]
+            np.testing.assert_array_equal(store.positions[arrived], expected.positions[arrived])
+
+            # tracked distances are the same up to rounding (ring buffers may be rotated differently)
+            state, expected_state = store.convergence_tracker.get_state(), expected.convergence_tracker.get_state()
+            np.testing.assert_array_equal(state["num_recorded"], expected_state["num_recorded"])
+            np.testing.assert_allclose(np.sort(state["deltas"], axis=1), np.sort(expected_state["deltas"], axis=1), rtol=0, atol=1e-9)
+            # while stepping, distances of step_size differ by rounding and randomly look increasing, whereas exact
+            # distances of straight-line motion never increase
+            self.assertTrue(np.all(state["converged"][ids[np.minimum(motion.num_steps, num_steps) >= 4]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+    Run this as 'python -m tests.sweep' (see tests/math_utils.py)
+"""
+
+from resources.config import apply_overrides
+from resources.game import Game
+from resources.sweep import expand_sweep, group_by_seed, make_headless, run_single, run_sweep
+from tests.helpers import small_params
+
+import csv
+import os
+import tempfile
+import unittest
+import yaml
+
+class TestSweep(unittest.TestCase):
+    """
+        A sweep must run every combination of its grid and explicit runs, each as a headless game of its own.
+    """
+    def test_expand_sweep(self):
+        sweep = {
+            "grid": {"random_seed": [1, 2], "positioning_scenario_B.dist_behind": [0.5, 1.0]},
+            "runs": [{"timesteps": 10}, {"timesteps": 20, "vectorized": True}]
+        }
+        expected = [
+            {"timesteps": timesteps, **vectorized, "random_seed": seed, "positioning_scenario_B.dist_behind": dist_behind}
+            for timesteps, vectorized in [(10, {}), (20, {"vectorized": True})]
+            for seed in [1, 2]
+            for dist_behind in [0.5, 1.0]
+        ]
+        self.assertEqual(expand_sweep(sweep), expected)
+        self.assertEqual(expand_sweep({"grid": {"random_seed": [1, 2]}}), [{"random_seed": 1}, {"random_seed": 2}])
+        self.assertEqual(expand_sweep({"runs": [{"timesteps": 10}]}), [{"timesteps": 10}])
+
+        params = apply_overrides(small_params(), expected[1])
+        self.assertEqual(params["positioning_scenario_B"], {"dist_behind": 1.0})
+        self.assertEqual((params["random_seed"], params["timesteps"]), (1, 10))
+
+    def test_group_by_seed(self):
+        all_overrides = expand_sweep({"grid": {"random_seed": [1, 2, 3], "positioning_scenario": ["A", "B"]}})
+        self.assertEqual(group_by_seed(all_overrides, 2), [[0, 2], [4], [1, 3], [5]])
+
+    def test_make_headless(self):
+        with open("config/params.yaml") as stream:
+            params = yaml.safe_load(stream)
+        params = apply_overrides(params, {"checkpoint.interval": 10, "profiling.timings_filepath": "timings.json", "profiling.cprofile": True, "recorder.enable": True, "logging.events_filepath": "events.jsonl"})
+        headless = make_headless(params)
+        self.assertFalse(headless["gui"]["enable"] or headless["recorder"]["enable"] or headless["profiling"]["cprofile"])
+        self.assertEqual(headless["checkpoint"]["interval"], 0)
+        self.assertIsNone(headless["profiling"]["timings_filepath"])
+        self.assertIsNone(headless["logging"]["events_filepath"])
+        self.assertIsNone(headless["save_directory"])
+        self.assertEqual(params["checkpoint"]["interval"], 10)
+
+    def test_run_single(self):
+        params = small_params(timesteps = 100)
+        row = run_single(3, params, {"timesteps": 100})
+        self.assertEqual((row["run_id"], row["timesteps"]), (3, 100))
+        self.assertNotIn("error", row)
+        self.assertEqual(row["num_timesteps"], Game(params = params).run().num_timesteps)
+
+        row = run_single(4, {**params, "num_entities": 0}, {"num_entities": 0})
+        self.assertIn("num_entities must be a positive integer", row["error"])
+        self.assertNotIn("num_timesteps", row)
+
+    def test_run_sweep(self):
+        with tempfile.TemporaryDirectory() as directory:
+            base_params = small_params(timesteps = 50, checkpoint = {"interval": 10, "directory": os.path.join(directory, "checkpoints")})
+            output_filepath = os.path.join(directory, "results.csv")
+            results = run_sweep(base_params, {"grid": {"random_seed": [1, 2], "num_entities": [60, 0]}}, output_filepath, workers=1)
+            self.assertEqual([row["run_id"] for row in results], [0, 1, 2, 3])
+            self.assertEqual([row.get("error") is None for row in results], [True, False, True, False])
+            with open(output_filepath, newline="") as stream:
+                self.assertEqual(len(list(csv.DictReader(stream))), 4)
+            # headless games do not save checkpoints
+            self.assertFalse(os.path.exists(os.path.join(directory, "checkpoints")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+    Run this as 'python -m tests.triplet_graph' (see tests/math_utils.py)
+"""
+
+from resources.triplet_graph import TripletGraph
+
+import random
+import unittest
+
+class TestTripletGraph(unittest.TestCase):
+    """
+        Lookups of the compiled triplets must agree with scanning the list of triplets they were built from.
+    """
+    def setUp(self):
+        rng = random.Random(0)
+        self.ids = [7 * i + 3 for i in range(200)]
+        rng.shuffle(self.ids)
+        roots = rng.sample(self.ids, 150)
+        self.triplets = [[root] + rng.sample([i for i in self.ids if i != root], 2) for root in roots]
+
+    def assert_same_as_list(self, graph: TripletGraph, triplets: list[list[int]]):
+        self.assertEqual(len(graph), len(triplets))
+        self.assertEqual(list(graph), triplets)
+        self.assertEqual(graph.to_list(), triplets)
+        self.assertEqual(graph.ids_of(graph.roots), [triplet[0] for triplet in triplets])
+        self.assertEqual(graph.root_ids.tolist(), [triplet[0] for triplet in triplets])
+        self.assertEqual([graph.ids_of(parents) for parents in graph.parents], [triplet[1:] for triplet in triplets])
+        for slot, id in enumerate(self.ids):
+            self.assertTrue(graph.has_id(id))
+            self.assertEqual(graph.slot_of(id), slot)
+            matches = [triplet for triplet in triplets if triplet[0] == id]
+            self.assertEqual(bool(graph.root_mask[slot]), len(matches) > 0)
+            parent_a, parent_b = graph.parents_of(slot)
+            if len(matches) == 0:
+                self.assertEqual((parent_a, parent_b), (None, None))
+            else:
+                self.assertEqual(graph.ids_of([parent_a, parent_b]), matches[0][1:])
+        self.assertFalse(graph.has_id(-1))
+
+    def test_built_at_once(self):
+        self.assert_same_as_list(TripletGraph(self.ids, self.triplets), self.triplets)
+
+    def test_built_incrementally(self):
+        graph = TripletGraph(self.ids)
+        self.assert_same_as_list(graph, [])
+        for start, stop in [(0, 1), (1, 3), (3, 3), (3, 60), (60, 150)]:
+            graph.add_triplets(self.triplets[start:stop])
+            self.assert_same_as_list(graph, self.triplets[:stop])
+
+    def test_shuffled_order(self):
+        graph = TripletGraph(self.ids, self.triplets)
+        random.seed(5)
+        order = graph.shuffled_order()
+        # the same random numbers as shuffling the list of triplets indices are drawn
+        random.seed(5)
+        expected = list(range(len(self.triplets)))
+        random.shuffle(expected)
+        self.assertEqual(order, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
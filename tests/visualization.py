@@ -0,0 +1,48 @@
+"""
+    Run this as 'python -m tests.visualization' (see tests/math_utils.py)
+"""
+
+from resources.game import Game
+from resources.visualization import TripletFigure
+from tests.helpers import small_params
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+class TestTripletRenderer(unittest.TestCase):
+    """
+        Frames submitted by a game must reach the disk, all of them unless dropping frames was asked for.
+    """
+    def play(self, directory: str, drop_frames_when_behind: bool) -> Game:
+        gui = {"enable": True, "frame_queue_size": 1, "drop_frames_when_behind": drop_frames_when_behind}
+        game = Game(params = small_params(timesteps = 20, gui = gui, save_directory = directory))
+        game.run()
+        return game
+
+    def test_every_frame(self):
+        with tempfile.TemporaryDirectory() as directory:
+            game = self.play(directory, drop_frames_when_behind=False)
+            titles = [f"Iteration_{timestep}" for timestep in range(1, game.summary.num_timesteps + 1)]
+            titles[-1] += "_FINAL_STATE"
+            self.assertEqual(sorted(os.listdir(directory)), sorted(["INITIAL STATE.png"] + [f"{title}.png" for title in titles]))
+
+    def test_dropped_frames(self):
+        draw = TripletFigure.draw
+        def slow_draw(*args, **kwargs):
+            time.sleep(0.2)
+            draw(*args, **kwargs)
+
+        # a writer slower than the game drops frames, but never the first and final ones
+        with tempfile.TemporaryDirectory() as directory, unittest.mock.patch.object(TripletFigure, "draw", slow_draw):
+            game = self.play(directory, drop_frames_when_behind=True)
+            filenames = os.listdir(directory)
+            self.assertGreater(game.instrumentation.total_counts["frames_dropped"], 0)
+            self.assertIn("Iteration_1.png", filenames)
+            self.assertIn("Iteration_20_FINAL_STATE.png", filenames)
+
+
+if __name__ == "__main__":
+    unittest.main()